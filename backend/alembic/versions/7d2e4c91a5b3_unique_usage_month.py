@@ -0,0 +1,78 @@
+"""unique organization_usage_summary month
+
+Revision ID: 7d2e4c91a5b3
+Revises: 0bd162ba35a0
+Create Date: 2026-10-19 10:12:31.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4c91a5b3'
+down_revision: Union[str, Sequence[str], None] = '0bd162ba35a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate month rows (concurrent first flushes) into the oldest one
+    op.execute(sa.text("""
+        WITH ranked AS (
+            SELECT id, organization_id, month,
+                   ROW_NUMBER() OVER (PARTITION BY organization_id, month ORDER BY created_at, id) AS rn
+            FROM organization_usage_summary
+        ),
+        totals AS (
+            SELECT organization_id, month,
+                   SUM(COALESCE(total_ai_tokens_used, 0)) AS tokens,
+                   SUM(COALESCE(total_prompts_used, 0)) AS prompts,
+                   SUM(COALESCE(total_scans, 0)) AS scans,
+                   SUM(COALESCE(total_user_scans, 0)) AS user_scans,
+                   SUM(COALESCE(total_valid_scans, 0)) AS valid_scans,
+                   SUM(COALESCE(total_invalid_scans, 0)) AS invalid_scans,
+                   SUM(COALESCE(total_biometric_scans, 0)) AS biometric_scans,
+                   SUM(COALESCE(total_voice_scans, 0)) AS voice_scans,
+                   BOOL_OR(COALESCE(scan_limit_reached, false)) AS limit_reached
+            FROM organization_usage_summary
+            GROUP BY organization_id, month
+            HAVING COUNT(*) > 1
+        )
+        UPDATE organization_usage_summary s
+        SET total_ai_tokens_used = t.tokens,
+            total_prompts_used = t.prompts,
+            total_scans = t.scans,
+            total_user_scans = t.user_scans,
+            total_valid_scans = t.valid_scans,
+            total_invalid_scans = t.invalid_scans,
+            total_biometric_scans = t.biometric_scans,
+            total_voice_scans = t.voice_scans,
+            scan_limit_reached = t.limit_reached
+        FROM ranked r
+        JOIN totals t ON t.organization_id = r.organization_id AND t.month = r.month
+        WHERE s.id = r.id AND r.rn = 1
+    """))
+    op.execute(sa.text("""
+        DELETE FROM organization_usage_summary s
+        USING (
+            SELECT id,
+                   ROW_NUMBER() OVER (PARTITION BY organization_id, month ORDER BY created_at, id) AS rn
+            FROM organization_usage_summary
+        ) r
+        WHERE s.id = r.id AND r.rn > 1
+    """))
+    op.create_index(
+        'uq_organization_usage_summary_org_month',
+        'organization_usage_summary',
+        ['organization_id', 'month'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_organization_usage_summary_org_month', table_name='organization_usage_summary')
@@ -0,0 +1,264 @@
+"""
+In-process caching primitives shared by services.
+
+The backend runs as a long-lived uvicorn worker or a warm Lambda container,
+so module-level caches survive across requests. Every cache here is bounded
+by TTL and (optionally) entry count and approximate size, and can be
+invalidated explicitly when the underlying rows are written.
+
+`SingleFlight` coalesces concurrent identical computations: while one call
+for a key is in flight, later callers await the same result instead of
+running the queries again. `TTLCache` uses it for every cache miss.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Share one in-flight computation between concurrent callers of the same key.
+
+    The computation runs as its own task, so a caller that is cancelled (e.g.
+    the client disconnected) does not cancel it for the others. Nothing is
+    kept once the call completes; combine with a cache to reuse results.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn()`` for ``key``, or join the call already in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._done(key, t))
+        else:
+            self.coalesced += 1
+            logger.debug(f"[{self.name}] joined in-flight call for {key!r}")
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: "asyncio.Task") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "expires_at", "size")
+
+    def __init__(self, value: Any, fresh_until: float, expires_at: float, size: int):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+        self.size = size
+
+
+class TTLCache:
+    """
+    Dictionary-like cache with per-entry TTL and LRU eviction.
+
+    Args:
+        name: Cache name, used only for logging.
+        ttl: Default time-to-live in seconds for new entries.
+        max_entries: Maximum number of entries kept; least recently used
+            entries are evicted first. ``None`` means unbounded.
+        stale_ttl: Extra seconds an expired entry is kept and may be served
+            by `get_or_load_swr` while it is refreshed in the background.
+        max_bytes: Approximate memory bound, measured with ``sizeof``.
+        sizeof: Callable estimating the size of a value in bytes (required
+            when ``max_bytes`` is set).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: Optional[int] = None,
+        stale_ttl: float = 0,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("sizeof is required when max_bytes is set")
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._total_bytes = 0
+        self._refreshing: Set[Hashable] = set()
+        self._flight = SingleFlight(name)
+        # Bumped on every invalidation so loads that started earlier are not stored
+        self._epoch = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def _lookup(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """Return (value, is_fresh); value is None if missing or past its stale window."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        now = time.monotonic()
+        if entry.expires_at < now:
+            self._remove(key)
+            return None, False
+        self._entries.move_to_end(key)
+        return entry.value, entry.fresh_until >= now
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        value, fresh = self._lookup(key)
+        return value if fresh else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if needed."""
+        now = time.monotonic()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        size = self.sizeof(value) if self.sizeof else 0
+        self._remove(key)
+        self._entries[key] = _Entry(value, fresh_until, fresh_until + self.stale_ttl, size)
+        self._total_bytes += size
+        self._evict()
+
+    @property
+    def epoch(self) -> int:
+        """Invalidation counter; read it before a load and pass it to `set_if_current`."""
+        return self._epoch
+
+    def set_if_current(self, key: Hashable, value: Any, epoch: int, ttl: Optional[float] = None) -> bool:
+        """Store a value loaded at ``epoch`` unless an invalidation happened since."""
+        if epoch != self._epoch:
+            return False
+        self.set(key, value, ttl=ttl)
+        return True
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            evicted, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.size
+            logger.debug(f"[{self.name}] evicted {evicted!r}")
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._epoch += 1
+        self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches ``predicate``. Returns the count."""
+        self._epoch += 1
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            self._remove(key)
+        if keys:
+            logger.info(f"[{self.name}] invalidated {len(keys)} entries")
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._epoch += 1
+        self._entries.clear()
+        self._total_bytes = 0
+        logger.info(f"[{self.name}] cleared")
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for ``key``, calling ``loader`` on a miss.
+        Concurrent misses for the same key share a single ``loader`` call.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        return await self._load(key, loader, ttl)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        async def load() -> Any:
+            epoch = self._epoch
+            value = await loader()
+            self.set_if_current(key, value, epoch, ttl=ttl)
+            return value
+
+        return await self._flight.do(key, load)
+
+    async def get_or_load_swr(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Stale-while-revalidate read.
+
+        Fresh entries are returned directly. Entries past their TTL but within
+        ``stale_ttl`` are returned immediately while a single background task
+        reloads them. Missing entries are loaded inline, once per key.
+        """
+        value, fresh = self._lookup(key)
+        if value is not None:
+            if not fresh and key not in self._refreshing:
+                self._refreshing.add(key)
+                asyncio.create_task(self._refresh(key, loader, ttl))
+            return value
+        return await self._load(key, loader, ttl)
+
+    async def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> None:
+        epoch = self._epoch
+        try:
+            value = await loader()
+            if self.set_if_current(key, value, epoch, ttl=ttl):
+                logger.debug(f"[{self.name}] refreshed {key!r}")
+        except Exception as e:
+            logger.warning(f"[{self.name}] background refresh failed for {key!r}: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Basic size information for health/debug endpoints."""
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "loads": self._flight.stats(),
+        }
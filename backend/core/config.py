@@ -31,9 +31,92 @@ class Settings(BaseSettings):
     # Environment
     environment: str = "development"
     
+    # Import routers on the first request to their prefix (shorter cold starts)
+    lazy_routers: bool = True
+    
     # Database URL (direct PostgreSQL connection)
     database_url: str = ""
     
+    # In-process caches
+    reference_data_ttl_seconds: int = 3600
+    reference_data_cache_control: str = "public, max-age=300, must-revalidate"
+    i18n_bundle_ttl_seconds: int = 900
+    i18n_bundle_max_entries: int = 2000
+    i18n_cache_control: str = "public, max-age=300, must-revalidate"
+    branding_cache_ttl_seconds: int = 3600
+    branding_not_found_ttl_seconds: int = 60
+    branding_cache_max_entries: int = 5000
+    branding_cache_control: str = "public, max-age=3600, stale-while-revalidate=86400"
+    dashboard_cache_ttl_seconds: int = 120
+    dashboard_cache_stale_seconds: int = 600
+    dashboard_cache_max_entries: int = 1000
+    dashboard_cache_max_bytes: int = 64 * 1024 * 1024
+    settings_cache_ttl_seconds: int = 60
+    settings_cache_stale_seconds: int = 300
+    settings_cache_max_entries: int = 5000
+    prompt_registry_ttl_seconds: int = 3600
+    
+    # AI Hub client pool and per-model concurrency
+    ai_max_connections: int = 100
+    ai_max_keepalive_connections: int = 20
+    ai_keepalive_expiry_seconds: float = 30.0
+    ai_connect_timeout_seconds: float = 10.0
+    ai_request_timeout_seconds: float = 120.0
+    ai_max_retries: int = 2
+    ai_max_concurrency_per_model: int = 8
+    ai_max_queue_per_model: int = 64
+    ai_queue_timeout_seconds: float = 30.0
+    ai_completion_cache_ttl_seconds: int = 86400
+    ai_completion_cache_max_entries: int = 2000
+    ai_completion_cache_max_bytes: int = 32 * 1024 * 1024
+    genimg_storage_bucket: str = ""
+    
+    # Insight batch runner (python -m services.insight_batch)
+    insight_batch_model: str = "deepseek-v3.2"
+    insight_batch_window_days: int = 30
+    insight_batch_concurrency: int = 8
+    insight_batch_requests_per_minute: int = 120
+    insight_batch_max_retries: int = 3
+    insight_batch_max_tokens: int = 1024
+    
+    # Object storage backend ("oss" or "local"), client pool and retries
+    storage_backend: str = "oss"
+    local_storage_root: str = ".storage"
+    local_storage_signing_key: str = ""
+    local_storage_url_ttl_seconds: int = 3600
+    oss_max_connections: int = 50
+    oss_max_keepalive_connections: int = 20
+    oss_keepalive_expiry_seconds: float = 30.0
+    oss_connect_timeout_seconds: float = 5.0
+    oss_api_timeout_seconds: float = 15.0
+    oss_transfer_timeout_seconds: float = 120.0
+    oss_max_retries: int = 3
+    oss_retry_backoff_seconds: float = 0.2
+    presign_cache_max_entries: int = 10000
+    presign_cache_margin_seconds: int = 60
+    presign_batch_concurrency: int = 16
+    
+    # DeepAffex token cache
+    deepaffex_token_ttl_seconds: int = 3600
+    deepaffex_refresh_ahead_seconds: int = 600
+    deepaffex_min_token_lifetime_seconds: int = 60
+    deepaffex_renew_path: str = "/api/v2/auth/renew"
+    
+    # Response compression (see middlewares.compression)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Warm-up priming (Lambda warm-up events, see services.warmup)
+    warmup_steps: str = "routers,db,supabase,http,reference_data,i18n,prompts,deepaffex"
+    warmup_db_connections: int = 2
+    warmup_locales: str = "es,en"
+    
+    # AI usage accounting (organization_usage_summary increments)
+    usage_flush_interval_seconds: float = 30.0
+    usage_flush_max_pending: int = 50
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
@@ -0,0 +1,129 @@
+"""
+HTTP validator helpers (ETag / Last-Modified / 304 Not Modified).
+
+Routers that serve slowly-changing data compute a strong ETag once, when the
+payload is built, and use these helpers to answer conditional requests
+without re-serializing or re-querying anything. Routers that can derive a
+cheap data version (e.g. max(created_at) + row count) check it *before*
+running the heavy queries and return 304 straight away.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from core.serialization import FastJSONResponse
+
+
+def compute_etag(payload: Any) -> str:
+    """Return a strong ETag for a JSON-serializable payload."""
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against ``etag`` (weak comparison, RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def version_etag(*parts: Any) -> str:
+    """Weak ETag derived from a data version (scope, params, max timestamp, count...)."""
+    return "W/" + compute_etag(list(parts))
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a DB/REST timestamp (ISO string or datetime) into an aware UTC datetime."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate conditional request headers.
+
+    If-None-Match takes precedence; If-Modified-Since is only considered when
+    the client sent no entity tag (RFC 9110 section 13.2.2).
+    """
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, etag)
+
+    since = request.headers.get("if-modified-since")
+    if since and last_modified is not None:
+        try:
+            since_dt = parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            return False
+        if since_dt.tzinfo is None:
+            since_dt = since_dt.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since_dt
+    return False
+
+
+def validator_headers(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> dict:
+    """Header dict carrying the validators for a response."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def set_validator_headers(
+    response: Response,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+) -> None:
+    """Attach validators to the (injected) response of a route returning a dict."""
+    for name, value in validator_headers(etag, cache_control, last_modified).items():
+        response.headers[name] = value
+
+
+def not_modified_response(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> Response:
+    """Empty 304 response carrying the current validators."""
+    return Response(status_code=304, headers=validator_headers(etag, cache_control, last_modified))
+
+
+def cached_json_response(
+    request: Request,
+    payload: Any,
+    etag: Optional[str] = None,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """
+    Serve ``payload`` as JSON with an ETag, or 304 if the client already has it.
+
+    Args:
+        request: Incoming request (for If-None-Match).
+        payload: JSON-serializable body.
+        etag: Precomputed ETag; computed from ``payload`` when omitted.
+        cache_control: Cache-Control header value.
+    """
+    etag = etag or compute_etag(payload)
+    if etag_matches(request, etag):
+        return not_modified_response(etag, cache_control)
+    return FastJSONResponse(content=payload, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -14,6 +14,9 @@ from schemas.auth import UserResponse
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
+
+# Roles de administración de plataforma (parámetros globales, buckets)
+ADMIN_ROLES = {"admin_global", "admin"}
 optional_security = HTTPBearer(auto_error=False)
 
 
@@ -95,4 +98,19 @@ async def get_current_user_optional(
         )
     except Exception as e:
         logger.warning(f"⚠️ Autenticación opcional falló: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+async def get_admin_user(
+    current_user: UserResponse = Depends(get_current_user)
+) -> UserResponse:
+    """
+    Usuario actual, solo si es administrador de plataforma (ADMIN_ROLES).
+    """
+    if current_user.role not in ADMIN_ROLES:
+        logger.warning(f"⛔ Acceso de administrador denegado: {current_user.id} ({current_user.role})")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
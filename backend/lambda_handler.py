@@ -4,11 +4,14 @@ This handler simulates Nginx routing logic within Lambda
 """
 import asyncio
 import base64
+import gzip
+import hashlib
 import json
 import logging
 import os
+import re
 import traceback
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from urllib.parse import unquote
 
 from mangum import Mangum
@@ -28,6 +31,12 @@ backend_app = None
 mangum_handler = None
 services_initialized = False
 
+# One event loop per container, shared by service initialization and Mangum (which
+# runs each request on asyncio.get_event_loop()). asyncpg pools and httpx clients are
+# bound to the loop they were created on, so keeping it alive lets them survive warm
+# invocations.
+event_loop: Optional[asyncio.AbstractEventLoop] = None
+
 # Dynamic route registry - initialized on first request
 dynamic_routes_initialized = False
 seo_paths = set()
@@ -35,12 +44,41 @@ seo_paths = set()
 # SEO domain placeholder - will be replaced with actual request domain at runtime
 SEO_DOMAIN_PLACEHOLDER = "https://atoms.template.com"
 
+try:
+    import brotli
+except ImportError:  # brotli variants are skipped when the package is not bundled
+    brotli = None
+
+FRONTEND_DIST = "/var/task/frontend/dist"
+
+# Warm-container cache of frontend/dist files (see StaticAsset)
+static_assets: Dict[str, "StaticAsset"] = {}
+static_assets_bytes = 0
+STATIC_CACHE_MAX_BYTES = int(os.environ.get("STATIC_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+STATIC_COMPRESS_MIN_BYTES = 1024
+
+# Vite emits content-hashed names under /assets/ (e.g. /assets/index-B1x9aZ3k.js)
+HASHED_ASSET = re.compile(r"^/assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
 
 def format_traceback() -> str:
     """Format traceback with newlines replaced by '\\n' string literal"""
     return traceback.format_exc().replace(chr(10), "\\n")
 
 
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the container's event loop, creating it and making it current on first use."""
+    global event_loop
+
+    if event_loop is None or event_loop.is_closed():
+        event_loop = asyncio.new_event_loop()
+        logger.info("Created container event loop")
+    asyncio.set_event_loop(event_loop)
+    return event_loop
+
+
 def initialize_dynamic_routes():
     """Initialize dynamic routes by scanning frontend dist directory"""
     global dynamic_routes_initialized, seo_paths
@@ -92,12 +130,14 @@ async def initialize_services_once():
             from services.database import initialize_database
             from services.mock_data import initialize_mock_data
             from services.auth import initialize_admin_user
+            from services.reference_data import initialize_reference_data
             # MODULE_IMPORTS_END
 
             # MODULE_STARTUP_START
             await initialize_database()
             await initialize_mock_data()
             await initialize_admin_user()
+            await initialize_reference_data()
             # MODULE_STARTUP_END
 
             services_initialized = True
@@ -169,6 +209,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     AWS Lambda handler function that simulates Nginx routing
     """
     try:
+        # Scheduled warm-up pings never reach the router
+        if is_warmup_event(event):
+            return handle_warmup_sync(event)
+
         # Initialize dynamic routes on first request (cold start)
         initialize_dynamic_routes()
         
@@ -245,7 +289,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             (".js", ".css", ".png", ".jpg", ".jpeg", ".gif", ".ico", ".svg", ".woff", ".woff2", ".ttf", ".eot")
         ):
             # Serve static files
-            return serve_static_file(path)
+            return serve_static_file(path, {k.lower(): v for k, v in (headers or {}).items()})
         
         elif path == "/sitemap.xml":
             return serve_sitemap(request_domain)
@@ -260,7 +304,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         else:
             # Route to frontend (SPA) - ALL other paths go to frontend
-            result = serve_frontend()
+            result = serve_frontend({k.lower(): v for k, v in (headers or {}).items()})
             return result
 
     except Exception as e:
@@ -275,51 +319,94 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
 def handle_backend_request_sync(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle backend API requests using Mangum (synchronous wrapper)"""
-    # Initialize services if not already done
+    loop = get_event_loop()
+
+    # Initialize services if not already done (on the same loop Mangum will use)
     if not services_initialized:
-        try:
-            # Try to get existing event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If loop is running, we can't use it, so create a new one in a thread
-                import concurrent.futures
-
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, initialize_services_once())
-                    future.result()
-            else:
-                # If loop is not running, run directly
-                loop.run_until_complete(initialize_services_once())
-        except RuntimeError:
-            # No event loop exists, create a new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(initialize_services_once())
-            finally:
-                loop.close()
+        loop.run_until_complete(initialize_services_once())
 
     # Get or create Mangum handler
     mangum_handler = get_mangum_handler_sync()
 
     # Call Mangum handler
     result = mangum_handler(event, context)
+
+    # No lifespan and no running loop between invocations: flush AI usage
+    # counters here, or they are lost when the container is reaped
+    try:
+        from services.usage_accounting import get_usage_accumulator
+
+        loop.run_until_complete(get_usage_accumulator().flush_if_due())
+    except Exception as e:
+        logger.warning(f"Usage flush failed: {e}")
+
+    return encode_compressed_body(result)
+
+
+def encode_compressed_body(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return gzip/brotli bodies (see middlewares.compression) base64-encoded.
+
+    Mangum only base64-encodes bodies whose content type is not textual, and
+    decodes "text" as UTF-8 when it can, which would hand a compressed JSON
+    body to API Gateway as a string. (REST APIs also need `*/*` in their
+    binary media types to decode it.)
+    """
+    if not isinstance(result, dict) or result.get("isBase64Encoded") or not result.get("body"):
+        return result
+
+    headers = {k.lower(): v for k, v in (result.get("headers") or {}).items()}
+    for name, values in (result.get("multiValueHeaders") or {}).items():
+        if values:
+            headers.setdefault(name.lower(), values[0])
+
+    if headers.get("content-encoding") in ("gzip", "br"):
+        # Mangum decoded these bytes as UTF-8, so encoding them back is lossless
+        result["body"] = base64.b64encode(result["body"].encode("utf-8")).decode("ascii")
+        result["isBase64Encoded"] = True
     return result
 
 
-def serve_frontend() -> Dict[str, Any]:
+def is_warmup_event(event: Dict[str, Any]) -> bool:
+    """EventBridge schedule, serverless-plugin-warmup, or an explicit {"warmup": true} invocation"""
+    if not isinstance(event, dict):
+        return False
+    return (
+        event.get("warmup") is True
+        or event.get("source") in ("aws.events", "serverless-plugin-warmup")
+        or event.get("detail-type") == "Scheduled Event"
+    )
+
+
+def handle_warmup_sync(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Prime pools, clients and caches so the next user-facing invocation arrives warm"""
+    loop = get_event_loop()
+
+    if not services_initialized:
+        loop.run_until_complete(initialize_services_once())
+    get_mangum_handler_sync()
+
+    from services.warmup import prime
+
+    summary = loop.run_until_complete(prime())
+
+    # Periodic warm-ups also write out usage counters still below the flush threshold
+    from services.usage_accounting import get_usage_accumulator
+
+    summary["usage_flush"] = f"{loop.run_until_complete(get_usage_accumulator().flush())} organization-months"
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({"warmup": summary}),
+    }
+
+
+def serve_frontend(request_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     """Serve the frontend HTML"""
-    # Try to read the built frontend HTML
-    html_path = "/var/task/frontend/dist/index.html"
-    if os.path.exists(html_path):
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        response = {
-            "statusCode": 200,
-            "headers": {"Content-Type": "text/html", "Access-Control-Allow-Origin": "*"},
-            "body": html_content,
-        }
-        return response
+    # index.html comes from the asset cache; it references hashed assets, so it is always revalidated
+    asset = load_static_asset("/index.html")
+    if asset is not None:
+        return asset.response(request_headers or {}, cache_control="no-cache")
     else:
         # Fallback to a simple HTML response
         html_content = """
@@ -363,37 +450,126 @@ def serve_frontend() -> Dict[str, Any]:
         }
 
 
-def serve_static_file(path: str) -> Dict[str, Any]:
-    """Serve static files"""
-    # Map file extensions to content types
-    content_types = {
-        ".js": "application/javascript",
-        ".css": "text/css",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".ico": "image/x-icon",
-        ".svg": "image/svg+xml",
-    }
+CONTENT_TYPES = {
+    ".html": "text/html",
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".ico": "image/x-icon",
+    ".svg": "image/svg+xml",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".eot": "application/vnd.ms-fontobject",
+}
 
-    # Get file extension
-    ext = os.path.splitext(path)[1].lower()
-    content_type = content_types.get(ext, "application/octet-stream")
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "image/svg+xml", "font/ttf", "application/vnd.ms-fontobject")
+
+
+class StaticAsset:
+    """
+    A frontend/dist file kept in memory with everything a response needs:
+    the Lambda body (text, or base64 for binaries), precompressed gzip/brotli
+    bodies (base64) for compressible types, an ETag and the Cache-Control.
+    """
+
+    def __init__(self, path: str, content: bytes, content_type: str):
+        self.content_type = content_type
+        self.size = len(content)
+        self.etag = '"' + hashlib.sha1(content).hexdigest()[:20] + '"'
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_ASSET.match(path) else REVALIDATE_CACHE_CONTROL
+        self.is_text = content_type.startswith("text/")
+        self.body = content.decode("utf-8") if self.is_text else base64.b64encode(content).decode("ascii")
+        self.encoded: Dict[str, str] = {}
+
+        if self.size >= STATIC_COMPRESS_MIN_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+            if brotli is not None:
+                self.encoded["br"] = base64.b64encode(brotli.compress(content, quality=11)).decode("ascii")
+            self.encoded["gzip"] = base64.b64encode(gzip.compress(content, compresslevel=9, mtime=0)).decode("ascii")
+        self.memory = len(self.body) + sum(len(body) for body in self.encoded.values())
+
+    def headers(self, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        headers = {
+            "Content-Type": self.content_type,
+            "Access-Control-Allow-Origin": "*",
+            "Cache-Control": self.cache_control,
+            "ETag": self.etag,
+        }
+        if self.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        headers.update(extra or {})
+        return headers
+
+    def not_modified(self, request_headers: Dict[str, str]) -> bool:
+        if_none_match = request_headers.get("if-none-match", "")
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+    def response(self, request_headers: Dict[str, str], cache_control: Optional[str] = None) -> Dict[str, Any]:
+        """Lambda response: 304 on a matching If-None-Match, else the best accepted encoding."""
+        extra = {"Cache-Control": cache_control} if cache_control else {}
+        if self.not_modified(request_headers):
+            return {"statusCode": 304, "headers": self.headers(extra), "body": ""}
+
+        import sys
+
+        if "/var/task/backend" not in sys.path:
+            sys.path.append("/var/task/backend")
+        from middlewares.compression import negotiate_encoding
+
+        # Same q-value aware negotiation as the API's CompressionMiddleware
+        available = [encoding for encoding in ("br", "gzip") if encoding in self.encoded]
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), available)
+        if encoding is not None:
+            return {
+                "statusCode": 200,
+                "headers": self.headers({**extra, "Content-Encoding": encoding}),
+                "body": self.encoded[encoding],
+                "isBase64Encoded": True,
+            }
 
-    # Try to read the file
-    file_path = f"/var/task/frontend/dist{path}"
-    if os.path.exists(file_path):
-        with open(file_path, "rb") as f:
-            content = f.read()
         return {
             "statusCode": 200,
-            "headers": {"Content-Type": content_type, "Access-Control-Allow-Origin": "*"},
-            "body": content.decode("utf-8")
-            if content_type.startswith("text/")
-            else base64.b64encode(content).decode("utf-8"),
-            "isBase64Encoded": not content_type.startswith("text/"),
+            "headers": self.headers(extra),
+            "body": self.body,
+            "isBase64Encoded": not self.is_text,
         }
+
+
+def load_static_asset(path: str) -> Optional[StaticAsset]:
+    """The asset for a URL path from the warm-container cache, reading it on first use."""
+    global static_assets_bytes
+
+    asset = static_assets.get(path)
+    if asset is not None:
+        return asset
+
+    root = os.path.realpath(FRONTEND_DIST)
+    file_path = os.path.realpath(f"{root}{path}")
+    if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+        return None
+
+    with open(file_path, "rb") as f:
+        content = f.read()
+    ext = os.path.splitext(path)[1].lower()
+    asset = StaticAsset(path, content, CONTENT_TYPES.get(ext, "application/octet-stream"))
+
+    if static_assets_bytes + asset.memory <= STATIC_CACHE_MAX_BYTES:
+        static_assets[path] = asset
+        static_assets_bytes += asset.memory
+    return asset
+
+
+def serve_static_file(path: str, request_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Serve static files"""
+    asset = load_static_asset(path)
+    if asset is not None:
+        return asset.response(request_headers or {})
     else:
         return {
             "statusCode": 404,
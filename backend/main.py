@@ -6,6 +6,8 @@ from fastapi.responses import JSONResponse
 
 # Import configuration
 from core.config import settings
+from middlewares.compression import CompressionMiddleware
+from middlewares.lazy_routers import LazyRouterMiddleware, LazyRouterTable
 
 # Configure logging
 logging.basicConfig(
@@ -18,8 +20,16 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info("🚀 Starting HoloCheck Equilibria Backend...")
+    from services.reference_data import initialize_reference_data
+    await initialize_reference_data()
     yield
     logger.info("👋 Shutting down HoloCheck Equilibria Backend...")
+    from services.usage_accounting import get_usage_accumulator
+    await get_usage_accumulator().stop()
+    from services.storage import close_oss_client
+    await close_oss_client()
+    from services.deepaffex_service import close_deepaffex_client
+    await close_deepaffex_client()
 
 # Create FastAPI app
 app = FastAPI(
@@ -39,35 +49,43 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Import routers
-try:
-    from routers import (
-        auth, 
-        user_profiles, 
-        departments, 
-        biometric_indicators, 
-        dashboards, 
-        prompts, 
-        benefits_management,
-        organization_branding,
-        i18n
+# Compress large JSON responses (dashboards, list pages) for clients that accept it
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
     )
-    
-    # Include routers
-    app.include_router(auth.router, tags=["Authentication"])
-    app.include_router(user_profiles.router, tags=["User Profiles"])
-    app.include_router(departments.router, tags=["Departments"])
-    app.include_router(biometric_indicators.router, tags=["Biometric Indicators"])
-    app.include_router(dashboards.router, tags=["Dashboards"])
-    app.include_router(prompts.router, tags=["Prompts"])
-    app.include_router(benefits_management.router, tags=["Benefits Management"])
-    app.include_router(organization_branding.router, tags=["Organization Branding"])
-    app.include_router(i18n.router, tags=["Internationalization"])
-    
-    logger.info("✅ All routers imported successfully")
-except Exception as e:
-    logger.error(f"❌ Error importing routers: {e}")
-    raise
+
+# Routers, mounted on the first request to their prefix (see middlewares.lazy_routers)
+ROUTER_TABLE = LazyRouterTable([
+    ("/api/v1/auth", "routers.auth", ["Authentication"]),
+    ("/api/v1/entities/user_profiles", "routers.user_profiles", ["User Profiles"]),
+    ("/api/v1/entities/departments", "routers.departments", ["Departments"]),
+    ("/api/v1/biometric-indicators", "routers.biometric_indicators", ["Biometric Indicators"]),
+    ("/api/v1/dashboards", "routers.dashboards", ["Dashboards"]),
+    ("/api/v1/entities/prompts", "routers.prompts", ["Prompts"]),
+    ("/api/v1/benefits-management", "routers.benefits_management", ["Benefits Management"]),
+    ("/api/v1/organization-branding", "routers.organization_branding", ["Organization Branding"]),
+    ("/api/v1/i18n", "routers.i18n", ["Internationalization"]),
+    ("/api/v1/reference-data", "routers.reference_data", ["Reference Data"]),
+])
+
+if settings.lazy_routers:
+    app.add_middleware(
+        LazyRouterMiddleware,
+        table=ROUTER_TABLE,
+        docs_paths=[app.openapi_url, app.docs_url, app.redoc_url],
+    )
+    logger.info(f"✅ {len(ROUTER_TABLE.mounts)} routers registered for lazy mounting")
+else:
+    try:
+        ROUTER_TABLE.mount_all(app)
+        logger.info("✅ All routers imported successfully")
+    except Exception as e:
+        logger.error(f"❌ Error importing routers: {e}")
+        raise
 
 # Health check endpoint
 @app.get("/health")
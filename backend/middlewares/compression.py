@@ -0,0 +1,226 @@
+"""
+Response compression.
+
+Dashboards and 2000-row list pages are large JSON documents that compress
+5-10x. `CompressionMiddleware` negotiates `br` (when the brotli package is
+installed) or `gzip` from Accept-Encoding and compresses responses of a
+compressible type. Single-message bodies are compressed once they reach
+`minimum_size` (smaller ones are sent as-is); streamed bodies are never
+buffered: the headers go out with the first chunk and every chunk is
+compressed and flushed as it arrives. Server-sent events and responses
+that already carry a Content-Encoding (e.g. the precompressed static
+assets) are left untouched.
+
+Behind Mangum the compressed body is binary; `lambda_handler` makes sure it
+is returned base64-encoded (`isBase64Encoded`).
+"""
+import zlib
+from typing import Iterable, List, Optional
+
+try:
+    import brotli
+except ImportError:  # only gzip is offered when the package is not installed
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+    "text/",
+)
+
+# Event streams must reach the client event by event, never as compressor blocks
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """Best of `available` (in order of preference) accepted by the client, honoring q-values."""
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class _Compressor:
+    """Incremental gzip/brotli encoder."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31: gzip container
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large responses with the negotiated encoding."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        compressible_types: Iterable[str] = COMPRESSIBLE_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.compressible_types = tuple(compressible_types)
+        self.encodings: List[str] = (["br"] if brotli is not None else []) + ["gzip"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.lower(): v for k, v in scope.get("headers") or []}
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"), self.encodings)
+        if encoding is None or b"range" in headers:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponder(self, encoding, send).run(scope, receive)
+
+
+class _CompressedResponder:
+    """State of one response: compresses a complete body or each streamed chunk."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def run(self, scope, receive) -> None:
+        await self.middleware.app(scope, receive, self.wrapped_send)
+
+    def _should_compress(self, message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 206, 304):
+            return False
+        headers = {k.lower(): v for k, v in message.get("headers") or []}
+        if b"content-encoding" in headers:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+        if content_type.startswith(UNCOMPRESSED_TYPES):
+            return False
+        return content_type.startswith(self.middleware.compressible_types)
+
+    def _compressed_headers(self) -> list:
+        headers = []
+        vary = []
+        for name, value in self.start_message.get("headers") or []:
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"vary":
+                vary.append(value)
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                # The compressed representation is not byte-identical to the original
+                value = b"W/" + value
+            headers.append((name, value))
+        if not any(b"accept-encoding" in v.lower() or v.strip() == b"*" for v in vary):
+            vary.append(b"Accept-Encoding")
+        headers.append((b"vary", b", ".join(vary)))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        return headers
+
+    def _add_vary(self) -> None:
+        headers = list(self.start_message.get("headers") or [])
+        for i, (name, value) in enumerate(headers):
+            if name.lower() == b"vary":
+                if b"accept-encoding" not in value.lower() and value.strip() != b"*":
+                    headers[i] = (name, value + b", Accept-Encoding")
+                break
+        else:
+            headers.append((b"vary", b"Accept-Encoding"))
+        self.start_message = {**self.start_message, "headers": headers}
+
+    async def wrapped_send(self, message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._should_compress(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            if not self.passthrough and self.compressor is None:
+                # e.g. http.response.pathsend: the body never passes through here
+                self.passthrough = True
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Complete and below the threshold: not worth compressing
+                self._add_vary()
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            start_headers = self._compressed_headers()
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                start_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                await self.send({**self.start_message, "headers": start_headers})
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            # Streamed body: send the headers now rather than waiting for more chunks
+            await self.send({**self.start_message, "headers": start_headers})
+
+        if more_body:
+            # Flush each chunk so streamed responses reach the client as they are produced
+            chunk = self.compressor.compress(body) + self.compressor.flush()
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": chunk})
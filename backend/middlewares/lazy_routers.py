@@ -0,0 +1,66 @@
+"""
+Lazy router mounting.
+
+Importing every router at startup pulls in SQLAlchemy models, the Supabase
+client, OpenAI, Stripe and jose before the first request can be served,
+which is most of a Lambda cold start. `LazyRouterTable` lists the routers
+by URL prefix instead; `LazyRouterMiddleware` imports and includes a router
+the first time a request hits its prefix, so a cold container only pays for
+the routers it actually serves. The OpenAPI/docs endpoints mount everything.
+"""
+import importlib
+import logging
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRouterTable:
+    """Routers mounted on demand: (URL prefix, module with a `router`, tags)."""
+
+    def __init__(self, mounts: Iterable[Tuple[str, str, List[str]]]):
+        self.mounts = [(prefix.rstrip("/"), module, tags) for prefix, module, tags in mounts]
+        self.loaded = set()
+
+    def _mount(self, app: FastAPI, prefix: str, module_name: str, tags: List[str]) -> None:
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, tags=tags)
+        self.loaded.add(module_name)
+        # Routes added after the schema was generated would be missing from /docs
+        app.openapi_schema = None
+        logger.info(f"✅ Router {module_name} mounted at {prefix} in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def ensure(self, app: FastAPI, path: str) -> None:
+        """Mount the router serving `path`, if it is not mounted yet."""
+        for prefix, module_name, tags in self.mounts:
+            if module_name not in self.loaded and (path == prefix or path.startswith(prefix + "/")):
+                self._mount(app, prefix, module_name, tags)
+
+    def mount_all(self, app: FastAPI) -> None:
+        """Mount every router (docs, warm-up, or when lazy loading is disabled)."""
+        for prefix, module_name, tags in self.mounts:
+            if module_name not in self.loaded:
+                self._mount(app, prefix, module_name, tags)
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware mounting routers from a `LazyRouterTable` on first hit."""
+
+    def __init__(self, app, table: LazyRouterTable, docs_paths: Optional[Iterable[str]] = None):
+        self.app = app
+        self.table = table
+        self.docs_paths = set(docs_paths or ())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and len(self.table.loaded) < len(self.table.mounts):
+            # Imports are synchronous, so concurrent requests cannot mount a router twice
+            fastapi_app = scope["app"]
+            if scope["path"] in self.docs_paths:
+                self.table.mount_all(fastapi_app)
+            else:
+                self.table.ensure(fastapi_app, scope["path"])
+        await self.app(scope, receive, send)
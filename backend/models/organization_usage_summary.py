@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, Boolean, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, Boolean, Date, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 from core.database import Base
@@ -6,7 +6,11 @@ from core.database import Base
 
 class OrganizationUsageSummary(Base):
     __tablename__ = "organization_usage_summary"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # One row per organization and month (usage flushes upsert on it)
+        Index("uq_organization_usage_summary_org_month", "organization_id", "month", unique=True),
+        {"extend_existing": True},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, nullable=False)
     organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False)
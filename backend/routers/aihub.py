@@ -6,11 +6,14 @@ Provides Generate Text (gentxt) and Generate Image (genimg) API endpoints.
 import ast
 import json
 import logging
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from dependencies.auth import get_current_user, get_current_user_optional
+from fastapi import APIRouter, Depends, HTTPException, status
 from schemas.aihub import GenImgRequest, GenImgResponse, GenTxtRequest
-from services.aihub import AIHubService, InvalidImageInputError
+from schemas.auth import UserResponse
+from services.aihub import AICapacityError, AIHubService, InvalidImageInputError
+from services.usage_accounting import organization_for_user
 from sse_starlette.sse import EventSourceResponse
 
 logger = logging.getLogger(__name__)
@@ -93,12 +96,22 @@ def extract_error_message(error: Any) -> str:
     return error_str
 
 
+def _capacity_exception(error: AICapacityError) -> HTTPException:
+    """503 with Retry-After, so clients back off instead of piling up."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=error.message,
+        headers={"Retry-After": str(max(error.retry_after, 1))},
+    )
+
+
 router = APIRouter(prefix="/api/v1/aihub", tags=["aihub"])
 
 
 @router.post("/gentxt")
 async def generate_text(
     request: GenTxtRequest,
+    current_user: Optional[UserResponse] = Depends(get_current_user_optional),
 ):
     """
     Generate Text endpoint (supports text and image input).
@@ -116,13 +129,15 @@ async def generate_text(
     """
     try:
         service = AIHubService()
+        # Token usage is charged to the caller's organization, when known
+        organization_id = await organization_for_user(str(current_user.id)) if current_user else None
 
         # Decide response mode based on the `stream` parameter
         if request.stream:
             # Streaming response - wrap content in JSON for SSE
             async def event_generator():
                 try:
-                    async for content in service.gentxt_stream(request):
+                    async for content in service.gentxt_stream(request, organization_id=organization_id):
                         yield json.dumps({"content": content})
                 except Exception as e:
                     logger.error(f"Stream error: {e}")
@@ -133,9 +148,12 @@ async def generate_text(
             return EventSourceResponse(event_generator(), media_type="text/event-stream")
         else:
             # Non-streaming response
-            response = await service.gentxt(request)
+            response = await service.gentxt(request, organization_id=organization_id)
             return response
 
+    except AICapacityError as e:
+        logger.warning(f"AI capacity exceeded: {e}")
+        raise _capacity_exception(e)
     except ValueError as e:
         logger.error(f"AI service configuration error: {e}")
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=extract_error_message(e))
@@ -150,6 +168,7 @@ async def generate_text(
 @router.post("/genimg", response_model=GenImgResponse)
 async def generate_image(
     request: GenImgRequest,
+    current_user: UserResponse = Depends(get_current_user),
 ):
     """
     Text-to-Image / Image-to-Image endpoint.
@@ -162,7 +181,7 @@ async def generate_image(
     - gemini-3-pro-image-preview: higher quality image generation/editing
 
     Parameters:
-    - image: optional input image(s). Supports a base64 data URI string or a list of base64 data URIs. If provided, runs image editing (img2img).
+    - image: optional input image(s). Supports a base64 data URI or an `oss://<bucket>/<key>` reference to a previous genimg output, or a list of them. If provided, runs image editing (img2img).
     - size: image size (1024x1024 / 1024x1792 / 1792x1024)
     - quality: image quality (standard / hd). Only effective for text-to-image; ignored when `image` is provided.
     - n: number of images to generate (1-4)
@@ -171,6 +190,9 @@ async def generate_image(
         service = AIHubService()
         return await service.genimg(request)
 
+    except AICapacityError as e:
+        logger.warning(f"AI capacity exceeded: {e}")
+        raise _capacity_exception(e)
     except InvalidImageInputError as e:
         logger.warning(f"Invalid image input: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from services.app_settings import App_settingsService
 from services.audit_service import AuditService
+from services.settings_store import get_settings_store
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
 
@@ -206,6 +207,8 @@ async def create_app_settings(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_app()
+        
         logger.info(f"App_settings created successfully with id: {result.id}")
         return result
     except ValueError as e:
@@ -248,6 +251,8 @@ async def create_app_settingss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_app()
+        
         logger.info(f"Batch created {len(results)} app_settingss successfully")
         return results
     except Exception as e:
@@ -295,6 +300,8 @@ async def update_app_settingss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_app()
+        
         logger.info(f"Batch updated {len(results)} app_settingss successfully")
         return results
     except Exception as e:
@@ -342,6 +349,8 @@ async def update_app_settings(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_app()
+        
         logger.info(f"App_settings {id} updated successfully")
         return result
     except HTTPException:
@@ -390,6 +399,8 @@ async def delete_app_settingss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_app()
+        
         logger.info(f"Batch deleted {deleted_count} app_settingss successfully")
         return {"message": f"Successfully deleted {deleted_count} app_settingss", "deleted_count": deleted_count}
     except Exception as e:
@@ -433,6 +444,8 @@ async def delete_app_settings(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_app()
+        
         logger.info(f"App_settings {id} deleted successfully")
         return {"message": "App_settings deleted successfully", "id": id}
     except HTTPException:
@@ -1,22 +1,50 @@
 """
 Biometric Indicators API Router
 Provides endpoints for retrieving biometric indicator information and ranges
-Uses ONLY Supabase API (centralized method) - NO SQLAlchemy
+Served from the reference data cache (loaded via Supabase API) - NO SQLAlchemy
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import Dict, Any
 import logging
 
-from core.supabase_client import get_supabase_admin
+from core.config import settings
+from core.http_cache import cached_json_response
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
+from services.reference_data import get_reference_data_service
 
 router = APIRouter(prefix="/api/v1/biometric-indicators", tags=["biometric-indicators"])
 logger = logging.getLogger(__name__)
 
+# Returned when the table is empty or unreachable
+DEFAULT_RISK_RANGES = {
+    "heart_rate": {
+        "baja": [40, 59],
+        "normal": [60, 100],
+        "alta": [101, 140]
+    },
+    "bmi": {
+        "bajo_peso": [0, 18.4],
+        "normal": [18.5, 24.9],
+        "sobrepeso": [25.0, 29.9],
+        "obesidad": [30.0, 100]
+    },
+    "sdnn": {
+        "baja": [0, 49],
+        "normal": [50, 100],
+        "alta": [101, 200]
+    },
+    "rmssd": {
+        "baja": [0, 29],
+        "normal": [30, 80],
+        "alta": [81, 200]
+    }
+}
+
 
 @router.get("/ranges", response_model=Dict[str, Any])
 async def get_biometric_indicator_ranges(
+    request: Request,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
@@ -33,85 +61,40 @@ async def get_biometric_indicator_ranges(
     try:
         logger.info(f"📊 [Ranges] User {current_user.id} requesting biometric indicator ranges")
         
-        # Use centralized Supabase admin client
-        supabase = get_supabase_admin()
-        
-        response = supabase.table('param_biometric_indicators_info')\
-            .select('indicator_code, risk_ranges')\
-            .not_.is_('risk_ranges', 'null')\
-            .execute()
-        
-        if not response.data:
-            logger.warning("No biometric indicators found in database")
-            # Return default ranges if table is empty
-            return {
-                "heart_rate": {
-                    "baja": [40, 59],
-                    "normal": [60, 100],
-                    "alta": [101, 140]
-                },
-                "bmi": {
-                    "bajo_peso": [0, 18.4],
-                    "normal": [18.5, 24.9],
-                    "sobrepeso": [25.0, 29.9],
-                    "obesidad": [30.0, 100]
-                },
-                "sdnn": {
-                    "baja": [0, 49],
-                    "normal": [50, 100],
-                    "alta": [101, 200]
-                },
-                "rmssd": {
-                    "baja": [0, 29],
-                    "normal": [30, 80],
-                    "alta": [81, 200]
-                }
-            }
+        indicators = await get_reference_data_service().get_items('param_biometric_indicators_info')
         
         # Build response dictionary
         ranges_dict = {}
-        for item in response.data:
+        for item in indicators:
             indicator_code = item.get('indicator_code')
             risk_ranges = item.get('risk_ranges')
             
             if indicator_code and risk_ranges:
                 ranges_dict[indicator_code] = risk_ranges
         
+        if not ranges_dict:
+            logger.warning("No biometric indicators found in database")
+            # Return default ranges if table is empty
+            return DEFAULT_RISK_RANGES
+        
         logger.info(f"✅ [Ranges] Retrieved risk ranges for {len(ranges_dict)} indicators")
-        return ranges_dict
+        return cached_json_response(
+            request,
+            ranges_dict,
+            cache_control=settings.reference_data_cache_control,
+        )
         
     except Exception as e:
         logger.error(f"❌ [Ranges] Error retrieving biometric indicator ranges: {e}")
         # Return default ranges on error
         logger.warning("⚠️ [Ranges] Returning default ranges due to error")
-        return {
-            "heart_rate": {
-                "baja": [40, 59],
-                "normal": [60, 100],
-                "alta": [101, 140]
-            },
-            "bmi": {
-                "bajo_peso": [0, 18.4],
-                "normal": [18.5, 24.9],
-                "sobrepeso": [25.0, 29.9],
-                "obesidad": [30.0, 100]
-            },
-            "sdnn": {
-                "baja": [0, 49],
-                "normal": [50, 100],
-                "alta": [101, 200]
-            },
-            "rmssd": {
-                "baja": [0, 29],
-                "normal": [30, 80],
-                "alta": [81, 200]
-            }
-        }
+        return DEFAULT_RISK_RANGES
 
 
 @router.get("/info/{indicator_code}")
 async def get_biometric_indicator_info(
     indicator_code: str,
+    request: Request,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
@@ -126,26 +109,21 @@ async def get_biometric_indicator_info(
     try:
         logger.info(f"📊 [Info] User {current_user.id} requesting info for indicator: {indicator_code}")
         
-        # Use centralized Supabase admin client
-        supabase = get_supabase_admin()
-        
-        response = supabase.table('param_biometric_indicators_info')\
-            .select('*')\
-            .eq('indicator_code', indicator_code)\
-            .execute()
+        indicators = await get_reference_data_service().get_items('param_biometric_indicators_info')
+        matches = [item for item in indicators if item.get('indicator_code') == indicator_code]
         
-        if not response.data or len(response.data) == 0:
+        if not matches:
             logger.warning(f"⚠️ [Info] Indicator '{indicator_code}' not found")
             raise HTTPException(
                 status_code=404,
                 detail=f"Indicator '{indicator_code}' not found"
             )
         
-        indicator = response.data[0]
+        indicator = matches[0]
         
         logger.info(f"✅ [Info] Successfully retrieved info for indicator: {indicator_code}")
         
-        return {
+        info = {
             "indicator_code": indicator.get('indicator_code'),
             "display_name": indicator.get('display_name'),
             "indicator_name": indicator.get('indicator_name'),
@@ -159,6 +137,11 @@ async def get_biometric_indicator_info(
             "risk_ranges": indicator.get('risk_ranges'),
             "is_clinical": indicator.get('is_clinical')
         }
+        return cached_json_response(
+            request,
+            info,
+            cache_control=settings.reference_data_cache_control,
+        )
         
     except HTTPException:
         raise
@@ -5,12 +5,15 @@ from typing import List, Optional
 from datetime import datetime, date
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
+from core.serialization import model_json_response
 from services.biometric_measurements import Biometric_measurementsService
+from services.biometric_ingest import BiometricIngestService
 from services.audit_service import AuditService
+from services.dashboard_service_supabase import invalidate_dashboards_for_users
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
 
@@ -130,6 +133,28 @@ class Biometric_measurementsBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class Biometric_measurementsIngestItem(BaseModel):
+    """Raw DeepAffex result to ingest"""
+    user_id: Optional[str] = None
+    measurement_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    result: dict
+
+
+class Biometric_measurementsIngestRequest(BaseModel):
+    """Batch ingest request"""
+    items: List[Biometric_measurementsIngestItem] = Field(..., min_length=1, max_length=5000)
+
+
+class Biometric_measurementsIngestResponse(BaseModel):
+    """Batch ingest summary"""
+    received: int
+    inserted: int
+    duplicates: int
+    errors: List[dict] = []
+    wellness_index_avg: Optional[float] = None
+
+
 # ---------- NEW: Custom API endpoints for frontend ----------
 @router.get("/latest/{user_id}", response_model=Optional[Biometric_measurementsResponse])
 async def get_latest_measurement(
@@ -167,7 +192,7 @@ async def get_measurement_history(
     try:
         results = await service.get_history_by_user(user_id, limit=limit)
         logger.info(f"Found {len(results)} measurements for user {user_id}")
-        return results
+        return model_json_response(List[Biometric_measurementsResponse], results)
     except Exception as e:
         logger.error(f"Error fetching measurement history for user {user_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -205,7 +230,7 @@ async def query_biometric_measurementss(
             user_id=str(current_user.id),
         )
         logger.debug(f"Found {result['total']} biometric_measurementss")
-        return result
+        return model_json_response(Biometric_measurementsListResponse, result)
     except HTTPException:
         raise
     except Exception as e:
@@ -242,7 +267,7 @@ async def query_biometric_measurementss_all(
             sort=sort
         )
         logger.debug(f"Found {result['total']} biometric_measurementss")
-        return result
+        return model_json_response(Biometric_measurementsListResponse, result)
     except HTTPException:
         raise
     except Exception as e:
@@ -304,6 +329,9 @@ async def create_biometric_measurements(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        # Team/organization dashboards include the owner's scans
+        await invalidate_dashboards_for_users([result.user_id])
+        
         logger.info(f"Biometric_measurements created successfully with id: {result.id}")
         return result
     except ValueError as e:
@@ -346,6 +374,9 @@ async def create_biometric_measurementss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        # Team/organization dashboards include the owners' scans
+        await invalidate_dashboards_for_users(result.user_id for result in results)
+        
         logger.info(f"Batch created {len(results)} biometric_measurementss successfully")
         return results
     except Exception as e:
@@ -354,6 +385,34 @@ async def create_biometric_measurementss_batch(
         raise HTTPException(status_code=500, detail=f"Batch create failed: {str(e)}")
 
 
+@router.post("/ingest", response_model=Biometric_measurementsIngestResponse, status_code=201)
+async def ingest_biometric_measurements(
+    request: Biometric_measurementsIngestRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ingest a batch of raw DeepAffex results in one pass: vitals and AI indices
+    are extracted, wellness index and risk flags derived, and all rows bulk-inserted.
+    Measurements already stored (same measurement_id) are skipped.
+    """
+    logger.debug(f"Ingesting {len(request.items)} DeepAffex results")
+    
+    service = BiometricIngestService(db)
+    try:
+        result = await service.ingest(
+            [item.model_dump() for item in request.items],
+            caller_id=str(current_user.id),
+        )
+        logger.info(f"Ingested {result['inserted']} biometric_measurementss successfully")
+        return result
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in batch ingest: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch ingest failed: {str(e)}")
+
+
 @router.put("/batch", response_model=List[Biometric_measurementsResponse])
 async def update_biometric_measurementss_batch(
     request: Biometric_measurementsBatchUpdateRequest,
@@ -393,6 +452,9 @@ async def update_biometric_measurementss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        # Team/organization dashboards include the owners' scans
+        await invalidate_dashboards_for_users(result.user_id for result in results)
+        
         logger.info(f"Batch updated {len(results)} biometric_measurementss successfully")
         return results
     except Exception as e:
@@ -440,6 +502,9 @@ async def update_biometric_measurements(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        # Team/organization dashboards include the owner's scans
+        await invalidate_dashboards_for_users([old_entity.user_id])
+        
         logger.info(f"Biometric_measurements {id} updated successfully")
         return result
     except HTTPException:
@@ -463,6 +528,7 @@ async def delete_biometric_measurementss_batch(
     
     service = Biometric_measurementsService(db)
     deleted_count = 0
+    owners = set()
     
     try:
         for item_id in request.ids:
@@ -473,6 +539,8 @@ async def delete_biometric_measurementss_batch(
             success = await service.delete(item_id, user_id=str(current_user.id))
             if success:
                 deleted_count += 1
+                if old_entity:
+                    owners.add(old_entity.user_id)
                 
                 # Audit logging
                 try:
@@ -488,6 +556,9 @@ async def delete_biometric_measurementss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        # Team/organization dashboards include the owners' scans
+        await invalidate_dashboards_for_users(owners)
+        
         logger.info(f"Batch deleted {deleted_count} biometric_measurementss successfully")
         return {"message": f"Successfully deleted {deleted_count} biometric_measurementss", "deleted_count": deleted_count}
     except Exception as e:
@@ -531,6 +602,9 @@ async def delete_biometric_measurements(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        # Team/organization dashboards include the owner's scans
+        await invalidate_dashboards_for_users([old_entity.user_id])
+        
         logger.info(f"Biometric_measurements {id} deleted successfully")
         return {"message": "Biometric_measurements deleted successfully", "id": id}
     except HTTPException:
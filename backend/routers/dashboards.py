@@ -2,19 +2,156 @@
 Dashboard API Router
 Provides aggregated data for different dashboard views including evolution charts
 MIGRATED TO SUPABASE API - NO SQLAlchemy
+
+Employee and evolution endpoints support conditional GET: a cheap data version
+(max timestamp + row count of the underlying table) is turned into an ETag /
+Last-Modified pair and checked before the heavy queries run.
+
+Leader, HR and evolution endpoints serve data that is identical for every
+viewer of a department/organization. Their scope computations (queries and
+payload building) go through a single-flight group keyed by scope:
+concurrent identical requests share one computation (run in a worker
+thread), so load scales with distinct scopes, not viewers. Only the
+viewer's own profile is read per request. The leader and HR scope payloads
+are also kept in the shared dashboard cache (services.dashboard_service_supabase),
+invalidated on profile, measurement and insight writes.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Hashable, Optional, Tuple
+import asyncio
 import logging
 
+from core.cache import SingleFlight
+from core.http_cache import (
+    is_not_modified,
+    not_modified_response,
+    parse_timestamp,
+    set_validator_headers,
+    version_etag,
+)
+from core.serialization import FastJSONResponse
 from core.supabase_client import get_supabase_admin
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
+from services.dashboard_service_supabase import get_dashboard_cache
 
 router = APIRouter(prefix="/api/v1/dashboards", tags=["dashboards"])
 logger = logging.getLogger(__name__)
 
+# Polling clients must revalidate every time; the validators make that cheap
+DASHBOARD_CACHE_CONTROL = "private, no-cache"
+
+_scope_flight = SingleFlight("dashboard_scopes")
+
+
+async def _coalesced(key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+    """Run blocking ``fn(*args)`` off the event loop, shared by concurrent callers of ``key``."""
+    return await _scope_flight.do(key, lambda: asyncio.to_thread(fn, *args))
+
+
+async def _cached_scope(
+    kind: str,
+    organization_id: Optional[str],
+    department_id: Optional[str],
+    fn: Callable[..., Any],
+    *args: Any,
+) -> Any:
+    """
+    Scope payload from the shared dashboard cache (stale-while-revalidate),
+    built with ``_coalesced`` on a miss. Keys follow
+    ``invalidate_dashboard_scope``: (kind, organization, department, window).
+    """
+    key = (
+        kind,
+        str(organization_id) if organization_id else None,
+        str(department_id) if department_id else None,
+        None,
+    )
+    return await get_dashboard_cache().get_or_load_swr(key, lambda: _coalesced(key, fn, *args))
+
+
+def _table_version(table: str, column: str, **filters: Any) -> Tuple[Optional[str], int]:
+    """
+    Cheap data version of a table scope: (max(column), row count).
+    One indexed single-row query instead of fetching the whole scope.
+    """
+    supabase = get_supabase_admin()
+    query = supabase.table(table).select(column, count='exact')
+    for field, value in filters.items():
+        query = query.eq(field, value)
+    # Postgres sorts NULLs first on DESC; a single NULL row would pin the version.
+    # Spelled out as PostgREST order syntax since `nullsfirst=False` adds no modifier.
+    response = query.order(f"{column}.desc.nullslast").limit(1).execute()
+    latest = response.data[0].get(column) if response.data else None
+    return latest, (response.count or 0)
+
+
+def _build_leader_scope(department_id: str) -> dict:
+    """
+    Team part of the leader dashboard: identical for every viewer of the
+    department (blocking; run via _coalesced).
+    """
+    supabase = get_supabase_admin()
+    team_response = supabase.table('user_profiles')\
+        .select('*')\
+        .eq('department_id', department_id)\
+        .execute()
+    team_members = team_response.data
+    
+    return {
+        "team_metrics": {
+            "total_members": len(team_members),
+            "scans_this_week": 0,
+            "average_stress": None,
+            "high_risk_count": 0,
+        },
+        "team_members": [
+            {
+                "id": member.get('id'),
+                "full_name": member.get('full_name'),
+                "email": member.get('email'),
+                "role": member.get('role'),
+            }
+            for member in team_members
+        ]
+    }
+
+
+def _build_hr_scope(organization_id: str) -> dict:
+    """
+    Organization part of the HR dashboard: identical for every HR viewer of
+    the organization (blocking; run via _coalesced).
+    """
+    supabase = get_supabase_admin()
+    employees_response = supabase.table('user_profiles')\
+        .select('*')\
+        .eq('organization_id', organization_id)\
+        .execute()
+    employees = employees_response.data
+    
+    # Count unique departments
+    unique_departments = set(e.get('department_id') for e in employees if e.get('department_id'))
+    
+    return {
+        "organization_metrics": {
+            "total_employees": len(employees),
+            "scans_this_month": 0,
+            "average_wellness": None,
+            "departments_count": len(unique_departments),
+        },
+        "employees": [
+            {
+                "id": emp.get('id'),
+                "full_name": emp.get('full_name'),
+                "email": emp.get('email'),
+                "role": emp.get('role'),
+                "department_id": emp.get('department_id'),
+            }
+            for emp in employees
+        ]
+    }
+
 
 # =====================================================
 # EMPLOYEE DASHBOARD ENDPOINTS
@@ -22,6 +159,8 @@ logger = logging.getLogger(__name__)
 
 @router.get("/employee")
 async def get_employee_dashboard(
+    request: Request,
+    response: Response,
     current_user: UserResponse = Depends(get_current_user),
 ):
     """
@@ -48,6 +187,14 @@ async def get_employee_dashboard(
         profile = profile_response.data[0]
         logger.info(f"✅ DASHBOARD DEBUG - Found profile: {profile.get('full_name')}")
         
+        # Conditional GET: skip the measurements query when nothing changed
+        latest_at, total_scans = _table_version('biometric_measurements', 'created_at', user_id=str(current_user.id))
+        etag = version_etag('employee_dashboard', profile, latest_at, total_scans)
+        last_modified = parse_timestamp(latest_at)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        set_validator_headers(response, etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        
         # Get biometric measurements for this user
         measurements_response = supabase.table('biometric_measurements')\
             .select('*')\
@@ -133,6 +280,8 @@ async def get_employee_dashboard(
 
 @router.get("/employee/evolution")
 async def get_employee_evolution(
+    request: Request,
+    response: Response,
     months: int = Query(default=6, ge=1, le=24, description="Number of months to fetch"),
     current_user: UserResponse = Depends(get_current_user),
 ):
@@ -146,15 +295,16 @@ async def get_employee_evolution(
         
         supabase = get_supabase_admin()
         
-        # First, check if user has ANY data at all
-        count_response = supabase.table('biometric_measurements')\
-            .select('id', count='exact')\
-            .eq('user_id', str(current_user.id))\
-            .execute()
-        
-        total_count = count_response.count if hasattr(count_response, 'count') else 0
+        # First, check if user has ANY data at all (the same query yields the data version)
+        latest_at, total_count = _table_version('biometric_measurements', 'created_at', user_id=str(current_user.id))
         logger.info(f"📊 [EMPLOYEE EVOLUTION] Total measurements: {total_count}")
         
+        etag = version_etag('employee_evolution', str(current_user.id), months, latest_at, total_count)
+        last_modified = parse_timestamp(latest_at)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        set_validator_headers(response, etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        
         if total_count == 0:
             logger.warning(f"⚠️ [EMPLOYEE EVOLUTION] No data found for user {current_user.id}")
             return {
@@ -321,36 +471,24 @@ async def get_leader_dashboard(
                 "message": "No department assigned"
             }
         
-        team_response = supabase.table('user_profiles')\
-            .select('*')\
-            .eq('department_id', profile.get('department_id'))\
-            .execute()
-        
-        team_members = team_response.data
+        scope = await _cached_scope(
+            'leader_team',
+            profile.get('organization_id'),
+            profile.get('department_id'),
+            _build_leader_scope,
+            profile.get('department_id'),
+        )
         
-        return {
+        # Team lists can be long: render directly, skipping jsonable_encoder
+        return FastJSONResponse(content={
             "profile": {
                 "id": profile.get('id'),
                 "full_name": profile.get('full_name'),
                 "role": profile.get('role'),
                 "department_id": profile.get('department_id'),
             },
-            "team_metrics": {
-                "total_members": len(team_members),
-                "scans_this_week": 0,
-                "average_stress": None,
-                "high_risk_count": 0,
-            },
-            "team_members": [
-                {
-                    "id": member.get('id'),
-                    "full_name": member.get('full_name'),
-                    "email": member.get('email'),
-                    "role": member.get('role'),
-                }
-                for member in team_members
-            ]
-        }
+            **scope,
+        })
         
     except HTTPException:
         raise
@@ -364,6 +502,8 @@ async def get_leader_dashboard(
 
 @router.get("/leader/team-evolution")
 async def get_team_evolution(
+    request: Request,
+    response: Response,
     months: int = Query(default=6, ge=1, le=24, description="Number of months to fetch"),
     current_user: UserResponse = Depends(get_current_user),
 ):
@@ -391,46 +531,20 @@ async def get_team_evolution(
         department_id = profile_response.data[0].get('department_id')
         logger.info(f"📊 [TEAM EVOLUTION] Department ID: {department_id}")
         
-        # Get data from view
-        view_response = supabase.table('vw_department_insight_timeline')\
-            .select('*')\
-            .eq('department_id', department_id)\
-            .order('created_at', desc=False)\
-            .execute()
-        
-        rows = view_response.data
-        logger.info(f"📊 [TEAM EVOLUTION] Query executed, found {len(rows)} months of data from vw_department_insight_timeline")
-        
-        data = [
-            {
-                "analysis_period": row.get('created_at', '')[:7] if row.get('created_at') else None,
-                "month_start": row.get('created_at'),
-                "wellness_index": row.get('wellness_index'),
-                "avg_stress": row.get('avg_stress'),
-                "avg_fatigue": row.get('avg_fatigue'),
-                "avg_recovery": row.get('avg_recovery'),
-                "avg_cognitive_load": row.get('avg_cognitive_load'),
-                "burnout_risk_score": row.get('burnout_risk_score'),
-                "employees_scanned": row.get('employee_count', 0),
-                "total_scans": row.get('employee_count', 0),
-            }
-            for row in rows
-        ]
-        
-        # Filter by requested months
-        if len(data) > months:
-            data = data[-months:]
-        
-        logger.info(f"✅ [TEAM EVOLUTION] Returning {len(data)} data points")
-        if data:
-            logger.info(f"📊 [TEAM EVOLUTION] Sample data point: {data[0]}")
-        
-        return {
-            "data": data,
-            "period": f"last_{months}_months" if len(data) > 0 else "all_available_data",
-            "department_id": department_id,
-            "total_points": len(data)
-        }
+        latest_at, total_rows = _table_version('vw_department_insight_timeline', 'created_at', department_id=department_id)
+        etag = version_etag('team_evolution', department_id, months, latest_at, total_rows)
+        last_modified = parse_timestamp(latest_at)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        set_validator_headers(response, etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        
+        # The data version is part of the key, so a joined call never returns older data
+        return await _coalesced(
+            ('team_evolution', department_id, months, latest_at, total_rows),
+            _build_team_evolution,
+            department_id,
+            months,
+        )
         
     except HTTPException:
         raise
@@ -444,6 +558,52 @@ async def get_team_evolution(
         )
 
 
+def _build_team_evolution(department_id: str, months: int) -> dict:
+    """Team evolution payload of a department (blocking; run via _coalesced)."""
+    supabase = get_supabase_admin()
+    
+    # Get data from view
+    view_response = supabase.table('vw_department_insight_timeline')\
+        .select('*')\
+        .eq('department_id', department_id)\
+        .order('created_at', desc=False)\
+        .execute()
+    
+    rows = view_response.data
+    logger.info(f"📊 [TEAM EVOLUTION] Query executed, found {len(rows)} months of data from vw_department_insight_timeline")
+    
+    data = [
+        {
+            "analysis_period": row.get('created_at', '')[:7] if row.get('created_at') else None,
+            "month_start": row.get('created_at'),
+            "wellness_index": row.get('wellness_index'),
+            "avg_stress": row.get('avg_stress'),
+            "avg_fatigue": row.get('avg_fatigue'),
+            "avg_recovery": row.get('avg_recovery'),
+            "avg_cognitive_load": row.get('avg_cognitive_load'),
+            "burnout_risk_score": row.get('burnout_risk_score'),
+            "employees_scanned": row.get('employee_count', 0),
+            "total_scans": row.get('employee_count', 0),
+        }
+        for row in rows
+    ]
+    
+    # Filter by requested months
+    if len(data) > months:
+        data = data[-months:]
+    
+    logger.info(f"✅ [TEAM EVOLUTION] Returning {len(data)} data points")
+    if data:
+        logger.info(f"📊 [TEAM EVOLUTION] Sample data point: {data[0]}")
+    
+    return {
+        "data": data,
+        "period": f"last_{months}_months" if len(data) > 0 else "all_available_data",
+        "department_id": department_id,
+        "total_points": len(data)
+    }
+
+
 # =====================================================
 # HR DASHBOARD ENDPOINTS
 # =====================================================
@@ -490,40 +650,24 @@ async def get_hr_dashboard(
                 "message": "No organization assigned"
             }
         
-        employees_response = supabase.table('user_profiles')\
-            .select('*')\
-            .eq('organization_id', profile.get('organization_id'))\
-            .execute()
-        
-        employees = employees_response.data
-        
-        # Count unique departments
-        unique_departments = set(e.get('department_id') for e in employees if e.get('department_id'))
+        scope = await _cached_scope(
+            'hr_employees',
+            profile.get('organization_id'),
+            None,
+            _build_hr_scope,
+            profile.get('organization_id'),
+        )
         
-        return {
+        # Every employee of the organization: render directly, skipping jsonable_encoder
+        return FastJSONResponse(content={
             "profile": {
                 "id": profile.get('id'),
                 "full_name": profile.get('full_name'),
                 "role": profile.get('role'),
                 "organization_id": profile.get('organization_id'),
             },
-            "organization_metrics": {
-                "total_employees": len(employees),
-                "scans_this_month": 0,
-                "average_wellness": None,
-                "departments_count": len(unique_departments),
-            },
-            "employees": [
-                {
-                    "id": emp.get('id'),
-                    "full_name": emp.get('full_name'),
-                    "email": emp.get('email'),
-                    "role": emp.get('role'),
-                    "department_id": emp.get('department_id'),
-                }
-                for emp in employees
-            ]
-        }
+            **scope,
+        })
         
     except HTTPException:
         raise
@@ -537,6 +681,8 @@ async def get_hr_dashboard(
 
 @router.get("/hr/organization-evolution")
 async def get_organization_evolution(
+    request: Request,
+    response: Response,
     months: int = Query(default=12, ge=1, le=24, description="Number of months to fetch"),
     current_user: UserResponse = Depends(get_current_user),
 ):
@@ -564,45 +710,19 @@ async def get_organization_evolution(
         organization_id = profile_response.data[0].get('organization_id')
         logger.info(f"📊 [ORG EVOLUTION] Organization ID: {organization_id}")
         
-        # Get data from organization_insights
-        insights_response = supabase.table('organization_insights')\
-            .select('*')\
-            .eq('organization_id', organization_id)\
-            .order('analysis_date', desc=False)\
-            .execute()
-        
-        rows = insights_response.data
-        logger.info(f"📊 [ORG EVOLUTION] Query executed, found {len(rows)} months of data from organization_insights")
-        
-        data = [
-            {
-                "month": row.get('analysis_date', '')[:7] if row.get('analysis_date') else None,
-                "analysis_date": row.get('analysis_date'),
-                "wellness_index": float(100 - (row.get('stress_index', 0) * 20)) if row.get('stress_index') is not None else None,
-                "stress_index": row.get('stress_index'),
-                "burnout_risk": row.get('burnout_risk'),
-                "sleep_index": row.get('sleep_index'),
-                "actuarial_risk": row.get('actuarial_risk'),
-                "claim_risk": row.get('claim_risk'),
-                "total_employees": row.get('total_employees', 0),
-            }
-            for row in rows
-        ]
-        
-        # Filter by requested months
-        if len(data) > months:
-            data = data[-months:]
-        
-        logger.info(f"✅ [ORG EVOLUTION] Returning {len(data)} data points")
-        if data:
-            logger.info(f"📊 [ORG EVOLUTION] Sample data point: {data[0]}")
-        
-        return {
-            "data": data,
-            "period": f"last_{months}_months" if len(data) > 0 else "all_available_data",
-            "organization_id": organization_id,
-            "total_points": len(data)
-        }
+        latest_at, total_rows = _table_version('organization_insights', 'updated_at', organization_id=organization_id)
+        etag = version_etag('organization_evolution', organization_id, months, latest_at, total_rows)
+        last_modified = parse_timestamp(latest_at)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        set_validator_headers(response, etag, DASHBOARD_CACHE_CONTROL, last_modified)
+        
+        return await _coalesced(
+            ('organization_evolution', organization_id, months, latest_at, total_rows),
+            _build_organization_evolution,
+            organization_id,
+            months,
+        )
         
     except HTTPException:
         raise
@@ -616,6 +736,51 @@ async def get_organization_evolution(
         )
 
 
+def _build_organization_evolution(organization_id: str, months: int) -> dict:
+    """Organization evolution payload (blocking; run via _coalesced)."""
+    supabase = get_supabase_admin()
+    
+    # Get data from organization_insights
+    insights_response = supabase.table('organization_insights')\
+        .select('*')\
+        .eq('organization_id', organization_id)\
+        .order('analysis_date', desc=False)\
+        .execute()
+    
+    rows = insights_response.data
+    logger.info(f"📊 [ORG EVOLUTION] Query executed, found {len(rows)} months of data from organization_insights")
+    
+    data = [
+        {
+            "month": row.get('analysis_date', '')[:7] if row.get('analysis_date') else None,
+            "analysis_date": row.get('analysis_date'),
+            "wellness_index": float(100 - (row.get('stress_index', 0) * 20)) if row.get('stress_index') is not None else None,
+            "stress_index": row.get('stress_index'),
+            "burnout_risk": row.get('burnout_risk'),
+            "sleep_index": row.get('sleep_index'),
+            "actuarial_risk": row.get('actuarial_risk'),
+            "claim_risk": row.get('claim_risk'),
+            "total_employees": row.get('total_employees', 0),
+        }
+        for row in rows
+    ]
+    
+    # Filter by requested months
+    if len(data) > months:
+        data = data[-months:]
+    
+    logger.info(f"✅ [ORG EVOLUTION] Returning {len(data)} data points")
+    if data:
+        logger.info(f"📊 [ORG EVOLUTION] Sample data point: {data[0]}")
+    
+    return {
+        "data": data,
+        "period": f"last_{months}_months" if len(data) > 0 else "all_available_data",
+        "organization_id": organization_id,
+        "total_points": len(data)
+    }
+
+
 # =====================================================
 # ADMIN DASHBOARD ENDPOINTS
 # =====================================================
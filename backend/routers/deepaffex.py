@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from dependencies.auth import get_current_user_optional
 from schemas.auth import UserResponse
-from services.deepaffex_service import DeepAffexService
+from services.deepaffex_service import get_deepaffex_service
 
 router = APIRouter(prefix="/api/v1/deepaffex", tags=["deepaffex"])
 
@@ -25,7 +25,7 @@ async def get_study_id(
         dict: Study ID response
     """
     try:
-        service = DeepAffexService()
+        service = get_deepaffex_service()
         result = await service.get_study_id()
         
         if result.get("status") != "200":
@@ -48,13 +48,13 @@ async def generate_token(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Generate authentication token for DeepAffex SDK
+    Authentication token for DeepAffex SDK (served from the process-wide token cache)
     
     Returns:
         dict: Token response with token and refreshToken
     """
     try:
-        service = DeepAffexService()
+        service = get_deepaffex_service()
         result = await service.generate_token()
         
         if result.get("status") != "200":
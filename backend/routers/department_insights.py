@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from services.department_insights import Department_insightsService
 from services.audit_service import AuditService
+from services.dashboard_service_supabase import invalidate_dashboards_for_department
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
 
@@ -232,6 +233,8 @@ async def create_department_insights(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        await invalidate_dashboards_for_department(data.department_id)
+        
         logger.info(f"Department_insights created successfully with id: {result.id}")
         return result
     except ValueError as e:
@@ -275,6 +278,9 @@ async def create_department_insightss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        for department_id in {str(result.department_id) for result in results}:
+            await invalidate_dashboards_for_department(department_id)
+        
         logger.info(f"Batch created {len(results)} department_insightss successfully")
         return results
     except Exception as e:
@@ -294,6 +300,7 @@ async def update_department_insightss_batch(
     
     service = Department_insightsService(db)
     results = []
+    touched_departments = set()
     
     try:
         for item in request.items:
@@ -306,6 +313,9 @@ async def update_department_insightss_batch(
             result = await service.update(item.id, update_dict, user_id=str(current_user.id))
             if result:
                 results.append(result)
+                touched_departments.add(str(result.department_id))
+                if old_entity:
+                    touched_departments.add(str(old_entity.department_id))
                 
                 # Audit logging
                 try:
@@ -323,6 +333,9 @@ async def update_department_insightss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        for department_id in touched_departments:
+            await invalidate_dashboards_for_department(department_id)
+        
         logger.info(f"Batch updated {len(results)} department_insightss successfully")
         return results
     except Exception as e:
@@ -371,6 +384,10 @@ async def update_department_insights(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        await invalidate_dashboards_for_department(str(old_entity.department_id))
+        if result and str(result.department_id) != str(old_entity.department_id):
+            await invalidate_dashboards_for_department(str(result.department_id))
+        
         logger.info(f"Department_insights {id} updated successfully")
         return result
     except HTTPException:
@@ -394,6 +411,7 @@ async def delete_department_insightss_batch(
     
     service = Department_insightsService(db)
     deleted_count = 0
+    touched_departments = set()
     
     try:
         for item_id in request.ids:
@@ -404,6 +422,8 @@ async def delete_department_insightss_batch(
             success = await service.delete(item_id, user_id=str(current_user.id))
             if success:
                 deleted_count += 1
+                if old_entity:
+                    touched_departments.add(str(old_entity.department_id))
                 
                 # Audit logging
                 try:
@@ -420,6 +440,9 @@ async def delete_department_insightss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        for department_id in touched_departments:
+            await invalidate_dashboards_for_department(department_id)
+        
         logger.info(f"Batch deleted {deleted_count} department_insightss successfully")
         return {"message": f"Successfully deleted {deleted_count} department_insightss", "deleted_count": deleted_count}
     except Exception as e:
@@ -464,6 +487,8 @@ async def delete_department_insights(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        await invalidate_dashboards_for_department(str(old_entity.department_id))
+        
         logger.info(f"Department_insights {id} deleted successfully")
         return {"message": "Department_insights deleted successfully", "id": id}
     except HTTPException:
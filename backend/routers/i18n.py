@@ -1,17 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
 from typing import Optional
 import logging
 
+from core.config import settings
 from core.database import get_db
+from core.http_cache import cached_json_response, compute_etag
+from dependencies.auth import get_admin_user
+from schemas.auth import UserResponse
+from services.i18n_bundles import get_i18n_bundle_service
 
 router = APIRouter(prefix="/api/v1/i18n", tags=["i18n"])
 logger = logging.getLogger(__name__)
 
+# Screens per /translations/batch request
+MAX_BATCH_SCREENS = 50
+
+
+class InvalidateBundlesRequest(BaseModel):
+    screen_code: Optional[str] = None
+    locale: Optional[str] = None
+    organization_id: Optional[str] = None
+
 
 @router.get("/translations")
 async def get_translations(
+    request: Request,
     screen_code: str = Query(..., description="Screen code (e.g., 'lobby', 'dashboard')"),
     locale: str = Query(..., description="Locale code (e.g., 'es', 'es-CR', 'en')"),
     organization_id: Optional[str] = Query(None, description="Organization ID for custom overrides"),
@@ -31,98 +47,95 @@ async def get_translations(
     1. Organization-specific overrides (i18n_overrides)
     2. Base translations (i18n_translations)
     3. Fallback to base locale (e.g., es-CR -> es)
+    
+    Bundles are served from cache with a content-hash ETag (304 on If-None-Match).
     """
     try:
         logger.info(f"Loading translations: screen_code={screen_code}, locale={locale}, org={organization_id}")
         
-        # Query to get translations with organization overrides
-        # Join: i18n_namespaces -> i18n_keys -> i18n_translations
-        # Left join: i18n_overrides (if organization_id provided)
-        query = text("""
-            WITH base_translations AS (
-                SELECT 
-                    k.key as translation_key,
-                    t.text as translation_text,
-                    t.locale,
-                    1 as priority
-                FROM i18n_keys k
-                JOIN i18n_namespaces n ON k.namespace_id = n.id
-                JOIN i18n_translations t ON t.key_id = k.id
-                WHERE n.screen_code = :screen_code
-                AND t.locale = :locale
-            ),
-            override_translations AS (
-                SELECT 
-                    k.key as translation_key,
-                    o.text as translation_text,
-                    o.locale,
-                    2 as priority
-                FROM i18n_keys k
-                JOIN i18n_namespaces n ON k.namespace_id = n.id
-                LEFT JOIN i18n_overrides o ON o.key_id = k.id
-                WHERE n.screen_code = :screen_code
-                AND o.locale = :locale
-                AND (:organization_id IS NULL OR o.organization_id = :organization_id)
-            ),
-            fallback_translations AS (
-                SELECT 
-                    k.key as translation_key,
-                    t.text as translation_text,
-                    t.locale,
-                    0 as priority
-                FROM i18n_keys k
-                JOIN i18n_namespaces n ON k.namespace_id = n.id
-                JOIN i18n_translations t ON t.key_id = k.id
-                WHERE n.screen_code = :screen_code
-                AND t.locale = :base_locale
-                AND NOT EXISTS (
-                    SELECT 1 FROM base_translations bt 
-                    WHERE bt.translation_key = k.key
-                )
-            )
-            SELECT DISTINCT ON (translation_key)
-                translation_key,
-                translation_text
-            FROM (
-                SELECT * FROM override_translations
-                UNION ALL
-                SELECT * FROM base_translations
-                UNION ALL
-                SELECT * FROM fallback_translations
-            ) combined
-            ORDER BY translation_key, priority DESC
-        """)
+        bundle = await get_i18n_bundle_service().get_bundle(db, screen_code, locale, organization_id)
+        
+        logger.info(f"✓ Loaded {len(bundle['translations'])} translations for {screen_code} ({locale})")
         
-        # Extract base locale for fallback (e.g., es-CR -> es)
-        base_locale = locale.split('-')[0] if '-' in locale else locale
-        
-        result = await db.execute(
-            query,
-            {
-                "screen_code": screen_code,
-                "locale": locale,
-                "base_locale": base_locale,
-                "organization_id": organization_id,
-            }
+        return cached_json_response(
+            request,
+            bundle["translations"],
+            etag=bundle["etag"],
+            cache_control=settings.i18n_cache_control,
         )
         
-        rows = result.fetchall()
+    except Exception as e:
+        logger.error(f"Failed to load translations: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to load translations: {str(e)}"
+        )
+
+
+@router.get("/translations/batch")
+async def get_translations_batch(
+    request: Request,
+    screen_codes: str = Query(..., description="Comma-separated screen codes (e.g., 'lobby,dashboard')"),
+    locale: str = Query(..., description="Locale code (e.g., 'es', 'es-CR', 'en')"),
+    organization_id: Optional[str] = Query(None, description="Organization ID for custom overrides"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get translations for several screens in one call (at most MAX_BATCH_SCREENS).
+    
+    Returns one flat dictionary per screen:
+    {
+        "lobby": {"lobby.login_welcome": "Bienvenido", ...},
+        "dashboard": {...}
+    }
+    """
+    codes = list(dict.fromkeys(code.strip() for code in screen_codes.split(",") if code.strip()))
+    if not codes:
+        raise HTTPException(status_code=400, detail="screen_codes cannot be empty")
+    if len(codes) > MAX_BATCH_SCREENS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SCREENS} screen_codes per request")
+    
+    try:
+        logger.info(f"Loading translation batch: screens={codes}, locale={locale}, org={organization_id}")
         
-        # Convert to flat dictionary
-        translations = {row.translation_key: row.translation_text for row in rows}
+        bundles = await get_i18n_bundle_service().get_bundles(db, codes, locale, organization_id)
         
-        logger.info(f"✓ Loaded {len(translations)} translations for {screen_code} ({locale})")
+        payload = {code: bundles[code]["translations"] for code in codes}
+        etag = compute_etag([[code, bundles[code]["etag"]] for code in codes])
         
-        return translations
+        return cached_json_response(
+            request,
+            payload,
+            etag=etag,
+            cache_control=settings.i18n_cache_control,
+        )
         
     except Exception as e:
-        logger.error(f"Failed to load translations: {e}")
+        logger.error(f"Failed to load translation batch: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to load translations: {str(e)}"
         )
 
 
+@router.post("/cache/invalidate")
+async def invalidate_translation_bundles(
+    data: InvalidateBundlesRequest,
+    current_user: UserResponse = Depends(get_admin_user),
+):
+    """
+    Drop cached bundles after i18n_translations or i18n_overrides change.
+    Each field narrows the invalidation; an empty body drops every bundle.
+    """
+    dropped = get_i18n_bundle_service().invalidate(
+        screen_code=data.screen_code,
+        locale=data.locale,
+        organization_id=data.organization_id,
+    )
+    logger.info(f"User {current_user.id} invalidated {dropped} i18n bundles ({data.model_dump()})")
+    return {"invalidated": dropped}
+
+
 @router.get("/locales")
 async def get_available_locales(
     screen_code: Optional[str] = Query(None, description="Filter by screen code"),
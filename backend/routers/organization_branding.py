@@ -6,16 +6,19 @@ Manage organization branding settings including logos, colors, and themes
 import logging
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.database import get_db
+from core.http_cache import cached_json_response
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
 from models.organization_branding import OrganizationBranding
 from models.organizations import Organizations
 from services.audit_service import AuditService
+from services.branding_cache import get_branding_cache, slug_from_host
 
 router = APIRouter(prefix="/api/v1/organization-branding", tags=["organization-branding"])
 
@@ -99,6 +102,9 @@ async def create_organization_branding(
         await db.commit()
         await db.refresh(db_branding)
         
+        # The slug may have been cached as unknown
+        get_branding_cache().invalidate([db_branding.slug])
+        
         return db_branding
     except Exception as e:
         await db.rollback()
@@ -139,6 +145,59 @@ async def get_organization_branding_by_query(
         )
 
 
+@router.get("/resolve")
+async def resolve_organization_branding(
+    request: Request,
+    slug: Optional[str] = Query(None, description="Organization slug"),
+    host: Optional[str] = Query(None, description="Host to resolve (defaults to the request host)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Resolve branding by slug or host for multitenant auto-detection.
+    
+    Public (runs before login) and served from an in-memory cache with
+    long-lived Cache-Control and an ETag, so first paint does not wait on the
+    database. `slug` wins over `host`; without either, the request's
+    X-Forwarded-Host / Host header is used.
+    """
+    # Resolved from the request headers: shared caches must key on them too
+    from_headers = not slug and not host
+    if not slug:
+        slug = slug_from_host(
+            host or request.headers.get("x-forwarded-host") or request.headers.get("host")
+        )
+    if not slug:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No organization slug could be resolved"
+        )
+    
+    try:
+        entry = await get_branding_cache().resolve(db, slug)
+    except Exception as e:
+        logging.error(f"Error resolving organization branding for slug '{slug}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to resolve organization branding: {str(e)}"
+        )
+    
+    if entry["branding"] is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Organization branding not found"
+        )
+    
+    response = cached_json_response(
+        request,
+        entry["branding"],
+        etag=entry["etag"],
+        cache_control=settings.branding_cache_control,
+    )
+    if from_headers:
+        response.headers["Vary"] = "Host, X-Forwarded-Host"
+    return response
+
+
 @router.get("/{organization_id}", response_model=OrganizationBrandingResponse)
 async def get_organization_branding(
     organization_id: str,
@@ -193,6 +252,8 @@ async def update_organization_branding(
                 detail="Organization branding not found"
             )
         
+        old_slug = db_branding.slug
+        
         # Update fields
         update_data = branding_update.dict(exclude_unset=True)
         if "social_links" in update_data and update_data["social_links"]:
@@ -204,6 +265,8 @@ async def update_organization_branding(
         await db.commit()
         await db.refresh(db_branding)
         
+        get_branding_cache().invalidate([old_slug, db_branding.slug])
+        
         return db_branding
     except HTTPException:
         raise
@@ -239,6 +302,8 @@ async def delete_organization_branding(
         await db.execute(delete(OrganizationBranding).where(OrganizationBranding.id == branding_id))
         await db.commit()
         
+        get_branding_cache().invalidate([db_branding.slug])
+        
         return None
     except HTTPException:
         raise
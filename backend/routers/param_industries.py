@@ -1,30 +1,23 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from core.database import get_db
+from fastapi import APIRouter, Depends, Request
+from core.config import settings
+from core.http_cache import cached_json_response
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
-from models.param_industries import ParamIndustry
+from services.reference_data import get_reference_data_service
 
 router = APIRouter(prefix="/api/v1/entities/param_industries", tags=["parameters"])
 
 
 @router.get("")
 async def list_industries(
+    request: Request,
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
     """List all industries"""
-    query = select(ParamIndustry).order_by(ParamIndustry.name)
-    result = await db.execute(query)
-    items = result.scalars().all()
-    
-    return {
-        "items": [
-            {
-                "id": item.id,
-                "name": item.name,
-            }
-            for item in items
-        ]
-    }
\ No newline at end of file
+    table = await get_reference_data_service().get("param_industries")
+    return cached_json_response(
+        request,
+        {"items": table["items"]},
+        etag=table["etag"],
+        cache_control=settings.reference_data_cache_control,
+    )
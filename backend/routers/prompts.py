@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from services.prompts import PromptsService
 from services.audit_service import AuditService
+from services.prompt_registry import get_prompt_registry
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
 
@@ -213,6 +214,7 @@ async def create_prompts(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_prompt_registry().invalidate()
         logger.info(f"Prompts created successfully with id: {result.id}")
         return result
     except ValueError as e:
@@ -256,6 +258,7 @@ async def create_promptss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_prompt_registry().invalidate()
         logger.info(f"Batch created {len(results)} promptss successfully")
         return results
     except Exception as e:
@@ -304,6 +307,7 @@ async def update_promptss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_prompt_registry().invalidate()
         logger.info(f"Batch updated {len(results)} promptss successfully")
         return results
     except Exception as e:
@@ -352,6 +356,7 @@ async def update_prompts(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_prompt_registry().invalidate()
         logger.info(f"Prompts {id} updated successfully")
         return result
     except HTTPException:
@@ -401,6 +406,7 @@ async def delete_promptss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_prompt_registry().invalidate()
         logger.info(f"Batch deleted {deleted_count} promptss successfully")
         return {"message": f"Successfully deleted {deleted_count} promptss", "deleted_count": deleted_count}
     except Exception as e:
@@ -445,6 +451,7 @@ async def delete_prompts(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_prompt_registry().invalidate()
         logger.info(f"Prompts {id} deleted successfully")
         return {"message": "Prompts deleted successfully", "id": id}
     except HTTPException:
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
+from core.serialization import model_json_response
 from services.recommendations import RecommendationsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -88,12 +89,7 @@ async def list_recommendations(
             sort=sort,
         )
         
-        return RecommendationListResponse(
-            items=[RecommendationResponse.model_validate(item) for item in result["items"]],
-            total=result["total"],
-            skip=result["skip"],
-            limit=result["limit"],
-        )
+        return model_json_response(RecommendationListResponse, result)
     except Exception as e:
         logger.error(f"Error listing recommendations: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,71 @@
+"""
+Reference Data Router
+Read access to cached parameter tables and explicit cache invalidation for admin writes
+"""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+
+from core.config import settings
+from core.http_cache import cached_json_response
+from dependencies.auth import get_admin_user, get_current_user
+from schemas.auth import UserResponse
+from services.reference_data import get_reference_data_service
+
+router = APIRouter(prefix="/api/v1/reference-data", tags=["reference-data"])
+logger = logging.getLogger(__name__)
+
+
+class InvalidateRequest(BaseModel):
+    table: Optional[str] = None
+
+
+@router.get("")
+async def list_reference_tables(
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """List the reference tables served from cache"""
+    return {"tables": get_reference_data_service().tables()}
+
+
+@router.get("/{table_name}")
+async def get_reference_table(
+    table_name: str,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """Get all rows of a reference table (ETag/304 aware)"""
+    try:
+        table = await get_reference_data_service().get(table_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown reference table: {table_name}")
+    except Exception as e:
+        logger.error(f"❌ [ReferenceData] Error loading {table_name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to load {table_name}: {str(e)}")
+
+    return cached_json_response(
+        request,
+        {"items": table["items"]},
+        etag=table["etag"],
+        cache_control=settings.reference_data_cache_control,
+    )
+
+
+@router.post("/invalidate")
+async def invalidate_reference_data(
+    data: InvalidateRequest,
+    current_user: UserResponse = Depends(get_admin_user),
+):
+    """
+    Drop cached reference data after an admin write (platform admins only).
+    Omit `table` to invalidate every table.
+    """
+    service = get_reference_data_service()
+    if data.table is not None and data.table not in service.tables():
+        raise HTTPException(status_code=404, detail=f"Unknown reference table: {data.table}")
+
+    service.invalidate(data.table)
+    logger.info(f"📚 [ReferenceData] User {current_user.id} invalidated {data.table or 'all tables'}")
+    return {"invalidated": data.table or "all"}
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from pydantic import BaseModel
 
 from core.database import get_db
+from core.http_cache import cached_json_response
 from dependencies.auth import get_current_user
 from models.auth import User
 from models.app_settings import App_settings
 from services.audit_service import AuditService
+from services.settings_store import get_settings_store
 import logging
 
 router = APIRouter(prefix="/api/v1/settings", tags=["settings"])
@@ -35,26 +39,39 @@ class SettingResponse(BaseModel):
 
 @router.get("/", response_model=List[SettingResponse])
 async def list_settings(
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all application settings"""
-    result = await db.execute(select(App_settings))
-    settings = result.scalars().all()
-    return settings
+    return await get_settings_store().get_app_rows()
+
+
+@router.get("/snapshot")
+async def get_settings_snapshot(
+    request: Request,
+    tenant_id: Optional[str] = Query(None, description="Tenant whose settings are merged over the global ones"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    All settings in effect for a tenant as one versioned snapshot.
+    The version doubles as ETag, so clients can poll with If-None-Match.
+    """
+    if tenant_id:
+        try:
+            tenant_id = str(uuid.UUID(tenant_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid tenant_id")
+
+    snapshot = await get_settings_store().snapshot(tenant_id)
+    return cached_json_response(request, snapshot.to_dict(), etag=snapshot.version)
 
 
 @router.get("/{setting_key}", response_model=SettingResponse)
 async def get_setting(
     setting_key: str,
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific setting by key"""
-    result = await db.execute(
-        select(App_settings).where(App_settings.setting_key == setting_key)
-    )
-    setting = result.scalar_one_or_none()
+    setting = await get_settings_store().get_app_setting(setting_key)
     if not setting:
         raise HTTPException(status_code=404, detail="Setting not found")
     return setting
@@ -82,6 +99,7 @@ async def create_setting(
     db.add(new_setting)
     await db.commit()
     await db.refresh(new_setting)
+    get_settings_store().invalidate_app()
     
     # Audit logging
     try:
@@ -124,6 +142,7 @@ async def update_setting(
     setting.setting_value = data.setting_value
     await db.commit()
     await db.refresh(setting)
+    get_settings_store().invalidate_app()
     
     # Audit logging
     try:
@@ -165,6 +184,7 @@ async def delete_setting(
     
     await db.delete(setting)
     await db.commit()
+    get_settings_store().invalidate_app()
     
     # Audit logging
     try:
@@ -1,9 +1,13 @@
 import logging
+import mimetypes
 
 from dependencies.auth import get_admin_user, get_current_user
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse
 from schemas.auth import UserResponse
 from schemas.storage import (
+    BatchDownloadUrlRequest,
+    BatchDownloadUrlResponse,
     BucketListResponse,
     BucketRequest,
     BucketResponse,
@@ -17,7 +21,7 @@ from schemas.storage import (
     RenameRequest,
     RenameResponse,
 )
-from services.storage import StorageService
+from services.storage import get_storage_service
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +34,7 @@ async def create_bucket(request: BucketRequest, _current_user: UserResponse = De
     Create a new bucket
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.create_bucket(request)
     except ValueError as e:
         logger.error(f"Invalid create bucket request: {e}")
@@ -46,7 +50,7 @@ async def list_buckets(_current_user: UserResponse = Depends(get_current_user)):
     List buckets of the user
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.list_buckets()
     except ValueError as e:
         logger.error(f"Invalid list buckets request: {e}")
@@ -62,7 +66,7 @@ async def list_objects(request: OSSBaseModel = Depends(), _current_user: UserRes
     List objects under the bucket
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.list_objects(request)
     except ValueError as e:
         logger.error(f"Invalid list objects request: {e}")
@@ -78,7 +82,7 @@ async def get_object_info(request: ObjectRequest = Depends(), _current_user: Use
     Get object metadata from the bucket
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.get_object_info(request)
     except ValueError as e:
         logger.error(f"Invalid get object metadata request: {e}")
@@ -94,7 +98,7 @@ async def rename_object(request: RenameRequest, _current_user: UserResponse = De
     Rename object inside the bucket
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.rename_object(request)
     except ValueError as e:
         logger.error(f"Invalid rename object: {e}")
@@ -110,7 +114,7 @@ async def delete_object(request: ObjectRequest, _current_user: UserResponse = De
     Delete object inside the bucket
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.delete_object(request)
     except ValueError as e:
         logger.error(f"Invalid delete object: {e}")
@@ -123,7 +127,7 @@ async def delete_object(request: ObjectRequest, _current_user: UserResponse = De
 @router.post("/upload-url", response_model=FileUpDownResponse)
 async def upload_file(request: FileUpDownRequest, _current_user: UserResponse = Depends(get_current_user)):
     """
-    Get a presigned URL for uploading a file to StorageService.
+    Get a presigned URL for uploading a file to object storage.
 
     Steps:
     1. Client calls this endpoint with file details
@@ -133,7 +137,7 @@ async def upload_file(request: FileUpDownRequest, _current_user: UserResponse =
     5. File is accessible at the returned access_url
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.create_upload_url(request)
     except ValueError as e:
         logger.error(f"Invalid upload request: {e}")
@@ -146,10 +150,10 @@ async def upload_file(request: FileUpDownRequest, _current_user: UserResponse =
 @router.post("/download-url", response_model=FileUpDownResponse)
 async def download_file(request: FileUpDownRequest, _current_user: UserResponse = Depends(get_current_user)):
     """
-    Get a presigned URL for downloading a file to StorageService.
+    Get a presigned URL for downloading a file to object storage.
     """
     try:
-        service = StorageService()
+        service = get_storage_service()
         return await service.create_download_url(request)
     except ValueError as e:
         logger.error(f"Invalid download request: {e}")
@@ -157,3 +161,62 @@ async def download_file(request: FileUpDownRequest, _current_user: UserResponse
     except Exception as e:
         logger.error(f"Failed to generate download URL: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
+
+
+@router.post("/download-urls", response_model=BatchDownloadUrlResponse)
+async def download_files(request: BatchDownloadUrlRequest, _current_user: UserResponse = Depends(get_current_user)):
+    """
+    Get presigned download URLs for many objects of a bucket in one call.
+    Keys that cannot be presigned are listed in `errors`.
+    """
+    try:
+        service = get_storage_service()
+        return await service.create_download_urls(request.bucket_name, request.object_keys)
+    except ValueError as e:
+        logger.error(f"Invalid batch download request: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to generate download URLs: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
+
+
+def _local_backend():
+    """The local storage backend, or 404 when another backend is configured."""
+    from services.storage_local import LocalStorageBackend
+
+    storage = get_storage_service()
+    if not isinstance(storage, LocalStorageBackend):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return storage
+
+
+@router.get("/local/{bucket_name}/{object_key}")
+async def get_local_object(bucket_name: str, object_key: str, expires: int, signature: str):
+    """
+    Serve an object of the local storage backend (target of its presigned download URLs).
+    """
+    storage = _local_backend()
+    if not storage.verify_signature("GET", bucket_name, object_key, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired signature")
+    try:
+        path = storage.file_path(bucket_name, object_key)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+    return FileResponse(path, media_type=mimetypes.guess_type(object_key)[0] or "application/octet-stream")
+
+
+@router.put("/local/{bucket_name}/{object_key}")
+async def put_local_object(bucket_name: str, object_key: str, expires: int, signature: str, request: Request):
+    """
+    Store an object in the local storage backend (target of its presigned upload URLs).
+    """
+    storage = _local_backend()
+    if not storage.verify_signature("PUT", bucket_name, object_key, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired signature")
+    try:
+        size = await storage.write_stream(bucket_name, object_key, request.stream())
+        return {"success": True, "size": size}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from services.tenant_settings import Tenant_settingsService
 from services.audit_service import AuditService
+from services.settings_store import get_settings_store
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
 
@@ -230,6 +231,8 @@ async def create_tenant_settings(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_tenant(data.tenant_id)
+        
         logger.info(f"Tenant_settings created successfully with id: {result.id}")
         return result
     except ValueError as e:
@@ -272,6 +275,8 @@ async def create_tenant_settingss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_tenant()
+        
         logger.info(f"Batch created {len(results)} tenant_settingss successfully")
         return results
     except Exception as e:
@@ -319,6 +324,8 @@ async def update_tenant_settingss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_tenant()
+        
         logger.info(f"Batch updated {len(results)} tenant_settingss successfully")
         return results
     except Exception as e:
@@ -366,6 +373,10 @@ async def update_tenant_settings(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_tenant(old_entity.tenant_id)
+        if result and str(result.tenant_id) != str(old_entity.tenant_id):
+            get_settings_store().invalidate_tenant(result.tenant_id)
+        
         logger.info(f"Tenant_settings {id} updated successfully")
         return result
     except HTTPException:
@@ -414,6 +425,8 @@ async def delete_tenant_settingss_batch(
                 except Exception as audit_error:
                     logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_tenant()
+        
         logger.info(f"Batch deleted {deleted_count} tenant_settingss successfully")
         return {"message": f"Successfully deleted {deleted_count} tenant_settingss", "deleted_count": deleted_count}
     except Exception as e:
@@ -457,6 +470,8 @@ async def delete_tenant_settings(
         except Exception as audit_error:
             logger.error(f"Audit logging failed: {audit_error}")
         
+        get_settings_store().invalidate_tenant(old_entity.tenant_id)
+        
         logger.info(f"Tenant_settings {id} deleted successfully")
         return {"message": "Tenant_settings deleted successfully", "id": id}
     except HTTPException:
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 from core.database import get_db
+from services.dashboard_service_supabase import invalidate_dashboard_scope
 
 router = APIRouter(prefix="/api/v1/entities/user_profiles", tags=["user_profiles"])
 logger = logging.getLogger(__name__)
@@ -223,6 +224,9 @@ async def create_user_profile(
         db.add(new_profile)
         await db.commit()
         await db.refresh(new_profile)
+        
+        # Team/organization dashboards list the profiles of their scope
+        invalidate_dashboard_scope(new_profile.organization_id, new_profile.department_id)
 
         return {
             "id": str(new_profile.id),
@@ -259,6 +263,8 @@ async def update_user_profile(
         if not profile:
             raise HTTPException(status_code=404, detail="User profile not found")
         
+        old_department_id = profile.department_id
+        
         # Update fields
         if data.department_id is not None:
             profile.department_id = UUID(data.department_id) if data.department_id else None
@@ -269,6 +275,10 @@ async def update_user_profile(
         
         await db.commit()
         await db.refresh(profile)
+        
+        # Team/organization dashboards list the profiles of their scope
+        invalidate_dashboard_scope(profile.organization_id, old_department_id)
+        invalidate_dashboard_scope(department_id=profile.department_id)
 
         return {
             "id": str(profile.id),
@@ -306,8 +316,12 @@ async def delete_user_profile(
         if not profile:
             raise HTTPException(status_code=404, detail="User profile not found")
         
+        organization_id, department_id = profile.organization_id, profile.department_id
         await db.delete(profile)
         await db.commit()
+        
+        # Team/organization dashboards list the profiles of their scope
+        invalidate_dashboard_scope(organization_id, department_id)
 
         return {"message": "User profile deleted successfully"}
     except HTTPException:
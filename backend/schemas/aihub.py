@@ -55,6 +55,10 @@ class GenTxtRequest(BaseModel):
     stream: bool = Field(default=False, description="Whether to enable streaming output.")
     temperature: Optional[float] = Field(default=0.7, description="Sampling temperature (0-2).")
     max_tokens: Optional[int] = Field(default=4096, description="Maximum number of generated tokens.")
+    cache: bool = Field(
+        default=False,
+        description="Reuse a cached completion for identical inputs. Always on when temperature is 0.",
+    )
 
 
 class GenTxtResponse(BaseModel):
@@ -63,6 +67,7 @@ class GenTxtResponse(BaseModel):
     content: str = Field(..., description="Generated text content.")
     model: str = Field(..., description="Name of the model used.")
     usage: Optional[dict] = Field(default=None, description="Token usage statistics.")
+    cached: bool = Field(default=False, description="Whether the completion was served from the cache.")
 
 
 # ==================== Generate Image ====================
@@ -75,8 +80,9 @@ class GenImgRequest(BaseModel):
     image: Optional[Union[str, List[str]]] = Field(
         default=None,
         description=(
-            "Optional input image(s) for editing (base64 data URI). "
-            "Supports a single string or a list of strings, e.g. `data:image/png;base64,...` or [`data:...`, `data:...`]. "
+            "Optional input image(s) for editing (base64 data URI or storage reference). "
+            "Supports a single string or a list of strings, e.g. `data:image/png;base64,...`, `oss://<bucket>/<key>` "
+            "or [`data:...`, `oss://...`]. "
             "If provided, the API performs image editing (img2img) instead of text-to-image."
         ),
     )
@@ -98,9 +104,13 @@ class GenImgResponse(BaseModel):
     images: List[str] = Field(
         ...,
         description=(
-            "Generated image references list. Prefer HTTP URL to avoid huge response bodies; "
-            "fallback to base64 data URI when url is not available."
+            "Generated image references list. Presigned object-storage URLs when storage is configured; "
+            "otherwise the provider URL, with base64 data URI as fallback when url is not available."
         ),
     )
+    references: Optional[List[str]] = Field(
+        default=None,
+        description="Storage references (`oss://<bucket>/<key>`) of the stored images; reusable as `image` input.",
+    )
     model: str = Field(..., description="Name of the model used.")
     revised_prompt: Optional[str] = Field(default=None, description="Refined prompt used for generation.")
@@ -11,6 +11,8 @@ class UserResponse(BaseModel):
     id: str
     email: str
     phone: Optional[str] = None
+    role: Optional[str] = None
+    organization_id: Optional[str] = None
     email_confirmed_at: Optional[datetime] = None
     phone_confirmed_at: Optional[datetime] = None
     last_sign_in_at: Optional[datetime] = None
@@ -85,6 +85,19 @@ class FileUpDownResponse(BaseModel):
     expires_at: str = Field(..., description="Upload URL expiration time")
 
 
+class BatchDownloadUrlRequest(OSSBaseModel):
+    """Request for presigning many downloads from one bucket."""
+
+    object_keys: list[str] = Field(..., min_length=1, max_length=200, description="Object keys to presign")
+
+
+class BatchDownloadUrlResponse(BaseModel):
+    """Presigned download URLs keyed by the requested object key."""
+
+    urls: dict[str, FileUpDownResponse] = {}
+    errors: dict[str, str] = {}
+
+
 class RenameRequest(OSSBaseModel):
     source_key: str = ""
     target_key: str = ""
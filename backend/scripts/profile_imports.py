@@ -0,0 +1,104 @@
+"""
+Import-time profile of the backend, for tracking cold-start cost.
+
+Runs `python -X importtime` in fresh interpreters for `main` (what a cold
+container imports before serving anything) and for each lazily mounted
+router on top of it (what the first request to that router adds), then
+writes a report with the totals and the slowest modules.
+
+Run from the backend directory as part of the build:
+    python scripts/profile_imports.py [--output import_profile.txt] [--top 25]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:      self [us] |  cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(statement: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for every module imported by `statement`."""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"`{statement}` failed:\n{completed.stderr[-2000:]}")
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return modules
+
+
+def new_modules(modules: List[Tuple[str, int, int, int]], before: List[Tuple[str, int, int, int]]):
+    """Modules of `modules` that were not already imported in `before`."""
+    seen = {name for name, _, _, _ in before}
+    return [m for m in modules if m[0] not in seen]
+
+
+def total_ms(modules: List[Tuple[str, int, int, int]]) -> float:
+    return sum(self_us for _, self_us, _, _ in modules) / 1000
+
+
+def by_package(modules: List[Tuple[str, int, int, int]]) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    for module, self_us, _, _ in modules:
+        package = module.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us / 1000
+    return totals
+
+
+def build_report(top: int) -> str:
+    sys.path.insert(0, BACKEND_DIR)
+    from main import ROUTER_TABLE
+
+    lines = []
+    # Interpreter start-up imports are not part of the application cost
+    with_main = measure("import main")
+    main_modules = new_modules(with_main, measure("pass"))
+    lines.append(f"import main: {total_ms(main_modules):.1f} ms ({len(main_modules)} modules)")
+    lines.append("")
+    lines.append("Slowest packages (self time):")
+    for package, ms in sorted(by_package(main_modules).items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {ms:9.1f} ms  {package}")
+
+    lines.append("")
+    lines.append("Added by the first request to each router:")
+    for prefix, module_name, _ in ROUTER_TABLE.mounts:
+        extra = new_modules(measure(f"import main; import {module_name}"), with_main)
+        lines.append(f"  {total_ms(extra):9.1f} ms  {prefix} ({module_name}, {len(extra)} modules)")
+
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile backend import time")
+    parser.add_argument("--output", help="Write the report to this file instead of stdout")
+    parser.add_argument("--top", type=int, default=25, help="Number of packages to list")
+    args = parser.parse_args()
+
+    report = build_report(args.top)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"Import profile written to {args.output}")
+    else:
+        print(report, end="")
+
+
+if __name__ == "__main__":
+    main()
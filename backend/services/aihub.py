@@ -1,36 +1,331 @@
 """
 AI Hub service layer implementation.
 Provides Generate Text (gentxt) and Generate Image (genimg) capabilities using the OpenAI SDK.
+
+The process keeps one `AsyncOpenAI` client (and its keep-alive connection pool)
+for every request, and a per-model concurrency limiter: at most
+`ai_max_concurrency_per_model` calls per model run at once, up to
+`ai_max_queue_per_model` more wait for a slot, and anything beyond that (or
+waiting longer than `ai_queue_timeout_seconds`) is rejected with
+`AICapacityError` instead of opening more sockets.
+
+Non-streaming completions are cached by content (model, normalized messages,
+temperature, max_tokens) when temperature is 0 or the request opts in with
+`cache=true`, so repeated analyses of identical inputs cost no tokens.
+
+Streaming completions are teed into a replay buffer (`StreamTee`): identical
+requests arriving while a stream is in flight attach to it from the first
+chunk, and cacheable streams are stored with their chunks so later requests
+replay them through the same SSE framing.
+
+Upstream calls made on behalf of an organization are counted by the usage
+accumulator (`services.usage_accounting`); cache hits cost nothing and are
+not counted.
+
+When `genimg_storage_bucket` is set, generated/edited images are written to
+object storage (base64 outputs decoded once, URL outputs piped through) and
+`genimg` returns short-lived presigned URLs plus `oss://bucket/key`
+references, which are also accepted as input images.
 """
 
+import asyncio
 import base64
+import hashlib
 import io
+import json
 import logging
-from typing import AsyncGenerator
+import re
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
 
+import httpx
+from core.cache import SingleFlight, TTLCache
 from core.config import settings
 from openai import AsyncOpenAI
 from schemas.aihub import GenImgRequest, GenImgResponse, GenTxtRequest, GenTxtResponse
+from schemas.storage import FileUpDownRequest
+from services.storage import StorageBackend, get_storage_service
+from services.usage_accounting import get_usage_accumulator
 
 logger = logging.getLogger(__name__)
 
 
+STORAGE_REF_PREFIX = "oss://"
+
+
 class InvalidImageInputError(ValueError):
     """Raised when the provided image input cannot be parsed."""
 
 
-class AIHubService:
-    """AI Hub service class that wraps LLM calls based on the OpenAI SDK."""
+# Object keys written by `genimg`: genimg-<batch id>-<index>.png (flat, no prefixes)
+GENIMG_OBJECT_KEY = re.compile(r"genimg-[0-9a-f]{32}-[0-9]+\.png")
 
-    def __init__(self):
+
+def genimg_object_key(batch_id: str, index: int) -> str:
+    return f"genimg-{batch_id}-{index}.png"
+
+
+def parse_storage_ref(ref: str) -> tuple[str, str]:
+    """
+    Split `oss://bucket/object_key` into (bucket, object_key).
+
+    Only genimg outputs are accepted: the bucket must be `genimg_storage_bucket`
+    and the key one genimg produced, since the object is read with the
+    server's storage credentials.
+    """
+    bucket, _, object_key = ref[len(STORAGE_REF_PREFIX):].partition("/")
+    if not bucket or not object_key:
+        raise InvalidImageInputError("Invalid storage reference. Expected `oss://<bucket>/<object_key>`.")
+    if not settings.genimg_storage_bucket or bucket != settings.genimg_storage_bucket:
+        raise InvalidImageInputError("Storage references must point to a previous genimg output.")
+    if not GENIMG_OBJECT_KEY.fullmatch(object_key):
+        raise InvalidImageInputError("Storage references must point to a previous genimg output.")
+    return bucket, object_key
+
+
+class AICapacityError(Exception):
+    """Raised when a model has no free slot within the queue limits."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+class ModelConcurrencyLimiter:
+    """Bounded per-model semaphores with a bounded wait queue."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._waiting: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, model: str) -> AsyncIterator[None]:
+        """Hold one of the model's slots for the duration of the block."""
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = self._semaphores[model] = asyncio.Semaphore(self.max_concurrency)
+
+        if not semaphore.locked():
+            await semaphore.acquire()
+        else:
+            if self._waiting.get(model, 0) >= self.max_queue:
+                raise AICapacityError(f"Model '{model}' is at capacity, try again shortly.")
+            logger.info(f"⏳ [AIHub] Waiting for a '{model}' slot ({self._waiting.get(model, 0)} queued)")
+
+            self._waiting[model] = self._waiting.get(model, 0) + 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise AICapacityError(
+                    f"Timed out after {self.queue_timeout:.0f}s waiting for model '{model}'.",
+                    retry_after=int(self.queue_timeout),
+                )
+            finally:
+                self._waiting[model] -= 1
+
+        self._active[model] = self._active.get(model, 0) + 1
+        try:
+            yield
+        finally:
+            self._active[model] -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            model: {"active": self._active.get(model, 0), "waiting": self._waiting.get(model, 0)}
+            for model in self._semaphores
+        }
+
+
+_ai_client: Optional[AsyncOpenAI] = None
+_model_limiter: Optional[ModelConcurrencyLimiter] = None
+
+def _completion_size(entry: dict) -> int:
+    size = len(entry["content"].encode("utf-8")) + 256
+    # Streamed entries also keep their chunk list for replay
+    return size * 2 if entry.get("chunks") else size
+
+
+_completion_cache = TTLCache(
+    "ai_completions",
+    ttl=settings.ai_completion_cache_ttl_seconds,
+    max_entries=settings.ai_completion_cache_max_entries,
+    max_bytes=settings.ai_completion_cache_max_bytes,
+    sizeof=_completion_size,
+)
+_completion_flight = SingleFlight("ai_completions")
+
+
+class StreamTee:
+    """
+    Fan one upstream text stream out to any number of subscribers.
+
+    Chunks are buffered as they arrive, so a subscriber that attaches late
+    still receives the stream from the first chunk. The upstream is consumed
+    by its own task; it is cancelled when the last subscriber leaves unless
+    `keep` is set (the result is going to be cached). `usage` is the dict
+    the source fills with the upstream token usage once it completes.
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[str],
+        on_complete: Optional[Callable[[List[str]], None]] = None,
+        keep: bool = False,
+        usage: Optional[Dict[str, int]] = None,
+    ):
+        self.chunks: List[str] = []
+        self.usage = usage if usage is not None else {}
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.on_complete = on_complete
+        self.keep = keep
+        self._subscribers = 0
+        self._changed = asyncio.Event()
+        self._task = asyncio.ensure_future(self._pump(source))
+
+    def add_done_callback(self, callback: Callable[["asyncio.Task"], None]) -> None:
+        self._task.add_done_callback(callback)
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _pump(self, source: AsyncIterator[str]) -> None:
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+            if self.on_complete is not None:
+                self.on_complete(self.chunks)
+        except asyncio.CancelledError:
+            self.error = RuntimeError("Stream cancelled")
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+            if hasattr(source, "aclose"):
+                await source.aclose()
+
+    async def subscribe(self) -> AsyncGenerator[str, None]:
+        """Yield every chunk from the start, then follow the live stream."""
+        self._subscribers += 1
+        index = 0
+        try:
+            while True:
+                while index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self._subscribers -= 1
+            if self._subscribers == 0 and not self.done and not self.keep:
+                self._task.cancel()
+
+
+_inflight_streams: Dict[str, StreamTee] = {}
+
+
+def _forget_stream(key: str, tee: StreamTee) -> None:
+    if _inflight_streams.get(key) is tee:
+        del _inflight_streams[key]
+
+
+def _normalize_content(content):
+    if isinstance(content, str):
+        return content.replace("\r\n", "\n").strip()
+    return [_normalize_content(item) if isinstance(item, (str, list)) else item for item in content]
+
+
+def completion_cache_key(model: str, messages: list, temperature: Optional[float], max_tokens: Optional[int]) -> str:
+    """Content address of a completion request (line endings and outer whitespace ignored)."""
+    normalized = [
+        {"role": msg["role"].strip().lower(), "content": _normalize_content(msg["content"])}
+        for msg in messages
+    ]
+    body = json.dumps(
+        {"model": model, "messages": normalized, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(request: GenTxtRequest) -> bool:
+    """Deterministic (temperature 0) requests are always cached; others only on opt-in."""
+    return request.cache or request.temperature == 0
+
+
+def get_ai_client() -> AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client (pooled keep-alive connections)."""
+    global _ai_client
+
+    if _ai_client is None:
         if not settings.app_ai_base_url or not settings.app_ai_key:
             raise ValueError("AI service not configured. Set APP_AI_BASE_URL and APP_AI_KEY.")
 
-        self.client = AsyncOpenAI(
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.ai_max_connections,
+                max_keepalive_connections=settings.ai_max_keepalive_connections,
+                keepalive_expiry=settings.ai_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(settings.ai_request_timeout_seconds, connect=settings.ai_connect_timeout_seconds),
+        )
+        _ai_client = AsyncOpenAI(
             api_key=settings.app_ai_key,
             base_url=settings.app_ai_base_url.rstrip("/"),
+            http_client=http_client,
+            max_retries=settings.ai_max_retries,
+        )
+        logger.info("✅ AI Hub client initialized")
+
+    return _ai_client
+
+
+def get_model_limiter() -> ModelConcurrencyLimiter:
+    """Return the process-wide per-model concurrency limiter."""
+    global _model_limiter
+
+    if _model_limiter is None:
+        _model_limiter = ModelConcurrencyLimiter(
+            max_concurrency=settings.ai_max_concurrency_per_model,
+            max_queue=settings.ai_max_queue_per_model,
+            queue_timeout=settings.ai_queue_timeout_seconds,
         )
 
+    return _model_limiter
+
+
+async def close_ai_client() -> None:
+    """Close the shared client's connection pool (application shutdown)."""
+    global _ai_client
+
+    if _ai_client is not None:
+        await _ai_client.close()
+        _ai_client = None
+        logger.info("🔌 AI Hub client closed")
+
+
+class AIHubService:
+    """AI Hub service class that wraps LLM calls based on the OpenAI SDK."""
+
+    def __init__(self):
+        self.client = get_ai_client()
+        self.limiter = get_model_limiter()
+
     def _convert_message(self, msg) -> dict:
         """Convert message format and support multimodal content."""
         content = msg.content
@@ -39,12 +334,13 @@ class AIHubService:
             content = [item.model_dump() if hasattr(item, "model_dump") else item for item in content]
         return {"role": msg.role, "content": content}
 
-    async def gentxt(self, request: GenTxtRequest) -> GenTxtResponse:
+    async def gentxt(self, request: GenTxtRequest, organization_id: Optional[str] = None) -> GenTxtResponse:
         """
         Generate Text API (non-streaming), supports text and image input.
 
         Args:
             request: Generate text request parameters.
+            organization_id: Organization charged for the tokens (usage accounting).
 
         Returns:
             Txt2TxtResponse: generated text response.
@@ -52,6 +348,34 @@ class AIHubService:
         try:
             messages = [self._convert_message(msg) for msg in request.messages]
 
+            if not is_cacheable(request):
+                completion = await self._complete(request, messages, organization_id)
+                return GenTxtResponse(model=request.model, **completion)
+
+            key = completion_cache_key(request.model, messages, request.temperature, request.max_tokens)
+            cached = _completion_cache.get(key)
+            if cached is not None:
+                logger.info(f"♻️ [AIHub] Completion cache hit for {request.model}")
+                return GenTxtResponse(model=request.model, content=cached["content"], usage=cached["usage"], cached=True)
+
+            async def complete_and_store() -> dict:
+                completion = await self._complete(request, messages, organization_id)
+                # Empty completions (e.g. truncated or filtered) are not worth keeping
+                if completion["content"]:
+                    _completion_cache.set(key, completion)
+                return completion
+
+            # Identical concurrent requests share one upstream call
+            completion = await _completion_flight.do(key, complete_and_store)
+            return GenTxtResponse(model=request.model, **completion)
+
+        except Exception as e:
+            logger.error(f"gentxt error: {e}")
+            raise
+
+    async def _complete(self, request: GenTxtRequest, messages: list, organization_id: Optional[str] = None) -> dict:
+        """Run one chat completion and return {content, usage}."""
+        async with self.limiter.slot(request.model):
             response = await self.client.chat.completions.create(
                 model=request.model,
                 messages=messages,
@@ -60,54 +384,131 @@ class AIHubService:
                 stream=False,
             )
 
-            content = response.choices[0].message.content or ""
-            usage = None
-            if response.usage:
-                usage = {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens,
-                }
-
-            return GenTxtResponse(
-                content=content,
-                model=request.model,
-                usage=usage,
-            )
+        content = response.choices[0].message.content or ""
+        usage = None
+        if response.usage:
+            usage = {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens,
+            }
 
-        except Exception as e:
-            logger.error(f"gentxt error: {e}")
-            raise
+        get_usage_accumulator().record(organization_id, tokens=usage["total_tokens"] if usage else 0)
+        return {"content": content, "usage": usage}
 
-    async def gentxt_stream(self, request: GenTxtRequest) -> AsyncGenerator[str, None]:
+    async def gentxt_stream(self, request: GenTxtRequest, organization_id: Optional[str] = None) -> AsyncGenerator[str, None]:
         """
         Generate Text API (streaming), supports text and image input.
 
         Args:
             request: Generate text request parameters.
+            organization_id: Organization charged for the call (usage accounting).
 
         Yields:
             str: Generated text content chunk (plain text, not JSON).
         """
         try:
             messages = [self._convert_message(msg) for msg in request.messages]
+            key = completion_cache_key(request.model, messages, request.temperature, request.max_tokens)
+            cacheable = is_cacheable(request)
+
+            if cacheable:
+                cached = _completion_cache.get(key)
+                if cached is not None:
+                    logger.info(f"♻️ [AIHub] Replaying cached stream for {request.model}")
+                    for chunk in cached.get("chunks") or [cached["content"]]:
+                        yield chunk
+                    return
+
+            def store(chunks: List[str]) -> None:
+                content = "".join(chunks)
+                if content:
+                    # `tee` is bound below; the source has filled its usage by now
+                    _completion_cache.set(key, {"content": content, "usage": tee.usage or None, "chunks": list(chunks)})
+
+            tee = _inflight_streams.get(key)
+            if tee is None:
+                usage: Dict[str, int] = {}
+                tee = StreamTee(
+                    self._stream_completion(request, messages, organization_id, usage),
+                    on_complete=store if cacheable else None,
+                    keep=cacheable,
+                    usage=usage,
+                )
+                _inflight_streams[key] = tee
+                tee.add_done_callback(lambda _: _forget_stream(key, tee))
+            else:
+                logger.info(f"🔗 [AIHub] Attaching to in-flight stream for {request.model}")
+                if cacheable and not tee.keep:
+                    tee.keep = True
+                    tee.on_complete = store
 
-            stream = await self.client.chat.completions.create(
-                model=request.model,
-                messages=messages,
-                temperature=request.temperature,
-                max_tokens=request.max_tokens,
-                stream=True,
-            )
-
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            async for chunk in tee.subscribe():
+                yield chunk
 
         except Exception as e:
             logger.error(f"gentxt_stream error: {e}")
             raise
 
+    async def _stream_completion(
+        self,
+        request: GenTxtRequest,
+        messages: list,
+        organization_id: Optional[str] = None,
+        usage_out: Optional[Dict[str, int]] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Upstream streaming completion; consumed by a StreamTee. Token usage is written to `usage_out`."""
+        usage = None
+        try:
+            # The slot is held until the stream is fully consumed
+            async with self.limiter.slot(request.model):
+                stream = await self.client.chat.completions.create(
+                    model=request.model,
+                    messages=messages,
+                    temperature=request.temperature,
+                    max_tokens=request.max_tokens,
+                    stream=True,
+                    # The final chunk (no choices) carries the usage block
+                    stream_options={"include_usage": True},
+                )
+
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        finally:
+            if usage and usage_out is not None:
+                usage_out.update(
+                    prompt_tokens=usage.prompt_tokens,
+                    completion_tokens=usage.completion_tokens,
+                    total_tokens=usage.total_tokens,
+                )
+            # Aborted streams still count the prompt
+            get_usage_accumulator().record(organization_id, tokens=usage.total_tokens if usage else 0)
+
+    @staticmethod
+    def _item_field(item: object, name: str) -> Optional[str]:
+        return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+    async def _store_image(self, storage: StorageBackend, item: object, object_key: str) -> tuple[str, str]:
+        """
+        Write one genimg output to the configured bucket.
+        Returns (presigned download URL, storage reference).
+        """
+        bucket = settings.genimg_storage_bucket
+        b64_json = self._item_field(item, "b64_json")
+        url = self._item_field(item, "url")
+        if b64_json:
+            object_key = await storage.upload_bytes(bucket, object_key, base64.b64decode(b64_json), "image/png")
+        elif url:
+            object_key = await storage.upload_from_url(bucket, object_key, url)
+        else:
+            raise RuntimeError("Neither url nor b64_json found in genimg response item")
+
+        download = await storage.create_download_url(FileUpDownRequest(bucket_name=bucket, object_key=object_key))
+        return download.download_url, f"{STORAGE_REF_PREFIX}{bucket}/{object_key}"
+
     @staticmethod
     def _extract_image_ref(item: object) -> str:
         """
@@ -171,25 +572,32 @@ class AIHubService:
 
     async def _image_str_to_upload_file(self, image: str, name_prefix: str = "image") -> io.BytesIO:
         """
-        Convert image input (base64 data URI) into an in-memory file object for uploads.
+        Convert image input (base64 data URI or storage reference) into an in-memory file object for uploads.
 
         The OpenAI `images.edit` endpoint expects multipart file uploads; we keep the API JSON-only
-        by allowing clients to pass a base64 data URI, and converting it here.
+        by allowing clients to pass a base64 data URI or an `oss://bucket/key` reference to an
+        image already in storage (e.g. a previous genimg output), and converting it here.
         """
         image = (image or "").strip()
         if not image:
             raise InvalidImageInputError("Input image is empty.")
 
-        if image.startswith(("http://", "https://")):
-            raise InvalidImageInputError(
-                "URL input is not supported for image editing. Use a base64 data URI like `data:image/png;base64,...`."
-            )
-        if not image.startswith("data:"):
-            raise InvalidImageInputError(
-                "Only base64 data URI is supported for image editing. Example: `data:image/png;base64,...`."
-            )
+        if image.startswith(STORAGE_REF_PREFIX):
+            bucket, object_key = parse_storage_ref(image)
+            image_bytes, content_type = await get_storage_service().download_bytes(bucket, object_key)
+        else:
+            if image.startswith(("http://", "https://")):
+                raise InvalidImageInputError(
+                    "URL input is not supported for image editing. Use a storage reference `oss://<bucket>/<key>` "
+                    "or a base64 data URI like `data:image/png;base64,...`."
+                )
+            if not image.startswith("data:"):
+                raise InvalidImageInputError(
+                    "Only storage references or base64 data URIs are supported for image editing. "
+                    "Example: `oss://<bucket>/<key>` or `data:image/png;base64,...`."
+                )
 
-        image_bytes, content_type = self._parse_data_uri(image)
+            image_bytes, content_type = self._parse_data_uri(image)
 
         upload = io.BytesIO(image_bytes)
         # openai SDK uses this name for multipart filename
@@ -198,7 +606,7 @@ class AIHubService:
 
     async def _image_input_to_upload_files(self, image_input: str | list[str]) -> list[io.BytesIO]:
         """
-        Convert image input (single data URI or list of data URIs) into uploadable file objects.
+        Convert image input (single data URI/storage reference or a list of them) into uploadable file objects.
 
         Some OpenAI-compatible `images/edits` implementations support multiple input images.
         """
@@ -209,7 +617,7 @@ class AIHubService:
         upload_files: list[io.BytesIO] = []
         for idx, img in enumerate(images):
             if not isinstance(img, str):
-                raise InvalidImageInputError("Each image must be a base64 data URI string.")
+                raise InvalidImageInputError("Each image must be a base64 data URI or storage reference string.")
             upload_files.append(await self._image_str_to_upload_file(img, name_prefix=f"image_{idx + 1}"))
         return upload_files
 
@@ -221,34 +629,51 @@ class AIHubService:
             request: Generate image request parameters.
 
         Returns:
-            GenImgResponse: generated image response, where `images` is a list of image refs (URL preferred; fallback to base64 data URI).
+            GenImgResponse: generated image response, where `images` is a list of image refs: presigned storage URLs
+            when `genimg_storage_bucket` is configured, otherwise the provider URL (fallback to base64 data URI).
         """
         try:
             # If an input image is provided, use the image editing endpoint (img2img).
             if request.image:
                 image_files = await self._image_input_to_upload_files(request.image)
                 image_param = image_files[0] if len(image_files) == 1 else image_files
-                response = await self.client.images.edit(
-                    model=request.model,
-                    image=image_param,
-                    prompt=request.prompt,
-                    size=request.size,
-                    n=request.n,
-                )
+                async with self.limiter.slot(request.model):
+                    response = await self.client.images.edit(
+                        model=request.model,
+                        image=image_param,
+                        prompt=request.prompt,
+                        size=request.size,
+                        n=request.n,
+                    )
             else:
-                response = await self.client.images.generate(
-                    model=request.model,
-                    prompt=request.prompt,
-                    size=request.size,
-                    quality=request.quality,
-                    n=request.n,
-                )
+                async with self.limiter.slot(request.model):
+                    response = await self.client.images.generate(
+                        model=request.model,
+                        prompt=request.prompt,
+                        size=request.size,
+                        quality=request.quality,
+                        n=request.n,
+                    )
 
             revised_prompt = response.data[0].revised_prompt if response.data else None
 
             if not response.data:
                 raise RuntimeError("Image generation returned empty result")
 
+            if settings.genimg_storage_bucket:
+                storage = get_storage_service()
+                batch_id = uuid.uuid4().hex
+                stored = await asyncio.gather(*(
+                    self._store_image(storage, item, genimg_object_key(batch_id, idx + 1))
+                    for idx, item in enumerate(response.data)
+                ))
+                return GenImgResponse(
+                    images=[download_url for download_url, _ in stored],
+                    references=[ref for _, ref in stored],
+                    model=request.model,
+                    revised_prompt=revised_prompt,
+                )
+
             # Prefer URL to avoid huge response bodies; fallback to base64 data URI.
             images = [self._extract_image_ref(item) for item in response.data]
 
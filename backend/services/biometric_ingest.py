@@ -0,0 +1,259 @@
+"""
+Biometric Ingest - HoloCheck Equilibria
+Batch ingestion of raw DeepAffex measurement results.
+
+A batch of result payloads (`{"measurementId": ..., "points": {"HR_BPM":
+{"value": 72}, ...}}`) is turned into one float matrix (NaN = missing
+point). Derived scores are then computed over the whole matrix with NumPy:
+
+- risk flags: the range of `param_biometric_indicators_info.risk_ranges`
+  each value falls in, flagged when it is not the `normal` range
+- wellness index: share (0-100) of a scan's evaluated indicators that are
+  in their `normal` range
+
+Rows are bulk-inserted in chunks (`ON CONFLICT (measurement_id) DO NOTHING`,
+so re-sending a day's results is harmless) and the affected dashboards are
+invalidated once per (organization, department).
+"""
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.biometric_measurements import Biometric_measurements
+from models.user_profiles import UserProfile
+from services.dashboard_service_supabase import invalidate_dashboard_scope
+from services.reference_data import get_reference_data_service
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK_SIZE = 500
+
+# biometric_measurements column -> DeepAffex result point
+POINT_COLUMNS = {
+    "heart_rate": "HR_BPM",
+    "respiration_rate": "BR_BPM",
+    "bp_systolic": "BP_SYSTOLIC",
+    "bp_diastolic": "BP_DIASTOLIC",
+    "sdnn": "HRV_SDNN",
+    "rmssd": "HRV_RMSSD",
+    "ai_stress": "MSI",
+    "ai_fatigue": "FATIGUE_LEVEL",
+    "ai_cognitive_load": "COGNITIVE_LOAD",
+    "ai_recovery": "RECOVERY_STATUS",
+    "mental_score": "MENTAL_SCORE",
+    "bio_age_basic": "BIO_AGE",
+    "cvd_risk": "BP_CVD",
+    "health_score": "HEALTH_SCORE",
+    "vital_score": "VITAL_SCORE",
+    "physio_score": "PHYSIO_SCORE",
+    "risks_score": "RISKS_SCORE",
+    "quality_score": "SIGNAL_QUALITY",
+}
+COLUMNS = tuple(POINT_COLUMNS)
+
+# Roles allowed to ingest results of other users (admin_org/rrhh: own organization only)
+INGEST_ROLES = {"admin_global", "admin_org", "rrhh"}
+
+
+def _point_value(points: Dict[str, Any], code: str) -> float:
+    value = points.get(code)
+    if isinstance(value, dict):
+        value = value.get("value")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def extract_vitals(results: List[Dict[str, Any]]) -> np.ndarray:
+    """(n_scans, len(COLUMNS)) float matrix of the result points; NaN where missing."""
+    if not results:
+        return np.empty((0, len(COLUMNS)))
+    return np.array(
+        [[_point_value(result.get("points") or {}, POINT_COLUMNS[column]) for column in COLUMNS] for result in results],
+        dtype=np.float64,
+    )
+
+
+def load_risk_ranges(indicators: List[Dict[str, Any]]) -> Dict[str, Tuple[List[str], np.ndarray]]:
+    """Per ingested column: (range names, lower bounds), ordered by lower bound."""
+    ranges = {}
+    for indicator in indicators:
+        code = indicator.get("indicator_code")
+        risk_ranges = indicator.get("risk_ranges")
+        if code not in POINT_COLUMNS or not isinstance(risk_ranges, dict):
+            continue
+        bounds = sorted(
+            (float(limits[0]), name)
+            for name, limits in risk_ranges.items()
+            if isinstance(limits, (list, tuple)) and len(limits) == 2
+        )
+        if bounds:
+            ranges[code] = ([name for _, name in bounds], np.array([low for low, _ in bounds]))
+    return ranges
+
+
+def derive_scores(
+    vitals: np.ndarray, ranges: Dict[str, Tuple[List[str], np.ndarray]]
+) -> Tuple[np.ndarray, List[Dict[str, str]]]:
+    """
+    Wellness index (NaN when nothing could be evaluated) and risk flags
+    ({indicator: range name}) for every row of `vitals`.
+
+    A value belongs to the last range starting at or below it, so gaps
+    between ranges and values beyond the outer bounds still classify.
+    """
+    n = vitals.shape[0]
+    evaluated = np.zeros(n)
+    in_normal = np.zeros(n)
+    flags: List[Dict[str, str]] = [{} for _ in range(n)]
+
+    for code, (names, lows) in ranges.items():
+        values = vitals[:, COLUMNS.index(code)]
+        found = ~np.isnan(values)
+        category = np.clip(np.searchsorted(lows, values, side="right") - 1, 0, len(names) - 1)
+
+        evaluated += found
+        normal = names.index("normal") if "normal" in names else -2
+        in_normal += found & (category == normal)
+
+        for row in np.nonzero(found & (category != normal))[0]:
+            flags[row][code] = names[category[row]]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wellness = np.where(evaluated > 0, np.round(100.0 * in_normal / evaluated, 1), np.nan)
+    return wellness, flags
+
+
+def _naive_utc(value: Optional[datetime]) -> datetime:
+    # biometric_measurements.created_at is a naive UTC timestamp
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class BiometricIngestService:
+    """Validates, scores and bulk-writes batches of DeepAffex results."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def ingest(self, items: List[Dict[str, Any]], caller_id: str) -> Dict[str, Any]:
+        """
+        Ingest `items` ({user_id?, measurement_id?, created_at?, result}).
+        Items without a user_id belong to the caller.
+
+        Raises:
+            PermissionError: if the caller may not write results for a listed user.
+        """
+        errors: List[Dict[str, Any]] = []
+        profiles = await self._profiles({item.get("user_id") or caller_id for item in items} | {caller_id})
+        caller = profiles.get(caller_id)
+
+        accepted = []
+        for index, item in enumerate(items):
+            user_id = item.get("user_id") or caller_id
+            result = item.get("result") or {}
+            measurement_id = item.get("measurement_id") or result.get("measurementId")
+            if not measurement_id:
+                errors.append({"index": index, "error": "Missing measurement_id"})
+                continue
+            profile = profiles.get(user_id)
+            if profile is None:
+                errors.append({"index": index, "error": f"Unknown user: {user_id}"})
+                continue
+            if user_id != caller_id:
+                self._check_can_ingest_for(caller, profile)
+            accepted.append((item, user_id, str(measurement_id), result))
+
+        results = [result for _, _, _, result in accepted]
+        vitals = extract_vitals(results)
+        indicators = await get_reference_data_service().get_items("param_biometric_indicators_info")
+        wellness, flags = derive_scores(vitals, load_risk_ranges(indicators))
+
+        # NaN -> None once for the whole matrix
+        values = vitals.astype(object)
+        values[np.isnan(vitals)] = None
+
+        rows = []
+        for i, (item, user_id, measurement_id, result) in enumerate(accepted):
+            row = dict(zip(COLUMNS, values[i].tolist()))
+            row.update(
+                user_id=user_id,
+                measurement_id=measurement_id,
+                created_at=_naive_utc(item.get("created_at")),
+                raw_data={
+                    **result,
+                    "derived": {
+                        "wellness_index": None if np.isnan(wellness[i]) else float(wellness[i]),
+                        "risk_flags": flags[i],
+                    },
+                },
+            )
+            rows.append(row)
+
+        inserted = await self._bulk_insert(rows)
+
+        scopes = {(profiles[user_id]["organization_id"], profiles[user_id]["department_id"]) for _, user_id, _, _ in accepted}
+        if inserted:
+            for organization_id, department_id in scopes:
+                invalidate_dashboard_scope(organization_id, department_id)
+
+        logger.info(f"✅ [Ingest] {inserted}/{len(items)} measurements inserted, {len(errors)} rejected")
+        return {
+            "received": len(items),
+            "inserted": inserted,
+            "duplicates": len(rows) - inserted,
+            "errors": errors,
+            "wellness_index_avg": float(np.nanmean(wellness)) if np.isfinite(wellness).any() else None,
+        }
+
+    @staticmethod
+    def _check_can_ingest_for(caller: Optional[Dict[str, Any]], profile: Dict[str, Any]) -> None:
+        role = (caller or {}).get("role")
+        if role == "admin_global":
+            return
+        if role in INGEST_ROLES and caller["organization_id"] and caller["organization_id"] == profile["organization_id"]:
+            return
+        raise PermissionError("Not allowed to ingest measurements for other users")
+
+    async def _profiles(self, user_ids: set) -> Dict[str, Dict[str, Any]]:
+        result = await self.db.execute(
+            select(UserProfile.user_id, UserProfile.organization_id, UserProfile.department_id, UserProfile.role)
+            .where(UserProfile.user_id.in_(list(user_ids)))
+        )
+        return {
+            row.user_id: {
+                "organization_id": str(row.organization_id) if row.organization_id else None,
+                "department_id": str(row.department_id) if row.department_id else None,
+                "role": row.role,
+            }
+            for row in result.all()
+        }
+
+    async def _bulk_insert(self, rows: List[Dict[str, Any]]) -> int:
+        inserted = 0
+        try:
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + INSERT_CHUNK_SIZE]
+                statement = (
+                    pg_insert(Biometric_measurements)
+                    .values(chunk)
+                    .on_conflict_do_nothing(index_elements=["measurement_id"])
+                    .returning(Biometric_measurements.id)
+                )
+                result = await self.db.execute(statement)
+                inserted += len(result.all())
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return inserted
@@ -0,0 +1,138 @@
+"""
+Branding Cache - HoloCheck Equilibria
+Resolves organization branding by slug or request host for multitenant
+auto-detection, backed by an in-memory cache.
+
+Entries are keyed by slug. Unknown slugs are cached too (for a shorter time)
+so random hosts cannot push every request to the database. The
+organization-branding router invalidates the affected slugs on every write.
+"""
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
+from core.config import settings
+from core.http_cache import compute_etag
+from models.organization_branding import OrganizationBranding
+
+logger = logging.getLogger(__name__)
+
+# Cached for unknown slugs
+_NOT_FOUND = {"branding": None, "etag": None}
+
+# Public fields needed to render the first paint
+BRANDING_FIELDS = (
+    "id",
+    "organization_id",
+    "slug",
+    "logo_url",
+    "primary_color",
+    "secondary_color",
+    "slogan",
+    "message",
+    "favicon_url",
+    "font_family",
+    "background_image_url",
+    "login_message",
+    "dashboard_welcome_text",
+    "meta_description",
+    "contact_email",
+    "contact_phone",
+    "social_links",
+    "custom_terms_url",
+    "custom_privacy_url",
+    "login_layout_style",
+    "branding_mode",
+)
+
+
+def slug_from_host(host: Optional[str]) -> Optional[str]:
+    """
+    Derive the tenant slug from a request host.
+
+    `factork.holocheck.app:443` -> `factork`. Apex domains (fewer than three
+    labels), IP addresses and localhost carry no tenant and return None.
+    """
+    if not host:
+        return None
+    hostname = host.split(",")[0].strip().lower().split(":")[0]
+    labels = [label for label in hostname.split(".") if label]
+    if len(labels) < 3 or all(label.isdigit() for label in labels):
+        return None
+    if labels[0] == "www":
+        labels = labels[1:]
+        if len(labels) < 3:
+            return None
+    return labels[0]
+
+
+def serialize_branding(branding: OrganizationBranding) -> Dict[str, Any]:
+    """Convert an OrganizationBranding row to a JSON-ready dict."""
+    data = {}
+    for field in BRANDING_FIELDS:
+        value = getattr(branding, field, None)
+        if field in ("id", "organization_id") and value is not None:
+            value = str(value)
+        data[field] = value
+    return data
+
+
+class BrandingCache:
+    """Slug-keyed branding cache."""
+
+    def __init__(self):
+        self.cache = TTLCache(
+            "branding",
+            ttl=settings.branding_cache_ttl_seconds,
+            max_entries=settings.branding_cache_max_entries,
+        )
+
+    async def resolve(self, db: AsyncSession, slug: str) -> Dict[str, Any]:
+        """
+        Resolve branding for a slug.
+
+        Returns:
+            dict with `branding` (None if the slug is unknown) and `etag`.
+        """
+        slug = slug.strip().lower()
+        cached = self.cache.get(slug)
+        if cached is not None:
+            return cached
+
+        # Stored slugs may contain uppercase letters
+        result = await db.execute(
+            select(OrganizationBranding).where(func.lower(OrganizationBranding.slug) == slug).limit(1)
+        )
+        branding = result.scalars().first()
+
+        if branding is None:
+            logger.info(f"🎨 [Branding] Slug '{slug}' not found")
+            self.cache.set(slug, _NOT_FOUND, ttl=settings.branding_not_found_ttl_seconds)
+            return _NOT_FOUND
+
+        data = serialize_branding(branding)
+        entry = {"branding": data, "etag": compute_etag(data)}
+        self.cache.set(slug, entry)
+        return entry
+
+    def invalidate(self, slugs: Iterable[Optional[str]]) -> None:
+        """Drop the given slugs (old and new slug of a changed branding)."""
+        for slug in slugs:
+            if slug:
+                self.cache.invalidate(slug.strip().lower())
+
+
+_branding_cache: Optional[BrandingCache] = None
+
+
+def get_branding_cache() -> BrandingCache:
+    """Return the process-wide BrandingCache."""
+    global _branding_cache
+
+    if _branding_cache is None:
+        _branding_cache = BrandingCache()
+
+    return _branding_cache
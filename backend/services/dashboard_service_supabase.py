@@ -1,17 +1,129 @@
 """
 Dashboard Service - HoloCheck Equilibria (Supabase REST API)
 Provides aggregated data for role-based dashboards using Supabase REST API.
+
+Leader and HR dashboards depend only on the viewer's department/organization,
+so the scope part is cached in a shared response cache keyed by
+(dashboard type, organization, department, window); routers/dashboards.py
+serves its /leader and /hr scopes from it (`get_dashboard_cache`). The cache
+is bounded by entry count and approximate size (LRU), serves stale entries
+while a background refresh runs, and is invalidated when profiles,
+measurements or insights are written for a scope.
+
+The router is the only cached path: concurrent requests for the same scope
+share one build, run in a worker thread so the blocking Supabase calls do
+not stall the event loop. `DashboardServiceSupabase` below is uncached.
 """
 
+import asyncio
+import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 
+from core.cache import TTLCache
+from core.config import settings
 from core.supabase_client import get_supabase_admin
 
 logger = logging.getLogger(__name__)
 
 
+def _json_size(value: Any) -> int:
+    """Approximate memory footprint of a cached dashboard payload."""
+    return len(json.dumps(value, default=str))
+
+
+_dashboard_cache = TTLCache(
+    "dashboards",
+    ttl=settings.dashboard_cache_ttl_seconds,
+    stale_ttl=settings.dashboard_cache_stale_seconds,
+    max_entries=settings.dashboard_cache_max_entries,
+    max_bytes=settings.dashboard_cache_max_bytes,
+    sizeof=_json_size,
+)
+
+
+def invalidate_dashboard_scope(organization_id: Optional[str] = None, department_id: Optional[str] = None) -> int:
+    """
+    Drop cached dashboards for a scope.
+
+    - organization_id: every leader and HR dashboard of the organization
+    - department_id: the leader dashboards of the department
+    Both arguments may be combined; matching either drops the entry.
+    """
+    organization_id = str(organization_id) if organization_id else None
+    department_id = str(department_id) if department_id else None
+
+    def matches(key) -> bool:
+        _, key_org, key_dept, _ = key
+        return (organization_id is not None and key_org == organization_id) or \
+            (department_id is not None and key_dept == department_id)
+
+    return _dashboard_cache.invalidate_where(matches)
+
+
+def get_dashboard_cache() -> TTLCache:
+    """Return the shared leader/HR dashboard scope cache."""
+    return _dashboard_cache
+
+
+def _fence_dashboard_loads() -> None:
+    # Nothing cached: nothing to drop, but loads already in flight must not store pre-write data
+    _dashboard_cache.invalidate_where(lambda key: False)
+
+
+def _fetch_user_scopes(user_ids: List[str]) -> List[Dict[str, Any]]:
+    supabase = get_supabase_admin()
+    response = supabase.table('user_profiles').select('organization_id, department_id').in_('user_id', user_ids).execute()
+    return response.data or []
+
+
+async def invalidate_dashboards_for_users(user_ids: Iterable[Optional[str]]) -> int:
+    """
+    Drop cached dashboards affected by measurements owned by `user_ids`.
+
+    The owners' scopes are only looked up (off the event loop) when
+    something is cached.
+    """
+    user_ids = sorted({str(user_id) for user_id in user_ids if user_id})
+    if not user_ids:
+        return 0
+    if not len(_dashboard_cache):
+        _fence_dashboard_loads()
+        return 0
+    try:
+        profiles = await asyncio.to_thread(_fetch_user_scopes, user_ids)
+        return sum(
+            invalidate_dashboard_scope(profile.get('organization_id'), profile.get('department_id'))
+            for profile in profiles
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Dashboard cache invalidation failed for users {user_ids}: {e}")
+        return 0
+
+
+def _fetch_department_organization(department_id: str) -> Optional[str]:
+    supabase = get_supabase_admin()
+    response = supabase.table('departments').select('organization_id').eq('id', department_id).execute()
+    return response.data[0].get('organization_id') if response.data else None
+
+
+async def invalidate_dashboards_for_department(department_id: Optional[str]) -> int:
+    """Drop cached dashboards affected by department insights written for `department_id`."""
+    if not department_id:
+        return 0
+    if not len(_dashboard_cache):
+        _fence_dashboard_loads()
+        return 0
+    try:
+        organization_id = await asyncio.to_thread(_fetch_department_organization, str(department_id))
+        # HR dashboards embed the latest insights of every department in the organization
+        return invalidate_dashboard_scope(organization_id, department_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Dashboard cache invalidation failed for department {department_id}: {e}")
+        return 0
+
+
 class DashboardServiceSupabase:
     """Service layer for dashboard data aggregation using Supabase REST API."""
 
@@ -1,14 +1,62 @@
 """
 DeepAffex Token Service
 Generates authentication tokens for DeepAffex SDK
+
+One service instance per process keeps the current token in memory and
+hands it to every scan start. When less than `deepaffex_refresh_ahead_seconds`
+of its lifetime remains, the cached token is still returned while a single
+background task renews it with the refresh token (falling back to a new
+token); only a missing or expired token makes a caller wait, and concurrent
+callers share that one request. All calls reuse one HTTP client.
 """
+import asyncio
+import base64
+import json
 import os
 import logging
+import time
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from core.cache import SingleFlight
+from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_deepaffex_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client for the DeepAffex API."""
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            headers={"Content-Type": "application/json"},
+        )
+
+    return _http_client
+
+
+async def close_deepaffex_client() -> None:
+    """Close the shared HTTP client (application shutdown)."""
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _token_expiry(token: str) -> float:
+    """Expiry (epoch seconds) from the token's JWT `exp` claim, or the configured TTL."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except Exception:
+        return time.time() + settings.deepaffex_token_ttl_seconds
+
 
 class DeepAffexService:
     """Service for managing DeepAffex authentication tokens"""
@@ -21,6 +69,11 @@ class DeepAffexService:
         if not self.license_key or not self.study_id:
             logger.error("Missing DeepAffex credentials in environment variables")
             raise ValueError("DeepAffex credentials not configured")
+        
+        self._token: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._flight = SingleFlight("deepaffex_token")
+        self._refresh_task: Optional[asyncio.Task] = None
     
     async def get_study_id(self) -> Dict[str, Any]:
         """
@@ -43,43 +96,71 @@ class DeepAffexService:
     
     async def generate_token(self) -> Dict[str, Any]:
         """
-        Generate authentication token for DeepAffex SDK
+        Get an authentication token for DeepAffex SDK (cached, refreshed ahead of expiry)
         
         Returns:
             dict: Token response with token and refreshToken
         """
+        remaining = self._expires_at - time.time()
+        
+        if self._token is not None and remaining > settings.deepaffex_min_token_lifetime_seconds:
+            if remaining < settings.deepaffex_refresh_ahead_seconds:
+                self._schedule_refresh()
+            return dict(self._token)
+        
+        result = await self._flight.do("token", self._refresh)
+        return dict(result)
+    
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._flight.do("token", self._refresh))
+    
+    async def _refresh(self) -> Dict[str, Any]:
+        """Renew the cached token, or request a new one. Returns the token response."""
+        result = None
+        if self._token is not None and self._token.get("refreshToken"):
+            result = await self._request_token(
+                settings.deepaffex_renew_path,
+                {"token": self._token["token"], "refreshToken": self._token["refreshToken"]},
+            )
+            if result["status"] != "200":
+                logger.warning(f"DeepAffex token renewal failed, requesting a new token: {result.get('error')}")
+                result = None
+        
+        if result is None:
+            result = await self._request_token(
+                "/api/v2/auth/token",
+                {"licenseKey": self.license_key, "studyId": self.study_id},
+            )
+        
+        if result["status"] == "200":
+            self._token = result
+            self._expires_at = _token_expiry(result["token"])
+        elif self._token is not None and self._expires_at - time.time() > settings.deepaffex_min_token_lifetime_seconds:
+            # Keep serving the current token until it really runs out
+            return self._token
+        return result
+    
+    async def _request_token(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            # DeepAffex token generation endpoint
-            token_url = f"https://{self.api_url}/api/v2/auth/token"
+            response = await get_deepaffex_client().post(f"https://{self.api_url}{path}", json=payload)
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    token_url,
-                    json={
-                        "licenseKey": self.license_key,
-                        "studyId": self.study_id
-                    },
-                    headers={
-                        "Content-Type": "application/json"
-                    }
-                )
+            if response.status_code == 200:
+                data = response.json()
+                logger.info("Successfully generated DeepAffex token")
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info("Successfully generated DeepAffex token")
-                    
-                    return {
-                        "status": "200",
-                        "token": data.get("token"),
-                        "refreshToken": data.get("refreshToken")
-                    }
-                else:
-                    logger.error(f"Failed to generate token: {response.status_code} - {response.text}")
-                    return {
-                        "status": str(response.status_code),
-                        "error": f"Token generation failed: {response.text}"
-                    }
-                    
+                return {
+                    "status": "200",
+                    "token": data.get("token"),
+                    "refreshToken": data.get("refreshToken")
+                }
+            else:
+                logger.error(f"Failed to generate token: {response.status_code} - {response.text}")
+                return {
+                    "status": str(response.status_code),
+                    "error": f"Token generation failed: {response.text}"
+                }
+        
         except httpx.TimeoutException:
             logger.error("Timeout while generating DeepAffex token")
             return {
@@ -91,4 +172,17 @@ class DeepAffexService:
             return {
                 "status": "500",
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+
+_deepaffex_service: Optional[DeepAffexService] = None
+
+
+def get_deepaffex_service() -> DeepAffexService:
+    """Return the process-wide DeepAffexService."""
+    global _deepaffex_service
+
+    if _deepaffex_service is None:
+        _deepaffex_service = DeepAffexService()
+
+    return _deepaffex_service
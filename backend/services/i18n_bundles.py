@@ -0,0 +1,222 @@
+"""
+i18n Bundle Service - HoloCheck Equilibria
+Resolves translation bundles (overrides > locale > base locale) and caches them
+per (screen_code, locale, organization_id).
+
+A resolved bundle is a flat {key: text} dict plus a content-hash ETag. Several
+screens missing from the cache are resolved with a single query, shared by
+concurrent requests missing the same screens.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import SingleFlight, TTLCache
+from core.config import settings
+from core.http_cache import compute_etag
+
+logger = logging.getLogger(__name__)
+
+
+# Same resolution rules as the original per-screen query, for a list of screens:
+# organization overrides (2) > exact locale (1) > base locale fallback (0)
+BUNDLES_QUERY = text("""
+    WITH base_translations AS (
+        SELECT
+            n.screen_code,
+            k.key as translation_key,
+            t.text as translation_text,
+            1 as priority
+        FROM i18n_keys k
+        JOIN i18n_namespaces n ON k.namespace_id = n.id
+        JOIN i18n_translations t ON t.key_id = k.id
+        WHERE n.screen_code = ANY(:screen_codes)
+        AND t.locale = :locale
+    ),
+    override_translations AS (
+        SELECT
+            n.screen_code,
+            k.key as translation_key,
+            o.text as translation_text,
+            2 as priority
+        FROM i18n_keys k
+        JOIN i18n_namespaces n ON k.namespace_id = n.id
+        LEFT JOIN i18n_overrides o ON o.key_id = k.id
+        WHERE n.screen_code = ANY(:screen_codes)
+        AND o.locale = :locale
+        AND (:organization_id IS NULL OR o.organization_id = :organization_id)
+    ),
+    fallback_translations AS (
+        SELECT
+            n.screen_code,
+            k.key as translation_key,
+            t.text as translation_text,
+            0 as priority
+        FROM i18n_keys k
+        JOIN i18n_namespaces n ON k.namespace_id = n.id
+        JOIN i18n_translations t ON t.key_id = k.id
+        WHERE n.screen_code = ANY(:screen_codes)
+        AND t.locale = :base_locale
+        AND NOT EXISTS (
+            SELECT 1 FROM base_translations bt
+            WHERE bt.screen_code = n.screen_code
+            AND bt.translation_key = k.key
+        )
+    )
+    SELECT DISTINCT ON (screen_code, translation_key)
+        screen_code,
+        translation_key,
+        translation_text
+    FROM (
+        SELECT * FROM override_translations
+        UNION ALL
+        SELECT * FROM base_translations
+        UNION ALL
+        SELECT * FROM fallback_translations
+    ) combined
+    ORDER BY screen_code, translation_key, priority DESC
+""")
+
+
+def base_locale_of(locale: str) -> str:
+    """Extract base locale for fallback (e.g., es-CR -> es)."""
+    return locale.split('-')[0] if '-' in locale else locale
+
+
+class I18nBundleService:
+    """Cached, resolved translation bundles."""
+
+    def __init__(self):
+        self.cache = TTLCache(
+            "i18n_bundles",
+            ttl=settings.i18n_bundle_ttl_seconds,
+            max_entries=settings.i18n_bundle_max_entries,
+        )
+        self._flight = SingleFlight("i18n_bundles")
+
+    async def get_bundle(
+        self,
+        db: AsyncSession,
+        screen_code: str,
+        locale: str,
+        organization_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get the resolved bundle for one screen.
+
+        Returns:
+            dict with `translations` ({key: text}) and `etag`.
+        """
+        bundles = await self.get_bundles(db, [screen_code], locale, organization_id)
+        return bundles[screen_code]
+
+    async def get_bundles(
+        self,
+        db: AsyncSession,
+        screen_codes: Iterable[str],
+        locale: str,
+        organization_id: Optional[str] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get resolved bundles for several screens; cache misses share one query."""
+        screen_codes = list(dict.fromkeys(screen_codes))
+        bundles: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+
+        for screen_code in screen_codes:
+            bundle = self.cache.get((screen_code, locale, organization_id))
+            if bundle is None:
+                missing.append(screen_code)
+            else:
+                bundles[screen_code] = bundle
+
+        if missing:
+            resolved = await self._flight.do(
+                (tuple(missing), locale, organization_id),
+                lambda: self._load(db, missing, locale, organization_id),
+            )
+            bundles.update(resolved)
+
+        return bundles
+
+    async def _load(
+        self,
+        db: AsyncSession,
+        screen_codes: List[str],
+        locale: str,
+        organization_id: Optional[str],
+    ) -> Dict[str, Dict[str, Any]]:
+        # Bundles resolved before an invalidation that lands mid-query are not cached
+        epoch = self.cache.epoch
+        resolved = await self._resolve(db, screen_codes, locale, organization_id)
+        bundles: Dict[str, Dict[str, Any]] = {}
+        for screen_code in screen_codes:
+            translations = resolved.get(screen_code, {})
+            bundle = {"translations": translations, "etag": compute_etag(translations)}
+            self.cache.set_if_current((screen_code, locale, organization_id), bundle, epoch)
+            bundles[screen_code] = bundle
+        return bundles
+
+    async def _resolve(
+        self,
+        db: AsyncSession,
+        screen_codes: List[str],
+        locale: str,
+        organization_id: Optional[str],
+    ) -> Dict[str, Dict[str, str]]:
+        result = await db.execute(
+            BUNDLES_QUERY,
+            {
+                "screen_codes": screen_codes,
+                "locale": locale,
+                "base_locale": base_locale_of(locale),
+                "organization_id": organization_id,
+            }
+        )
+
+        resolved: Dict[str, Dict[str, str]] = {}
+        for row in result.fetchall():
+            resolved.setdefault(row.screen_code, {})[row.translation_key] = row.translation_text
+
+        logger.info(f"✓ Resolved i18n bundles for {screen_codes} ({locale}, org={organization_id})")
+        return resolved
+
+    def invalidate(
+        self,
+        screen_code: Optional[str] = None,
+        locale: Optional[str] = None,
+        organization_id: Optional[str] = None,
+    ) -> int:
+        """
+        Drop cached bundles after translations or overrides change.
+        Each argument narrows the match; no arguments drops everything.
+
+        A changed base locale (e.g. `es`) also affects its regional variants
+        (`es-CR`), so locale matching includes them.
+        """
+        def matches(key) -> bool:
+            cached_screen, cached_locale, cached_org = key
+            if screen_code is not None and cached_screen != screen_code:
+                return False
+            if locale is not None and cached_locale != locale and base_locale_of(cached_locale) != locale:
+                return False
+            # Bundles without organization_id include every override, so they always match
+            if organization_id is not None and cached_org not in (organization_id, None):
+                return False
+            return True
+
+        return self.cache.invalidate_where(matches)
+
+
+_i18n_bundle_service: Optional[I18nBundleService] = None
+
+
+def get_i18n_bundle_service() -> I18nBundleService:
+    """Return the process-wide I18nBundleService."""
+    global _i18n_bundle_service
+
+    if _i18n_bundle_service is None:
+        _i18n_bundle_service = I18nBundleService()
+
+    return _i18n_bundle_service
@@ -0,0 +1,298 @@
+"""
+Insight Batch Runner - HoloCheck Equilibria
+Generates department AI insights and organization metric snapshots in bulk.
+
+For every organization the runner aggregates recent biometric measurements
+per department (one grouped query for all organizations), renders the
+department prompt from the prompt registry (built-in default as a fallback),
+calls `AIHubService` with bounded parallelism, a token-bucket rate limit and
+retries, and bulk-inserts the results:
+
+- `department_insights`: one AI summary per department with scans
+- `organization_insights`: one aggregated metrics row per organization
+
+The runner is a separate process, so it cannot drop the API workers'
+in-memory dashboard cache: leader/HR dashboards pick up new insights once
+their cached scope expires (`dashboard_cache_ttl_seconds`, then served stale
+for up to `dashboard_cache_stale_seconds` while it refreshes).
+
+Run nightly with:
+    python -m services.insight_batch [--days 30] [--organization <uuid>] [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, text
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from models.department_insights import Department_insights
+from models.organization_insights import OrganizationInsight
+from schemas.aihub import ChatMessage, GenTxtRequest
+from services.aihub import AICapacityError, AIHubService
+from services.prompt_registry import CompiledPrompt, PromptIndex, get_prompt_registry
+from services.usage_accounting import get_usage_accumulator
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK_SIZE = 500
+
+DEFAULT_DEPARTMENT_PROMPT = (
+    "You are an occupational wellbeing analyst. Using the aggregated biometric "
+    "metrics of the department '{department_name}' over the last {days} days, "
+    "write a concise summary of the team's stress, fatigue, cognitive load and "
+    "recovery, highlight risks and suggest two or three concrete actions for the leader."
+)
+_DEFAULT_DEPARTMENT_PROMPT = CompiledPrompt(DEFAULT_DEPARTMENT_PROMPT)
+
+DEPARTMENT_METRICS_QUERY = text("""
+    SELECT
+        up.organization_id,
+        up.department_id,
+        d.name AS department_name,
+        COUNT(*) AS total_scans,
+        COUNT(DISTINCT bm.user_id) AS employees_scanned,
+        AVG(bm.ai_stress) AS avg_stress,
+        AVG(bm.ai_fatigue) AS avg_fatigue,
+        AVG(bm.ai_cognitive_load) AS avg_cognitive_load,
+        AVG(bm.ai_recovery) AS avg_recovery,
+        AVG(bm.mental_score) AS avg_mental_score,
+        AVG(bm.health_score) AS avg_health_score,
+        AVG(bm.cvd_risk) AS avg_cvd_risk
+    FROM biometric_measurements bm
+    JOIN user_profiles up ON up.user_id = bm.user_id
+    JOIN departments d ON d.id = up.department_id
+    WHERE bm.created_at >= :since
+    AND up.organization_id IS NOT NULL
+    AND (CAST(:organization_id AS uuid) IS NULL OR up.organization_id = CAST(:organization_id AS uuid))
+    GROUP BY up.organization_id, up.department_id, d.name
+""")
+
+ORGANIZATION_EMPLOYEES_QUERY = text("""
+    SELECT organization_id, COUNT(*) AS total_employees
+    FROM user_profiles
+    WHERE organization_id IS NOT NULL
+    AND (CAST(:organization_id AS uuid) IS NULL OR organization_id = CAST(:organization_id AS uuid))
+    GROUP BY organization_id
+""")
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _round(value: Any) -> Optional[float]:
+    return round(float(value), 3) if value is not None else None
+
+
+class InsightBatchRunner:
+    """One batch run over all (or one) organizations."""
+
+    def __init__(
+        self,
+        days: int = None,
+        model: str = None,
+        concurrency: int = None,
+        requests_per_minute: int = None,
+        max_retries: int = None,
+        dry_run: bool = False,
+    ):
+        self.days = days or settings.insight_batch_window_days
+        self.model = model or settings.insight_batch_model
+        self.concurrency = concurrency or settings.insight_batch_concurrency
+        self.max_retries = settings.insight_batch_max_retries if max_retries is None else max_retries
+        self.dry_run = dry_run
+        rpm = requests_per_minute or settings.insight_batch_requests_per_minute
+        self.bucket = TokenBucket(rate=rpm / 60.0, capacity=max(1, self.concurrency))
+        self.ai = AIHubService()
+
+    async def run(self, organization_id: Optional[str] = None) -> Dict[str, int]:
+        started = time.monotonic()
+        # biometric_measurements.created_at is a naive UTC timestamp
+        since = datetime.utcnow() - timedelta(days=self.days)
+
+        departments, employees = await self._load_aggregates(since, organization_id)
+        prompts = await get_prompt_registry().index()
+        logger.info(f"🧮 [InsightBatch] {len(departments)} departments in {len(employees)} organizations, window={self.days}d")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(dept: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._department_insight(dept, prompts)
+
+        # One failing department must not discard the insights already generated
+        results = await asyncio.gather(*(bounded(dept) for dept in departments), return_exceptions=True)
+        department_rows = []
+        for dept, result in zip(departments, results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ [InsightBatch] Department {dept['department_id']} failed: {result}")
+            elif result is not None:
+                department_rows.append(result)
+        organization_rows = self._organization_rows(departments, employees)
+
+        if not self.dry_run:
+            await self._bulk_insert(Department_insights, department_rows)
+            await self._bulk_insert(OrganizationInsight, organization_rows)
+
+        summary = {
+            "departments": len(departments),
+            "department_insights": len(department_rows),
+            "failed": len(departments) - len(department_rows),
+            "organization_insights": len(organization_rows),
+        }
+        logger.info(f"✅ [InsightBatch] Done in {time.monotonic() - started:.1f}s: {summary}")
+        return summary
+
+    async def _load_aggregates(self, since: datetime, organization_id: Optional[str]):
+        params = {"since": since, "organization_id": organization_id}
+        async with AsyncSessionLocal() as session:
+            dept_result = await session.execute(DEPARTMENT_METRICS_QUERY, params)
+            departments = [dict(row._mapping) for row in dept_result.fetchall()]
+            emp_result = await session.execute(ORGANIZATION_EMPLOYEES_QUERY, {"organization_id": organization_id})
+            employees = {str(row.organization_id): row.total_employees for row in emp_result.fetchall()}
+        return departments, employees
+
+    async def _department_insight(self, dept: Dict[str, Any], prompts: PromptIndex) -> Optional[Dict[str, Any]]:
+        org_id = str(dept["organization_id"])
+        metrics = {
+            "department_name": dept["department_name"],
+            "days": self.days,
+            "employees_scanned": dept["employees_scanned"],
+            "total_scans": dept["total_scans"],
+            "avg_stress": _round(dept["avg_stress"]),
+            "avg_fatigue": _round(dept["avg_fatigue"]),
+            "avg_cognitive_load": _round(dept["avg_cognitive_load"]),
+            "avg_recovery": _round(dept["avg_recovery"]),
+            "avg_mental_score": _round(dept["avg_mental_score"]),
+            "avg_health_score": _round(dept["avg_health_score"]),
+            "avg_cvd_risk": _round(dept["avg_cvd_risk"]),
+        }
+        prompt = prompts.resolve("department", organization_id=org_id, model_version=self.model) or _DEFAULT_DEPARTMENT_PROMPT
+        request = GenTxtRequest(
+            model=self.model,
+            temperature=0,
+            max_tokens=settings.insight_batch_max_tokens,
+            messages=[
+                ChatMessage(role="system", content=prompt.render(metrics)),
+                ChatMessage(role="user", content="Department metrics:\n" + json.dumps(metrics, ensure_ascii=False)),
+            ],
+        )
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                response = await self.ai.gentxt(request, organization_id=org_id)
+                if not response.content.strip():
+                    raise RuntimeError("empty completion")
+                return {
+                    "id": uuid.uuid4(),
+                    "department_id": dept["department_id"],
+                    "summary": response.content.strip(),
+                    "created_at": datetime.now(timezone.utc),
+                }
+            except ValueError as e:
+                # Configuration errors and malformed replies (ValidationError) will not fix themselves
+                logger.error(f"❌ [InsightBatch] Department {dept['department_id']} failed: {e}")
+                return None
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"❌ [InsightBatch] Department {dept['department_id']} failed after {attempt + 1} attempts: {e}")
+                    return None
+                delay = (e.retry_after if isinstance(e, AICapacityError) else 2 ** attempt) + random.uniform(0, 1)
+                logger.warning(f"⚠️ [InsightBatch] Department {dept['department_id']} attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        return None
+
+    def _organization_rows(self, departments: List[Dict[str, Any]], employees: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Scan-weighted organization stress index from the department aggregates."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for dept in departments:
+            if dept["avg_stress"] is None:
+                continue
+            org = totals.setdefault(str(dept["organization_id"]), {"weighted": 0.0, "scans": 0})
+            org["weighted"] += float(dept["avg_stress"]) * dept["total_scans"]
+            org["scans"] += dept["total_scans"]
+
+        today = date.today()
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "id": uuid.uuid4(),
+                "organization_id": uuid.UUID(org_id),
+                "analysis_date": today,
+                "total_employees": employees.get(org_id, 0),
+                "stress_index": round(org["weighted"] / org["scans"], 3),
+                "updated_at": now,
+            }
+            for org_id, org in totals.items()
+            if org["scans"]
+        ]
+
+    async def _bulk_insert(self, model, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        async with AsyncSessionLocal() as session:
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                await session.execute(insert(model), rows[start:start + INSERT_CHUNK_SIZE])
+            await session.commit()
+        logger.info(f"💾 [InsightBatch] Inserted {len(rows)} rows into {model.__tablename__}")
+
+
+async def run_insight_batch(organization_id: Optional[str] = None, **options) -> Dict[str, int]:
+    """Run one insight batch (all organizations unless `organization_id` is given)."""
+    try:
+        return await InsightBatchRunner(**options).run(organization_id)
+    finally:
+        # The process usually exits right after; do not lose the token counters
+        await get_usage_accumulator().stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate department/organization insights in bulk")
+    parser.add_argument("--organization", help="Only this organization (UUID)")
+    parser.add_argument("--days", type=int, help="Measurement window in days")
+    parser.add_argument("--model", help="AI Hub model")
+    parser.add_argument("--concurrency", type=int, help="Parallel AI calls")
+    parser.add_argument("--rpm", type=int, help="AI requests per minute")
+    parser.add_argument("--dry-run", action="store_true", help="Generate without inserting")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    summary = asyncio.run(run_insight_batch(
+        organization_id=args.organization,
+        days=args.days,
+        model=args.model,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        dry_run=args.dry_run,
+    ))
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
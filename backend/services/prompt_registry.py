@@ -0,0 +1,203 @@
+"""
+Prompt Registry - HoloCheck Equilibria
+Loads active prompts once, compiles their templates and indexes them by
+(organization_id, target, audience, language, model_version).
+
+Templates use `{name}` (or `{{name}}`) placeholders. Compilation validates
+them, escapes every other brace (so JSON examples in a prompt are safe) and
+produces a plain format string, so rendering is a dictionary lookup plus one
+`format_map` call. The prompts router drops the registry on every write and
+the next lookup reloads it.
+
+Resolution falls back from the most specific key to the generic one:
+organization > global, then audience, language (exact > base > any) and
+model version. `param_prompt_templates` rows (indexed by their `type` as
+target) are the last fallback.
+"""
+import logging
+import re
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from core.cache import TTLCache
+from core.config import settings
+from core.database import AsyncSessionLocal
+from models.param_prompt_templates import ParamPromptTemplate
+from models.prompts import Prompts
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\{\{?\s*([^{}\s]*)\s*\}?\}")
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+PromptKey = Tuple[Optional[str], str, Optional[str], Optional[str], Optional[str]]
+
+
+class _KeepMissing(dict):
+    """format_map context that leaves unknown placeholders as written."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+class CompiledPrompt:
+    """A validated, pre-escaped prompt template."""
+
+    __slots__ = ("source", "placeholders", "prompt_id", "_format")
+
+    def __init__(self, source: str, prompt_id: Optional[str] = None):
+        self.source = source
+        self.prompt_id = prompt_id
+        placeholders = []
+        parts = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            parts.append(_escape(source[position:match.start()]))
+            name = match.group(1)
+            if _IDENTIFIER.match(name):
+                placeholders.append(name)
+                parts.append("{" + name + "}")
+            else:
+                # Not a placeholder (e.g. a JSON object or `{}`): keep it literally
+                parts.append(_escape(match.group(0)))
+            position = match.end()
+        parts.append(_escape(source[position:]))
+        self.placeholders: FrozenSet[str] = frozenset(placeholders)
+        self._format = "".join(parts)
+
+    def render(self, context: Dict[str, Any], strict: bool = False) -> str:
+        """
+        Fill the placeholders from `context`. Unknown placeholders are left as
+        written, unless `strict` is set, in which case they raise KeyError.
+        """
+        if strict:
+            missing = self.placeholders - context.keys()
+            if missing:
+                raise KeyError(f"Missing prompt variables: {', '.join(sorted(missing))}")
+        return self._format.format_map(_KeepMissing(context))
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _norm(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().lower()
+    return value or None
+
+
+class PromptIndex:
+    """Immutable lookup table built from one load of the prompt tables."""
+
+    def __init__(self, prompts: Dict[PromptKey, CompiledPrompt]):
+        self._prompts = prompts
+
+    def __len__(self) -> int:
+        return len(self._prompts)
+
+    def resolve(
+        self,
+        target: str,
+        organization_id: Optional[str] = None,
+        audience: Optional[str] = None,
+        language: Optional[str] = None,
+        model_version: Optional[str] = None,
+    ) -> Optional[CompiledPrompt]:
+        """Most specific active prompt for the arguments, or None."""
+        for key in _candidate_keys(target, organization_id, audience, language, model_version):
+            prompt = self._prompts.get(key)
+            if prompt is not None:
+                return prompt
+        return None
+
+
+def _candidate_keys(
+    target: str,
+    organization_id: Optional[str],
+    audience: Optional[str],
+    language: Optional[str],
+    model_version: Optional[str],
+) -> Iterator[PromptKey]:
+    target = _norm(target)
+    organizations = [str(organization_id), None] if organization_id else [None]
+    audiences = [_norm(audience), None] if _norm(audience) else [None]
+    language = _norm(language)
+    languages = list(dict.fromkeys([language, language.split("-")[0], None])) if language else [None]
+    model_versions = [_norm(model_version), None] if _norm(model_version) else [None]
+
+    for org in organizations:
+        for aud in audiences:
+            for lang in languages:
+                for version in model_versions:
+                    yield (org, target, aud, lang, version)
+
+
+class PromptRegistry:
+    """Process-wide, lazily loaded prompt index."""
+
+    _KEY = "prompts"
+
+    def __init__(self):
+        self.cache = TTLCache("prompt_registry", ttl=settings.prompt_registry_ttl_seconds)
+
+    async def index(self) -> PromptIndex:
+        """Current index (loaded on first use and after invalidation)."""
+        return await self.cache.get_or_load(self._KEY, self._load)
+
+    async def resolve(self, target: str, **kwargs) -> Optional[CompiledPrompt]:
+        return (await self.index()).resolve(target, **kwargs)
+
+    def invalidate(self) -> None:
+        self.cache.invalidate(self._KEY)
+        logger.info("🔄 [Prompts] Registry invalidated")
+
+    async def _load(self) -> PromptIndex:
+        prompts: Dict[PromptKey, CompiledPrompt] = {}
+
+        async with AsyncSessionLocal() as session:
+            templates_result = await session.execute(select(ParamPromptTemplate))
+            templates = {str(t.id): t for t in templates_result.scalars().all()}
+
+            result = await session.execute(
+                select(Prompts)
+                .where(Prompts.active.isnot(False))
+                .order_by(Prompts.updated_at.desc().nullslast(), Prompts.created_at.desc().nullslast())
+            )
+            rows: List[Prompts] = result.scalars().all()
+
+        for prompt in rows:
+            template = templates.get(str(prompt.prompt_template_id)) if prompt.prompt_template_id else None
+            text = prompt.content or prompt.prompt_text or (template.content if template else None)
+            if not text or not prompt.target:
+                continue
+            key = (
+                str(prompt.organization_id) if prompt.organization_id else None,
+                _norm(prompt.target),
+                _norm(prompt.audience),
+                _norm(prompt.language),
+                _norm(prompt.model_version),
+            )
+            # Rows are newest first: the first one wins
+            if key not in prompts:
+                prompts[key] = CompiledPrompt(text, prompt_id=str(prompt.id))
+
+        for template in templates.values():
+            if template.type and template.content:
+                prompts.setdefault((None, _norm(template.type), None, None, None), CompiledPrompt(template.content))
+
+        logger.info(f"✅ [Prompts] Registry loaded with {len(prompts)} compiled prompts")
+        return PromptIndex(prompts)
+
+
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the process-wide PromptRegistry."""
+    global _prompt_registry
+
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry()
+
+    return _prompt_registry
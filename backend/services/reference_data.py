@@ -0,0 +1,173 @@
+"""
+Reference Data Service - HoloCheck Equilibria
+Serves the parameter tables (param_*) from an in-process cache.
+
+These tables change only through admin maintenance, so every table is loaded
+once, kept for `reference_data_ttl_seconds`, and dropped explicitly with
+`invalidate()` whenever an admin writes to it.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from core.cache import TTLCache
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.http_cache import compute_etag
+from core.supabase_client import get_supabase_admin
+from models.param_countries import ParamCountry
+from models.param_industries import ParamIndustry
+from models.param_prompt_templates import ParamPromptTemplate
+from models.param_roles import ParamRole
+from models.param_sectors import ParamSector
+from models.param_subscription_plans import ParamSubscriptionPlan
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== LOADERS ====================
+
+async def _load_industries() -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(ParamIndustry).order_by(ParamIndustry.name))
+        return [{"id": item.id, "name": item.name} for item in result.scalars().all()]
+
+
+async def _load_sectors() -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(ParamSector).order_by(ParamSector.name))
+        return [{"id": item.id, "name": item.name} for item in result.scalars().all()]
+
+
+async def _load_subscription_plans() -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(ParamSubscriptionPlan).order_by(ParamSubscriptionPlan.name))
+        return [
+            {
+                "id": item.id,
+                "name": item.name,
+                "min_users": item.min_users,
+                "max_users": item.max_users,
+                "scans_per_user_month": item.scans_per_user_month,
+                "dept_analyses_per_month": item.dept_analyses_per_month,
+                "org_analyses_per_month": item.org_analyses_per_month,
+                "price_usd": float(item.price_usd) if item.price_usd else None,
+            }
+            for item in result.scalars().all()
+        ]
+
+
+async def _load_countries() -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(ParamCountry).order_by(ParamCountry.name))
+        return [{"code": item.code, "name": item.name} for item in result.scalars().all()]
+
+
+async def _load_roles() -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(ParamRole).order_by(ParamRole.name))
+        return [{"code": item.code, "name": item.name} for item in result.scalars().all()]
+
+
+async def _load_prompt_templates() -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(ParamPromptTemplate))
+        return [
+            {"id": str(item.id), "scope": item.scope, "type": item.type, "content": item.content}
+            for item in result.scalars().all()
+        ]
+
+
+async def _load_biometric_indicators_info() -> List[Dict[str, Any]]:
+    supabase = get_supabase_admin()
+    response = supabase.table('param_biometric_indicators_info').select('*').execute()
+    return response.data or []
+
+
+LOADERS: Dict[str, Callable[[], Awaitable[List[Dict[str, Any]]]]] = {
+    "param_industries": _load_industries,
+    "param_sectors": _load_sectors,
+    "param_subscription_plans": _load_subscription_plans,
+    "param_countries": _load_countries,
+    "param_roles": _load_roles,
+    "param_prompt_templates": _load_prompt_templates,
+    "param_biometric_indicators_info": _load_biometric_indicators_info,
+}
+
+
+# ==================== SERVICE ====================
+
+class ReferenceDataService:
+    """Cached access to parameter/reference tables."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.cache = TTLCache("reference_data", ttl=ttl or settings.reference_data_ttl_seconds)
+
+    @staticmethod
+    def tables() -> List[str]:
+        """Names of the tables served by this service."""
+        return list(LOADERS.keys())
+
+    async def get(self, table: str) -> Dict[str, Any]:
+        """
+        Get a reference table.
+
+        Returns:
+            dict with `items` (list of rows) and `etag` (strong ETag of the items).
+
+        Raises:
+            KeyError: if `table` is not a known reference table.
+        """
+        if table not in LOADERS:
+            raise KeyError(table)
+        return await self.cache.get_or_load(table, lambda: self._load(table))
+
+    async def get_items(self, table: str) -> List[Dict[str, Any]]:
+        """Shortcut returning only the rows of a reference table."""
+        return (await self.get(table))["items"]
+
+    async def _load(self, table: str) -> Dict[str, Any]:
+        items = await LOADERS[table]()
+        logger.info(f"📚 [ReferenceData] Loaded {len(items)} rows from {table}")
+        return {"items": items, "etag": compute_etag(items)}
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop one table (or all tables) so the next read reloads it."""
+        if table is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(table)
+            logger.info(f"📚 [ReferenceData] Invalidated {table}")
+
+    async def warm_up(self) -> None:
+        """Load every reference table. Failures are logged, never raised."""
+        for table in LOADERS:
+            try:
+                await self.get(table)
+            except Exception as e:
+                logger.warning(f"⚠️ [ReferenceData] Warm-up failed for {table}: {e}")
+
+
+_reference_data_service: Optional[ReferenceDataService] = None
+
+
+def get_reference_data_service() -> ReferenceDataService:
+    """Return the process-wide ReferenceDataService."""
+    global _reference_data_service
+
+    if _reference_data_service is None:
+        _reference_data_service = ReferenceDataService()
+
+    return _reference_data_service
+
+
+async def initialize_reference_data():
+    """Warm the reference data cache - non-blocking"""
+    try:
+        logger.info("🔄 Warming reference data cache...")
+        await get_reference_data_service().warm_up()
+        logger.info("✅ Reference data cache warmed")
+    except Exception as e:
+        logger.error(f"❌ Reference data warm-up error: {e}")
+        # Don't raise - allow app to start
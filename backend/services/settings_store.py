@@ -0,0 +1,169 @@
+"""
+Settings Store - HoloCheck Equilibria
+Serves application settings (`app_settings`) and tenant settings
+(`tenant_settings`) from memory.
+
+Settings are read far more often than written, so they are loaded into
+snapshots kept for `settings_cache_ttl_seconds` (then refreshed in the
+background) and dropped whenever the settings routers write. A tenant
+snapshot bundles the global settings and the tenant's own row under a single
+version, so hot paths can check feature flags without any I/O once warm.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from core.cache import TTLCache
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.http_cache import compute_etag
+from models.app_settings import App_settings
+from models.tenant_settings import Tenant_settings
+
+logger = logging.getLogger(__name__)
+
+_APP_KEY = ("app",)
+
+# Tenant flags/values exposed in snapshots
+TENANT_SETTING_FIELDS = (
+    "ai_enabled",
+    "ai_model",
+    "visualization_enabled",
+    "custom_prompts_enabled",
+    "global_prompt_employee",
+    "global_prompt_department",
+    "global_prompt_organization",
+    "reminder_frequency",
+    "report_frequency",
+)
+
+
+class SettingsSnapshot:
+    """Immutable view of the settings in effect for a tenant (or globally)."""
+
+    __slots__ = ("tenant_id", "app", "tenant", "version")
+
+    def __init__(self, tenant_id: Optional[str], app: Dict[str, Any], tenant: Dict[str, Any], version: str):
+        self.tenant_id = tenant_id
+        self.app = app
+        self.tenant = tenant
+        self.version = version
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Tenant value if set, else the global app setting, else ``default``."""
+        value = self.tenant.get(key)
+        if value is None:
+            value = self.app.get(key)
+        return default if value is None else value
+
+    def is_enabled(self, flag: str, default: bool = False) -> bool:
+        """Boolean feature flag; app settings store strings such as 'true'/'1'."""
+        value = self.get(flag)
+        if value is None:
+            return default
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tenant_id": self.tenant_id,
+            "version": self.version,
+            "app": self.app,
+            "tenant": self.tenant,
+        }
+
+
+class SettingsStore:
+    """In-memory app/tenant settings with write invalidation."""
+
+    def __init__(self):
+        self.cache = TTLCache(
+            "settings",
+            ttl=settings.settings_cache_ttl_seconds,
+            stale_ttl=settings.settings_cache_stale_seconds,
+            max_entries=settings.settings_cache_max_entries,
+        )
+
+    # ---------- App settings ----------
+
+    async def get_app_rows(self) -> List[Dict[str, Any]]:
+        """All app_settings rows ({id, setting_key, setting_value}), ordered by key."""
+        return (await self._app())["rows"]
+
+    async def get_app_setting(self, setting_key: str) -> Optional[Dict[str, Any]]:
+        """One app_settings row by key, or None."""
+        return (await self._app())["by_key"].get(setting_key)
+
+    async def _app(self) -> Dict[str, Any]:
+        return await self.cache.get_or_load_swr(_APP_KEY, self._load_app)
+
+    async def _load_app(self) -> Dict[str, Any]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(App_settings).order_by(App_settings.setting_key))
+            rows = [
+                {"id": item.id, "setting_key": item.setting_key, "setting_value": item.setting_value}
+                for item in result.scalars().all()
+            ]
+        logger.info(f"⚙️ [Settings] Loaded {len(rows)} app settings")
+        return {
+            "rows": rows,
+            "by_key": {row["setting_key"]: row for row in rows if row["setting_key"]},
+            "values": {row["setting_key"]: row["setting_value"] for row in rows if row["setting_key"]},
+        }
+
+    # ---------- Snapshots ----------
+
+    async def snapshot(self, tenant_id: Optional[str] = None) -> SettingsSnapshot:
+        """
+        Settings in effect for ``tenant_id`` (global settings only when None).
+        Served from memory; the version changes whenever any value changes.
+        """
+        tenant_id = str(tenant_id) if tenant_id else None
+        return await self.cache.get_or_load_swr(("tenant", tenant_id), lambda: self._load_snapshot(tenant_id))
+
+    async def _load_snapshot(self, tenant_id: Optional[str]) -> SettingsSnapshot:
+        app_values = (await self._app())["values"]
+        tenant_values: Dict[str, Any] = {}
+
+        if tenant_id:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Tenant_settings)
+                    .where(Tenant_settings.tenant_id == tenant_id)
+                    .order_by(Tenant_settings.updated_at.desc().nullslast(), Tenant_settings.id.desc())
+                    .limit(1)
+                )
+                row = result.scalar_one_or_none()
+            if row is not None:
+                tenant_values = {field: getattr(row, field) for field in TENANT_SETTING_FIELDS}
+
+        version = compute_etag({"tenant_id": tenant_id, "app": app_values, "tenant": tenant_values})
+        return SettingsSnapshot(tenant_id, app_values, tenant_values, version)
+
+    # ---------- Invalidation ----------
+
+    def invalidate_app(self) -> None:
+        """App settings changed: every snapshot embeds them, so drop everything."""
+        self.cache.clear()
+
+    def invalidate_tenant(self, tenant_id: Optional[str] = None) -> None:
+        """Tenant settings changed for ``tenant_id`` (all tenants when None)."""
+        if tenant_id is None:
+            self.cache.invalidate_where(lambda key: key[0] == "tenant")
+        else:
+            self.cache.invalidate(("tenant", str(tenant_id)))
+
+
+_settings_store: Optional[SettingsStore] = None
+
+
+def get_settings_store() -> SettingsStore:
+    """Return the process-wide SettingsStore."""
+    global _settings_store
+
+    if _settings_store is None:
+        _settings_store = SettingsStore()
+
+    return _settings_store
@@ -1,11 +1,39 @@
+"""
+Object storage service.
+
+`StorageBackend` is the interface used by the routers and services;
+`get_storage_service()` returns the backend selected by `storage_backend`:
+`oss` (default, `OSSStorageBackend`, the remote ObjectStorage service) or
+`local` (`services.storage_local.LocalStorageBackend`, files on local disk
+for offline tests and benchmarks).
+
+Every OSS call goes through one process-wide `httpx.AsyncClient` (keep-alive
+pool, HTTP/2 when the `h2` package is installed), so listing, presigning and
+renaming many objects reuse connections instead of paying TCP+TLS setup per
+call. API calls and file transfers have separate timeouts, and idempotent
+calls are retried on transport errors and 429/5xx responses with jittered
+exponential backoff. The client is closed on application shutdown.
+
+Presigned download URLs are cached per (bucket, object key) until
+`presign_cache_margin_seconds` before their `expires_at`, so pages showing
+the same logos and images do not presign them again on every load;
+`create_download_urls` presigns a batch of keys concurrently.
+"""
+import asyncio
 import logging
-from typing import Literal, Optional, Union
+import random
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, List, Literal, Optional, Union
 from urllib.parse import urljoin
 
 import httpx
 import mimetypes
+from core.cache import SingleFlight, TTLCache
 from core.config import settings
+from core.http_cache import parse_timestamp
 from schemas.storage import (
+    BatchDownloadUrlResponse,
     BucketInfo,
     BucketListResponse,
     BucketRequest,
@@ -23,8 +51,176 @@ from schemas.storage import (
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Upstream statuses worth retrying for idempotent calls
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+_oss_client: Optional[httpx.AsyncClient] = None
+
+# Presigned download URLs by (bucket, object key); each entry lives until shortly before expires_at
+_download_url_cache = TTLCache("presigned_download_urls", ttl=0, max_entries=settings.presign_cache_max_entries)
+_download_url_flight = SingleFlight("presigned_download_urls")
+
+
+def get_oss_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client used for ObjectStorage calls."""
+    global _oss_client
+
+    if _oss_client is None:
+        _oss_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.oss_max_connections,
+                max_keepalive_connections=settings.oss_max_keepalive_connections,
+                keepalive_expiry=settings.oss_keepalive_expiry_seconds,
+            ),
+            timeout=_api_timeout(),
+        )
+        logger.info(f"✅ ObjectStorage client initialized (http2={HTTP2_AVAILABLE})")
+
+    return _oss_client
+
+
+async def close_oss_client() -> None:
+    """Close the shared client's connection pool (application shutdown)."""
+    global _oss_client
+
+    if _oss_client is not None:
+        await _oss_client.aclose()
+        _oss_client = None
+        logger.info("🔌 ObjectStorage client closed")
+
+
+def _api_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.oss_api_timeout_seconds, connect=settings.oss_connect_timeout_seconds)
+
+
+def _transfer_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.oss_transfer_timeout_seconds, connect=settings.oss_connect_timeout_seconds)
+
+
+def _cache_ttl(expires_at: Optional[str]) -> float:
+    """Seconds a presigned URL may be served from cache (0 when unknown or about to expire)."""
+    if not expires_at:
+        return 0
+    if str(expires_at).isdigit():
+        expires = datetime.fromtimestamp(int(expires_at), tz=timezone.utc)
+    else:
+        expires = parse_timestamp(expires_at)
+        if expires is None:
+            return 0
+    remaining = (expires - datetime.now(timezone.utc)).total_seconds()
+    return max(0.0, remaining - settings.presign_cache_margin_seconds)
+
+
+def invalidate_download_urls(bucket_name: str, object_keys: List[str]) -> None:
+    """Forget cached download URLs for objects that were renamed or deleted."""
+    keys = set(object_keys)
+    _download_url_cache.invalidate_where(lambda key: key[0] == bucket_name and key[1] in keys)
 
-class StorageService:
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry ``attempt`` (0-based)."""
+    return random.uniform(0, settings.oss_retry_backoff_seconds * (2 ** attempt))
+
+
+async def _send(method: str, url: str, idempotent: bool, **kwargs: Any) -> httpx.Response:
+    """
+    Send a request on the shared client and raise for error statuses.
+    Idempotent requests are retried up to ``oss_max_retries`` times.
+    """
+    client = get_oss_client()
+    attempts = settings.oss_max_retries + 1 if idempotent else 1
+
+    for attempt in range(attempts):
+        last = attempt == attempts - 1
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if last:
+                raise
+            delay = _backoff(attempt)
+            logger.warning(f"⚠️ ObjectStorage {method} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code in RETRYABLE_STATUS_CODES and not last:
+            delay = _backoff(attempt)
+            logger.warning(f"⚠️ ObjectStorage {method} returned {response.status_code}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        response.raise_for_status()
+        return response
+
+
+class StorageBackend(ABC):
+    """Object storage operations shared by every backend."""
+
+    @abstractmethod
+    async def create_bucket(self, request: BucketRequest) -> BucketResponse: ...
+
+    @abstractmethod
+    async def list_buckets(self) -> BucketListResponse: ...
+
+    @abstractmethod
+    async def list_objects(self, request: OSSBaseModel) -> ObjectListResponse: ...
+
+    @abstractmethod
+    async def get_object_info(self, request: ObjectRequest) -> ObjectInfo: ...
+
+    @abstractmethod
+    async def rename_object(self, request: RenameRequest) -> RenameResponse: ...
+
+    @abstractmethod
+    async def delete_object(self, request: ObjectRequest) -> DeleteResponse: ...
+
+    @abstractmethod
+    async def create_upload_url(self, request: FileUpDownRequest) -> FileUpDownResponse: ...
+
+    @abstractmethod
+    async def create_download_url(self, request: FileUpDownRequest) -> FileUpDownResponse: ...
+
+    @abstractmethod
+    async def upload_bytes(
+        self, bucket_name: str, object_key: str, data: bytes, content_type: Optional[str] = None
+    ) -> str: ...
+
+    @abstractmethod
+    async def upload_from_url(self, bucket_name: str, object_key: str, source_url: str) -> str: ...
+
+    @abstractmethod
+    async def download_bytes(self, bucket_name: str, object_key: str) -> tuple[bytes, str]: ...
+
+    async def create_download_urls(self, bucket_name: str, object_keys: List[str]) -> BatchDownloadUrlResponse:
+        """
+        Presign downloads for many objects of one bucket, with at most
+        `presign_batch_concurrency` upstream calls at a time. Per-key failures
+        are reported in `errors` instead of failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(settings.presign_batch_concurrency)
+        batch = BatchDownloadUrlResponse()
+
+        async def presign(object_key: str) -> None:
+            try:
+                request = FileUpDownRequest(bucket_name=bucket_name, object_key=object_key)
+                async with semaphore:
+                    batch.urls[object_key] = await self.create_download_url(request)
+            except Exception as e:
+                batch.errors[object_key] = str(e)
+
+        await asyncio.gather(*(presign(object_key) for object_key in dict.fromkeys(object_keys)))
+        return batch
+
+
+
+class OSSStorageBackend(StorageBackend):
     """Service for handling file upload and display with ObjectStorage service integration."""
 
     def __init__(self):
@@ -106,7 +302,7 @@ class StorageService:
             logger.error(f"Failed to get object metadata: {e}")
             raise
 
-    async def rename_object(self, request: RenameRequest) -> dict:
+    async def rename_object(self, request: RenameRequest) -> RenameResponse:
         endpoint = f"api/v1/infra/client/oss/buckets/{request.bucket_name}/objects/rename"
         payload = {
             "overwrite_key": request.overwrite_key,
@@ -115,6 +311,7 @@ class StorageService:
         }
         try:
             await self._apost_oss_service(endpoint, payload)
+            invalidate_download_urls(request.bucket_name, [request.source_key, request.target_key])
             return RenameResponse(success=True)
         except Exception as e:
             logger.error(f"Failed to rename object: {e}")
@@ -125,6 +322,7 @@ class StorageService:
         payload = {"object_keys": [request.object_key]}
         try:
             await self._adelete_oss_service(endpoint, payload)
+            invalidate_download_urls(request.bucket_name, [request.object_key])
             return DeleteResponse(success=True)
         except Exception as e:
             logger.error(f"Failed to rename object: {e}")
@@ -137,7 +335,8 @@ class StorageService:
         endpoint = f"/api/v1/infra/client/oss/buckets/{request.bucket_name}/objects/upload_url"
         payload = {"expires_in": 0, "object_key": request.object_key}
         try:
-            result = await self._apost_oss_service(endpoint, payload)
+            # Presigning has no side effects, so it is safe to retry
+            result = await self._apost_oss_service(endpoint, payload, idempotent=True)
             # Format response according to ObjectStorage service response
             return FileUpDownResponse(
                 upload_url=result.get("upload_url"),
@@ -150,7 +349,15 @@ class StorageService:
     async def create_download_url(self, request: FileUpDownRequest) -> FileUpDownResponse:
         """
         Create presigned URL for file download with access URL.
+        URLs are reused from cache until shortly before they expire.
         """
+        key = (request.bucket_name, request.object_key)
+        cached = _download_url_cache.get(key)
+        if cached is not None:
+            return cached
+        return await _download_url_flight.do(key, lambda: self._presign_download(request))
+
+    async def _presign_download(self, request: FileUpDownRequest) -> FileUpDownResponse:
         endpoint = f"/api/v1/infra/client/oss/buckets/{request.bucket_name}/objects/download_url"
         content_type, _ = mimetypes.guess_type(str(request.object_key))
         if not content_type:
@@ -161,25 +368,99 @@ class StorageService:
             "object_key": request.object_key,
         }
         try:
-            result = await self._apost_oss_service(endpoint, payload)
+            result = await self._apost_oss_service(endpoint, payload, idempotent=True)
             # Format response according to ObjectStorage service response
-            return FileUpDownResponse(
+            response = FileUpDownResponse(
                 download_url=result.get("download_url"),
                 expires_at=result.get("expires_at"),
             )
-
         except Exception as e:
-            logger.error(f"Failed to create upload URL: {e}")
+            logger.error(f"Failed to create download URL: {e}")
             raise
 
+        ttl = _cache_ttl(response.expires_at)
+        if ttl > 0:
+            _download_url_cache.set((request.bucket_name, request.object_key), response, ttl=ttl)
+        return response
+
+    async def upload_bytes(
+        self, bucket_name: str, object_key: str, data: bytes, content_type: Optional[str] = None
+    ) -> str:
+        """
+        Upload content through a presigned PUT URL.
+        Returns the (sanitized) object key actually written.
+        """
+        request = FileUpDownRequest(bucket_name=bucket_name, object_key=object_key)
+        upload = await self.create_upload_url(request)
+        content_type = content_type or mimetypes.guess_type(request.object_key)[0] or "application/octet-stream"
+        try:
+            await _send(
+                "PUT",
+                upload.upload_url,
+                idempotent=True,
+                content=data,
+                headers={"Content-Type": content_type},
+                timeout=_transfer_timeout(),
+            )
+            return request.object_key
+        except httpx.HTTPStatusError as e:
+            error_msg = f"ObjectStorage upload HTTP error: {e.response.status_code} - {e.response.text}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+    async def upload_from_url(self, bucket_name: str, object_key: str, source_url: str) -> str:
+        """
+        Copy a remote file into the bucket without holding it in memory when the
+        source announces its length (chunks are piped from GET to the presigned PUT).
+        Returns the (sanitized) object key actually written.
+        """
+        request = FileUpDownRequest(bucket_name=bucket_name, object_key=object_key)
+        upload = await self.create_upload_url(request)
+        client = get_oss_client()
+        try:
+            async with client.stream("GET", source_url, timeout=_transfer_timeout()) as source:
+                source.raise_for_status()
+                headers = {
+                    "Content-Type": source.headers.get("content-type")
+                    or mimetypes.guess_type(request.object_key)[0]
+                    or "application/octet-stream"
+                }
+                if "content-length" in source.headers and "content-encoding" not in source.headers:
+                    headers["Content-Length"] = source.headers["content-length"]
+                    content = source.aiter_bytes()
+                else:
+                    # Presigned PUTs need a length; buffer sources that do not send one
+                    content = await source.aread()
+                # Not retried: a streamed body cannot be replayed
+                await _send(
+                    "PUT", upload.upload_url, idempotent=False, content=content, headers=headers, timeout=_transfer_timeout()
+                )
+            return request.object_key
+        except httpx.HTTPStatusError as e:
+            error_msg = f"ObjectStorage copy HTTP error: {e.response.status_code} - {e.response.text}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+    async def download_bytes(self, bucket_name: str, object_key: str) -> tuple[bytes, str]:
+        """Fetch an object through a presigned GET URL. Returns (content, content_type)."""
+        download = await self.create_download_url(FileUpDownRequest(bucket_name=bucket_name, object_key=object_key))
+        try:
+            response = await _send("GET", download.download_url, idempotent=True, timeout=_transfer_timeout())
+            content_type = response.headers.get("content-type") or mimetypes.guess_type(object_key)[0] or "application/octet-stream"
+            return response.content, content_type
+        except httpx.HTTPStatusError as e:
+            error_msg = f"ObjectStorage download HTTP error: {e.response.status_code} - {e.response.text}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
     async def _aget_oss_service(self, endpoint: str, params: dict) -> dict:
-        return await self._arequest_oss_service("GET", endpoint, params=params)
+        return await self._arequest_oss_service("GET", endpoint, params=params, idempotent=True)
 
-    async def _apost_oss_service(self, endpoint: str, payload: dict) -> Union[dict, list]:
-        return await self._arequest_oss_service("POST", endpoint, payload=payload)
+    async def _apost_oss_service(self, endpoint: str, payload: dict, idempotent: bool = False) -> Union[dict, list]:
+        return await self._arequest_oss_service("POST", endpoint, payload=payload, idempotent=idempotent)
 
     async def _adelete_oss_service(self, endpoint: str, payload: dict) -> Union[dict, list]:
-        return await self._arequest_oss_service("DELETE", endpoint, payload=payload)
+        return await self._arequest_oss_service("DELETE", endpoint, payload=payload, idempotent=True)
 
     async def _arequest_oss_service(
         self,
@@ -187,29 +468,29 @@ class StorageService:
         endpoint: str,
         params: Optional[dict] = None,
         payload: Optional[dict] = None,
+        idempotent: bool = False,
     ) -> Union[dict, list]:
         """统一的 OSS 服务请求方法"""
         url = urljoin(settings.oss_service_url, endpoint)
 
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=self.headers,
-                    params=params,
-                    json=payload,
-                )
-                response.raise_for_status()
-                result = response.json()
+            response = await _send(
+                method,
+                url,
+                idempotent=idempotent,
+                headers=self.headers,
+                params=params,
+                json=payload,
+            )
+            result = response.json()
 
-                if result.get("code") != 0:
-                    logger.warning(f"ObjectStorage service error: {result}")
-                    error_msg = result.get("error", "Unknown error")
-                    message = result.get("message", "")
-                    raise ValueError(f"ObjectStorage service error: {error_msg}. {message}")
+            if result.get("code") != 0:
+                logger.warning(f"ObjectStorage service error: {result}")
+                error_msg = result.get("error", "Unknown error")
+                message = result.get("message", "")
+                raise ValueError(f"ObjectStorage service error: {error_msg}. {message}")
 
-                return result.get("data", [])
+            return result.get("data", [])
         except httpx.HTTPStatusError as e:
             error_msg = f"ObjectStorage service HTTP error: {e.response.status_code} - {e.response.text}"
             logger.error(error_msg)
@@ -217,3 +498,25 @@ class StorageService:
         except Exception as e:
             logger.error(f"Failed to call ObjectStorage service: {e}")
             raise
+
+
+_storage_service: Optional[StorageBackend] = None
+
+
+def get_storage_service() -> StorageBackend:
+    """Return the process-wide storage backend selected by `storage_backend`."""
+    global _storage_service
+
+    if _storage_service is None:
+        backend = (settings.storage_backend or "oss").lower()
+        if backend == "local":
+            from services.storage_local import LocalStorageBackend
+
+            _storage_service = LocalStorageBackend(settings.local_storage_root)
+        elif backend == "oss":
+            _storage_service = OSSStorageBackend()
+        else:
+            raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+        logger.info(f"✅ Storage backend initialized: {backend}")
+
+    return _storage_service
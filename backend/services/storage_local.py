@@ -0,0 +1,226 @@
+"""
+Local filesystem storage backend.
+
+Stores objects as files under `local_storage_root/<bucket>/<object_key>` so
+export, image and raw-data paths can run (and be load-tested) without the
+remote ObjectStorage service. Enable with `STORAGE_BACKEND=local`.
+
+Presigned URLs point at `/api/v1/storage/local/...` on this backend and are
+HMAC-signed with `local_storage_signing_key` (a random per-process key when
+unset). Downloads are served with `FileResponse`, which hands the file path
+to the server (`http.response.pathsend`, i.e. sendfile) when it supports it
+instead of copying chunks through Python.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import secrets
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from urllib.parse import quote, urlencode, urljoin
+
+from core.config import settings
+from schemas.storage import (
+    BucketInfo,
+    BucketListResponse,
+    BucketRequest,
+    BucketResponse,
+    DeleteResponse,
+    FileUpDownRequest,
+    FileUpDownResponse,
+    ObjectInfo,
+    ObjectListResponse,
+    ObjectRequest,
+    OSSBaseModel,
+    RenameRequest,
+    RenameResponse,
+)
+from services.storage import StorageBackend, _transfer_timeout, get_oss_client
+
+logger = logging.getLogger(__name__)
+
+LOCAL_OBJECTS_PATH = "/api/v1/storage/local"
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+class LocalStorageBackend(StorageBackend):
+    """Object storage on the local disk, one directory per bucket."""
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        if settings.local_storage_signing_key:
+            self._signing_key = settings.local_storage_signing_key.encode()
+        else:
+            logger.warning("⚠️ LOCAL_STORAGE_SIGNING_KEY not set; presigned URLs only last for this process")
+            self._signing_key = secrets.token_bytes(32)
+
+    # ---------- Paths and signatures ----------
+
+    def _bucket_path(self, bucket_name: str) -> Path:
+        path = (self.root / bucket_name).resolve()
+        if path.parent != self.root:
+            raise ValueError(f"Invalid bucket name: {bucket_name}")
+        return path
+
+    def file_path(self, bucket_name: str, object_key: str) -> Path:
+        """Path of an object; rejects keys escaping the bucket directory."""
+        bucket = self._bucket_path(bucket_name)
+        path = (bucket / object_key).resolve()
+        if bucket not in path.parents:
+            raise ValueError(f"Invalid object key: {object_key}")
+        return path
+
+    def _signature(self, method: str, bucket_name: str, object_key: str, expires: int) -> str:
+        message = f"{method}\n{bucket_name}\n{object_key}\n{expires}".encode()
+        return hmac.new(self._signing_key, message, hashlib.sha256).hexdigest()
+
+    def verify_signature(self, method: str, bucket_name: str, object_key: str, expires: int, signature: str) -> bool:
+        """True if the signature matches and the URL has not expired."""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(method, bucket_name, object_key, expires), signature)
+
+    def _presign(self, method: str, bucket_name: str, object_key: str) -> tuple[str, str]:
+        expires = int(time.time()) + settings.local_storage_url_ttl_seconds
+        query = urlencode({"expires": expires, "signature": self._signature(method, bucket_name, object_key, expires)})
+        path = f"{LOCAL_OBJECTS_PATH}/{quote(bucket_name)}/{quote(object_key)}?{query}"
+        return urljoin(settings.backend_url, path), _iso(expires)
+
+    # ---------- Buckets and objects ----------
+
+    async def create_bucket(self, request: BucketRequest) -> BucketResponse:
+        path = self._bucket_path(request.bucket_name)
+        await asyncio.to_thread(path.mkdir, exist_ok=True)
+        return BucketResponse(
+            bucket_name=request.bucket_name,
+            visibility=request.visibility,
+            created_at=_iso(path.stat().st_ctime),
+        )
+
+    async def list_buckets(self) -> BucketListResponse:
+        def scan() -> list[str]:
+            return sorted(entry.name for entry in os.scandir(self.root) if entry.is_dir())
+
+        return BucketListResponse(buckets=[BucketInfo(bucket_name=name) for name in await asyncio.to_thread(scan)])
+
+    async def list_objects(self, request: OSSBaseModel) -> ObjectListResponse:
+        bucket = self._bucket_path(request.bucket_name)
+
+        def scan() -> list[ObjectInfo]:
+            if not bucket.is_dir():
+                raise ValueError(f"Bucket not found: {request.bucket_name}")
+            return [
+                self._object_info(request.bucket_name, entry.name, entry.stat())
+                for entry in sorted(os.scandir(bucket), key=lambda e: e.name)
+                if entry.is_file()
+            ]
+
+        return ObjectListResponse(objects=await asyncio.to_thread(scan))
+
+    async def get_object_info(self, request: ObjectRequest) -> ObjectInfo:
+        path = self.file_path(request.bucket_name, request.object_key)
+        try:
+            stat = await asyncio.to_thread(path.stat)
+        except FileNotFoundError:
+            raise ValueError(f"Object not found: {request.object_key}")
+        return self._object_info(request.bucket_name, request.object_key, stat)
+
+    @staticmethod
+    def _object_info(bucket_name: str, object_key: str, stat: os.stat_result) -> ObjectInfo:
+        return ObjectInfo(
+            bucket_name=bucket_name,
+            object_key=object_key,
+            size=stat.st_size,
+            last_modified=_iso(stat.st_mtime),
+            etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+        )
+
+    async def rename_object(self, request: RenameRequest) -> RenameResponse:
+        source = self.file_path(request.bucket_name, request.source_key)
+        target = self.file_path(request.bucket_name, request.target_key)
+
+        def rename() -> None:
+            if not source.is_file():
+                raise ValueError(f"Object not found: {request.source_key}")
+            if target.exists() and not request.overwrite_key:
+                raise ValueError(f"Object already exists: {request.target_key}")
+            os.replace(source, target)
+
+        await asyncio.to_thread(rename)
+        return RenameResponse(success=True)
+
+    async def delete_object(self, request: ObjectRequest) -> DeleteResponse:
+        path = self.file_path(request.bucket_name, request.object_key)
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+        return DeleteResponse(success=True)
+
+    # ---------- Presigned URLs ----------
+
+    async def create_upload_url(self, request: FileUpDownRequest) -> FileUpDownResponse:
+        self._bucket_path(request.bucket_name)
+        upload_url, expires_at = self._presign("PUT", request.bucket_name, request.object_key)
+        return FileUpDownResponse(upload_url=upload_url, expires_at=expires_at)
+
+    async def create_download_url(self, request: FileUpDownRequest) -> FileUpDownResponse:
+        self.file_path(request.bucket_name, request.object_key)
+        download_url, expires_at = self._presign("GET", request.bucket_name, request.object_key)
+        return FileUpDownResponse(download_url=download_url, expires_at=expires_at)
+
+    # ---------- Content ----------
+
+    async def write_stream(self, bucket_name: str, object_key: str, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Write an object from a byte stream. The file is written under a
+        temporary name and moved into place, so readers never see partial
+        content. Returns the number of bytes written.
+        """
+        path = self.file_path(bucket_name, object_key)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        fd, tmp_name = await asyncio.to_thread(tempfile.mkstemp, dir=path.parent, prefix=".upload-")
+        written = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                async for chunk in chunks:
+                    await asyncio.to_thread(tmp.write, chunk)
+                    written += len(chunk)
+            await asyncio.to_thread(os.replace, tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return written
+
+    async def upload_bytes(
+        self, bucket_name: str, object_key: str, data: bytes, content_type: Optional[str] = None
+    ) -> str:
+        request = FileUpDownRequest(bucket_name=bucket_name, object_key=object_key)
+
+        async def single() -> AsyncIterator[bytes]:
+            yield data
+
+        await self.write_stream(request.bucket_name, request.object_key, single())
+        return request.object_key
+
+    async def upload_from_url(self, bucket_name: str, object_key: str, source_url: str) -> str:
+        request = FileUpDownRequest(bucket_name=bucket_name, object_key=object_key)
+        async with get_oss_client().stream("GET", source_url, timeout=_transfer_timeout()) as source:
+            source.raise_for_status()
+            await self.write_stream(request.bucket_name, request.object_key, source.aiter_bytes())
+        return request.object_key
+
+    async def download_bytes(self, bucket_name: str, object_key: str) -> tuple[bytes, str]:
+        path = self.file_path(bucket_name, object_key)
+        try:
+            content = await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            raise ValueError(f"Object not found: {object_key}")
+        return content, mimetypes.guess_type(object_key)[0] or "application/octet-stream"
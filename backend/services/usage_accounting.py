@@ -0,0 +1,209 @@
+"""
+Usage Accounting - HoloCheck Equilibria
+Rolls AI token usage up into `organization_usage_summary` off the request path.
+
+`record()` only adds to an in-memory counter per (organization, month); a
+background task flushes the counters every `usage_flush_interval_seconds` as
+atomic upserts (`INSERT ... ON CONFLICT (organization_id, month) DO UPDATE
+SET total = total + EXCLUDED.total`, backed by a unique index). Each key is
+written in its own savepoint: keys that fail transiently are merged back and
+retried on the next cycle, keys the database rejects are logged and dropped.
+The remaining counters are flushed on shutdown.
+
+Under Lambda there is no shutdown hook and the loop only runs during
+invocations, so `lambda_handler` calls `flush_if_due()` after each request
+and `flush()` on warm-up events; counts below the threshold when a container
+is reaped without a later invocation are lost.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError, ProgrammingError
+
+from core.cache import TTLCache
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.supabase_client import get_supabase_admin
+
+logger = logging.getLogger(__name__)
+
+# Atomic increment; relies on the unique (organization_id, month) index so
+# containers flushing the same new month concurrently cannot insert twice.
+# The model's column defaults are Python-side, so new rows zero the scan
+# counters explicitly (readers subtract them without NULL checks).
+UPSERT_USAGE = text("""
+    INSERT INTO organization_usage_summary (
+        id, organization_id, month, total_ai_tokens_used, total_prompts_used,
+        total_scans, total_user_scans, total_valid_scans, total_invalid_scans,
+        total_biometric_scans, total_voice_scans, scan_limit_reached, created_at
+    )
+    VALUES (:id, :organization_id, :month, :tokens, :prompts, 0, 0, 0, 0, 0, 0, false, :created_at)
+    ON CONFLICT (organization_id, month) DO UPDATE
+    SET total_ai_tokens_used = COALESCE(organization_usage_summary.total_ai_tokens_used, 0) + EXCLUDED.total_ai_tokens_used,
+        total_prompts_used = COALESCE(organization_usage_summary.total_prompts_used, 0) + EXCLUDED.total_prompts_used
+""")
+
+# Rejections that retrying will not fix (unknown organization, bad values)
+PERMANENT_ERRORS = (IntegrityError, DataError, ProgrammingError)
+
+# Organization of a user, for attributing AI Hub calls
+_user_organizations = TTLCache("user_organizations", ttl=600, max_entries=10000)
+
+
+def current_month() -> date:
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+async def organization_for_user(user_id: str) -> Optional[str]:
+    """Organization of a user profile (cached), or None."""
+    cached = _user_organizations.get(user_id)
+    if cached is not None:
+        return cached or None
+
+    def lookup() -> str:
+        response = get_supabase_admin().table('user_profiles').select('organization_id').eq('user_id', user_id).execute()
+        return str(response.data[0].get('organization_id') or '') if response.data else ''
+
+    organization_id = await asyncio.to_thread(lookup)
+    # Empty string caches "no organization" as well
+    _user_organizations.set(user_id, organization_id)
+    return organization_id or None
+
+
+class UsageAccumulator:
+    """In-memory (organization, month) usage counters with periodic flushing."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: Dict[Tuple[str, date], List[int]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        # monotonic time of the oldest unflushed count
+        self._pending_since: Optional[float] = None
+
+    def record(self, organization_id: Optional[str], tokens: int = 0, prompts: int = 1) -> None:
+        """Count one AI call. No I/O; safe to call on the request path."""
+        if not organization_id:
+            return
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        counters = self._pending.setdefault((str(organization_id), current_month()), [0, 0])
+        counters[0] += tokens or 0
+        counters[1] += prompts
+        self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No running loop (sync caller); the next async record starts it
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write pending counters as increments. Returns the number of rows touched.
+
+        Each key is written in its own savepoint: keys rejected by the
+        database (e.g. the organization was deleted) are logged and dropped,
+        keys that failed for transient reasons are kept for the next cycle.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            self._pending_since = None
+            written: Dict[Tuple[str, date], List[int]] = {}
+            retry: Dict[Tuple[str, date], List[int]] = {}
+
+            try:
+                async with AsyncSessionLocal() as session:
+                    for key, counters in pending.items():
+                        organization_id, month = key
+                        try:
+                            async with session.begin_nested():
+                                await session.execute(UPSERT_USAGE, {
+                                    "id": uuid.uuid4(),
+                                    "organization_id": organization_id,
+                                    "month": month,
+                                    "tokens": counters[0],
+                                    "prompts": counters[1],
+                                    "created_at": datetime.now(timezone.utc),
+                                })
+                            written[key] = counters
+                        except PERMANENT_ERRORS as e:
+                            logger.error(f"❌ [Usage] Dropping usage of {organization_id} ({month}) {counters}: {e}")
+                        except Exception as e:
+                            logger.warning(f"⚠️ [Usage] Flush of {organization_id} ({month}) failed, retrying next cycle: {e}")
+                            retry[key] = counters
+                    await session.commit()
+            except asyncio.CancelledError:
+                self._merge_back(pending)
+                raise
+            except Exception as e:
+                # Nothing was committed: keep everything that was not dropped
+                logger.error(f"❌ [Usage] Flush failed, keeping {len(written) + len(retry)} counters for the next cycle: {e}")
+                self._merge_back({**written, **retry})
+                return 0
+
+            self._merge_back(retry)
+            logger.info(f"📈 [Usage] Flushed usage for {len(written)} organization-months")
+            return len(written)
+
+    async def flush_if_due(self) -> int:
+        """
+        Flush when `usage_flush_max_pending` keys are waiting or the oldest
+        count is older than the flush interval.
+
+        For runtimes whose event loop only runs during requests (Lambda:
+        no lifespan, so the periodic task rarely fires and `stop()` never
+        runs), called at the end of each invocation.
+        """
+        if not self._pending:
+            return 0
+        age = time.monotonic() - (self._pending_since or time.monotonic())
+        if len(self._pending) < settings.usage_flush_max_pending and age < self.interval:
+            return 0
+        return await self.flush()
+
+    def _merge_back(self, pending: Dict[Tuple[str, date], List[int]]) -> None:
+        if pending and self._pending_since is None:
+            self._pending_since = time.monotonic()
+        for key, (tokens, prompts) in pending.items():
+            counters = self._pending.setdefault(key, [0, 0])
+            counters[0] += tokens
+            counters[1] += prompts
+
+    async def stop(self) -> None:
+        """Stop the periodic task and flush what is left (application shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+_usage_accumulator: Optional[UsageAccumulator] = None
+
+
+def get_usage_accumulator() -> UsageAccumulator:
+    """Return the process-wide UsageAccumulator."""
+    global _usage_accumulator
+
+    if _usage_accumulator is None:
+        _usage_accumulator = UsageAccumulator(interval=settings.usage_flush_interval_seconds)
+
+    return _usage_accumulator
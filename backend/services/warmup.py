@@ -0,0 +1,146 @@
+"""
+Warm-up priming - HoloCheck Equilibria
+Prepares a fresh container so user-facing requests arrive warm.
+
+`prime()` runs the steps listed in `warmup_steps` (comma-separated):
+
+- routers: import and mount every lazily mounted router
+- db: open `warmup_db_connections` pooled database connections
+- supabase: create the Supabase admin client
+- http: create the shared object storage, AI Hub and DeepAffex HTTP clients
+- reference_data: load every parameter table
+- i18n: resolve every screen bundle for the `warmup_locales`
+- prompts: load the prompt registry
+- deepaffex: fetch (or refresh) the cached DeepAffex token
+
+Each step is timed; failures are reported in the summary, never raised.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict
+
+from sqlalchemy import text
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def _prime_routers() -> str:
+    from main import ROUTER_TABLE, app
+
+    ROUTER_TABLE.mount_all(app)
+    return f"{len(ROUTER_TABLE.loaded)} routers"
+
+
+async def _prime_db() -> str:
+    from core.database import engine
+
+    count = max(1, min(settings.warmup_db_connections, engine.pool.size()))
+
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Concurrent checkouts make the pool open distinct connections
+    await asyncio.gather(*(ping() for _ in range(count)))
+    return f"{count} connections"
+
+
+async def _prime_supabase() -> str:
+    from core.supabase_client import get_supabase_admin
+
+    await asyncio.to_thread(get_supabase_admin)
+    return "client ready"
+
+
+async def _prime_http() -> str:
+    from services.deepaffex_service import get_deepaffex_client
+    from services.storage import get_oss_client
+
+    get_oss_client()
+    get_deepaffex_client()
+    clients = ["storage", "deepaffex"]
+    if settings.app_ai_base_url and settings.app_ai_key:
+        from services.aihub import get_ai_client
+
+        get_ai_client()
+        clients.append("aihub")
+    return ", ".join(clients)
+
+
+async def _prime_reference_data() -> str:
+    from services.reference_data import get_reference_data_service
+
+    service = get_reference_data_service()
+    await service.warm_up()
+    return f"{len(service.tables())} tables"
+
+
+async def _prime_i18n() -> str:
+    from core.database import AsyncSessionLocal
+    from services.i18n_bundles import get_i18n_bundle_service
+
+    locales = [locale.strip() for locale in settings.warmup_locales.split(",") if locale.strip()]
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(text("SELECT DISTINCT screen_code FROM i18n_namespaces WHERE screen_code IS NOT NULL"))
+        screen_codes = [row.screen_code for row in result.fetchall()]
+        for locale in locales:
+            await get_i18n_bundle_service().get_bundles(session, screen_codes, locale)
+    return f"{len(screen_codes)} screens x {len(locales)} locales"
+
+
+async def _prime_prompts() -> str:
+    from services.prompt_registry import get_prompt_registry
+
+    index = await get_prompt_registry().index()
+    return f"{len(index)} prompts"
+
+
+async def _prime_deepaffex() -> str:
+    from services.deepaffex_service import get_deepaffex_service
+
+    try:
+        service = get_deepaffex_service()
+    except ValueError:
+        return "skipped (not configured)"
+    result = await service.generate_token()
+    if result.get("status") != "200":
+        raise RuntimeError(result.get("error", "token request failed"))
+    return "token cached"
+
+
+STEPS: Dict[str, Callable[[], Awaitable[str]]] = {
+    "routers": _prime_routers,
+    "db": _prime_db,
+    "supabase": _prime_supabase,
+    "http": _prime_http,
+    "reference_data": _prime_reference_data,
+    "i18n": _prime_i18n,
+    "prompts": _prime_prompts,
+    "deepaffex": _prime_deepaffex,
+}
+
+
+async def prime() -> Dict[str, str]:
+    """Run the configured warm-up steps in order. Returns {step: outcome}."""
+    started = time.perf_counter()
+    summary: Dict[str, str] = {}
+
+    for step in (name.strip() for name in settings.warmup_steps.split(",")):
+        if not step:
+            continue
+        if step not in STEPS:
+            summary[step] = "unknown step"
+            continue
+        step_started = time.perf_counter()
+        try:
+            outcome = await STEPS[step]()
+            summary[step] = f"{outcome} ({(time.perf_counter() - step_started) * 1000:.0f}ms)"
+        except Exception as e:
+            logger.warning(f"⚠️ [Warmup] {step} failed: {e}")
+            summary[step] = f"error: {e}"
+
+    logger.info(f"🔥 [Warmup] Primed in {(time.perf_counter() - started) * 1000:.0f}ms: {summary}")
+    return summary